@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+bench_diag.py
+
+End-to-end benchmark for openclaw_diag.py against a synthetic cluster
+(fake_kube_api.py) on 127.0.0.1: wall time and peak RSS of single-release
+and fleet reports per API backend, each run in a fresh process. A "replay"
+row runs the single-release report from a --record snapshot, which isolates
+client-side cost from the API round trips.
+
+Save a run with --json and compare later runs against it with --baseline;
+the exit status is 1 when a median time or RSS grows by more than
+--max-regression.
+
+Usage:
+  python bin/bench_diag.py
+  python bin/bench_diag.py --namespaces 200 --noise-pods 100 --runs 5 --json bench.json
+  python bin/bench_diag.py --baseline bench.json --max-regression 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import fake_kube_api
+
+BIN_DIR = Path(__file__).resolve().parent
+DIAG = BIN_DIR / "openclaw_diag.py"
+BACKENDS = ("kubernetes", "lean")
+
+# name -> openclaw_diag.py arguments
+SCENARIOS = {
+    "single": ["-n", "bench-0000", "-s", "openclaw", "--print-token", "--tail-logs", "50", "--timeline"],
+    "fleet": ["-A"],
+    "fleet-full": ["-A", "--full-report", "--timeline"],
+}
+
+
+def run_once(argv: List[str], env: Dict[str, str]) -> Tuple[float, int, int, str]:
+    """
+    Returns (seconds, peak RSS KiB, exit status, last stderr line) for one child.
+    """
+    with tempfile.TemporaryFile() as err:
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, str(DIAG)] + argv, env=env, stdout=subprocess.DEVNULL, stderr=err)
+        # wait4 gives this child's own rusage; RUSAGE_CHILDREN would be the max over all of them.
+        _, status, usage = os.wait4(proc.pid, 0)
+        seconds = time.perf_counter() - start
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        err.seek(0)
+        last = (err.read().decode("utf-8", errors="replace").strip().splitlines() or [""])[-1]
+    rss = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+    return seconds, rss, proc.returncode, last
+
+
+def measure(argv: List[str], env: Dict[str, str], runs: int) -> Tuple[Optional[Dict[str, float]], Optional[str]]:
+    times, rss = [], []
+    for _ in range(runs):
+        seconds, kb, code, last = run_once(argv, env)
+        if code != 0:
+            return None, last or f"exit status {code}"
+        times.append(seconds * 1000)
+        rss.append(kb / 1024)
+    return {"median_ms": statistics.median(times), "min_ms": min(times), "rss_mib": statistics.median(rss)}, None
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], max_regression: float) -> List[str]:
+    failures = []
+    for key, cur in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        for metric in ("median_ms", "rss_mib"):
+            if base[metric] and cur[metric] > base[metric] * (1 + max_regression):
+                failures.append(f"{key}: {metric} {base[metric]:.1f} -> {cur[metric]:.1f} (+{(cur[metric] / base[metric] - 1) * 100:.0f}%)")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark openclaw_diag.py against a synthetic cluster")
+    fake_kube_api.add_cluster_args(parser)
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes per scenario and backend (default: 3)")
+    parser.add_argument("--backend", action="append", choices=BACKENDS, help="Backend(s) to measure (default: both)")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario(s) to run (default: all)")
+    parser.add_argument("--json", default=None, metavar="PATH", help="Write results as JSON to PATH")
+    parser.add_argument("--baseline", default=None, metavar="PATH", help="Compare against results saved with --json")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Allowed growth over --baseline (default: 0.25 = 25%%)")
+    args = parser.parse_args()
+
+    cluster = fake_kube_api.cluster_from_args(args)
+    server, _ = fake_kube_api.serve(cluster)
+    port = server.server_address[1]
+    print(f"Synthetic cluster: {args.namespaces} namespace(s), {cluster.count('pods')} pods, "
+          f"{cluster.count('ingresses')} ingresses, {cluster.count('secrets')} secrets, {cluster.count('events')} events")
+
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        kubeconfig = os.path.join(tmp, "kubeconfig")
+        fake_kube_api.write_kubeconfig(kubeconfig, port)
+        env = dict(os.environ, KUBECONFIG=kubeconfig)
+        env.pop("OPENCLAW_DIAG_BACKEND", None)
+
+        print(f"{'SCENARIO':12} {'BACKEND':12} {'MEDIAN MS':>10} {'MIN MS':>8} {'RSS MiB':>8}")
+        rows: List[Tuple[str, str, List[str]]] = []
+        for scenario in args.scenario or list(SCENARIOS):
+            for backend in args.backend or BACKENDS:
+                rows.append((scenario, backend, SCENARIOS[scenario] + ["--backend", backend]))
+        if not args.scenario or "single" in args.scenario:
+            snapshot = os.path.join(tmp, "single.snap.gz")
+            record = SCENARIOS["single"] + ["--backend", "lean", "--record", snapshot]
+            _, _, code, last = run_once(record, env)
+            if code == 0:
+                rows.append(("single", "replay", SCENARIOS["single"] + ["--replay", snapshot]))
+            else:
+                print(f"{'single':12} {'replay':12} unavailable: {last}")
+
+        for scenario, backend, argv in rows:
+            stats, error = measure(argv, env, args.runs)
+            if stats is None:
+                print(f"{scenario:12} {backend:12} unavailable: {error}")
+                continue
+            results[f"{scenario}/{backend}"] = stats
+            print(f"{scenario:12} {backend:12} {stats['median_ms']:10.1f} {stats['min_ms']:8.1f} {stats['rss_mib']:8.1f}")
+    server.shutdown()
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"cluster": {k: getattr(args, k) for k in ("namespaces", "replicas", "noise_pods", "ingresses", "secrets", "events_per_pod")},
+                       "results": results}, fh, indent=2)
+            fh.write("\n")
+        print(f"Results written to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)["results"]
+        failures = compare(results, baseline, args.max_regression)
+        for line in failures:
+            print(f"REGRESSION {line}")
+        if failures:
+            return 1
+        print(f"No regressions over {args.baseline} (threshold {args.max_regression * 100:.0f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
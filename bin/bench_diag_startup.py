@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+bench_diag_startup.py
+
+Compare openclaw_diag.py startup cost per API backend: time to import the
+client and build the API objects, plus peak RSS, each measured in a fresh
+interpreter. No cluster is needed.
+
+Usage:
+  python bin/bench_diag_startup.py
+  python bin/bench_diag_startup.py --runs 20 --backend lean
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BIN_DIR = Path(__file__).resolve().parent
+
+# Runs in a child interpreter; prints {"seconds": ..., "rss_kb": ...}.
+PROBE = r"""
+import json, resource, sys, time
+sys.path.insert(0, {bin_dir!r})
+t0 = time.perf_counter()
+import openclaw_diag as diag
+diag.load_backend({backend!r})
+diag.client.CoreV1Api, diag.client.AppsV1Api, diag.client.NetworkingV1Api
+seconds = time.perf_counter() - t0
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"seconds": seconds, "rss_kb": rss // 1024 if sys.platform == "darwin" else rss}}))
+"""
+
+
+def measure(backend: str, runs: int):
+    samples = []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-c", PROBE.format(bin_dir=str(BIN_DIR), backend=backend)],
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            last = (proc.stderr.strip().splitlines() or ["failed"])[-1]
+            return None, last
+        samples.append(json.loads(proc.stdout))
+    return samples, None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark openclaw_diag.py startup per backend")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters per backend (default: 10)")
+    parser.add_argument("--backend", action="append", choices=["kubernetes", "lean"],
+                        help="Backend(s) to measure (default: both)")
+    args = parser.parse_args()
+
+    print(f"{'BACKEND':12} {'MEDIAN MS':>10} {'MIN MS':>8} {'RSS MiB':>8}")
+    for backend in args.backend or ["kubernetes", "lean"]:
+        samples, error = measure(backend, args.runs)
+        if samples is None:
+            print(f"{backend:12} unavailable: {error}")
+            continue
+        ms = [s["seconds"] * 1000 for s in samples]
+        rss = statistics.median(s["rss_kb"] for s in samples) / 1024
+        print(f"{backend:12} {statistics.median(ms):10.1f} {min(ms):8.1f} {rss:8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,7 +3,9 @@
 OpenClaw Kube - Makefile Configuration
 
 Generates build-config.json with the source (FROM) and target image
-settings consumed directly by the Makefile.
+settings, plus build-config.mk, the Make include the Makefile reads them
+from (regenerated by Make itself, via --make-include, whenever
+build-config.json is newer).
 
 Usage:
     # Interactive mode
@@ -16,16 +18,40 @@ Usage:
     python bin/configure-make.py \
         --source-registry ghcr.io --source-image openclaw/openclaw --source-tag latest \
         --target-registry ghcr.io/myorg --target-image openclaw-playwright
+
+    # Build plan for `make build` / `make push` (shell assignments on stdout)
+    python bin/configure.py --plan --cache registry
 """
 
+import hashlib
 import json
 import os
+import re
+import shlex
+import subprocess
 import sys
 import argparse
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
 CONFIG_FILE = "build-config.json"
+MAKE_INCLUDE = "build-config.mk"
+
+# Build planner: a fingerprint of everything that goes into the image, stored
+# as a label on pushed images and as an extra fp-<fingerprint> tag.
+FINGERPRINT_LABEL = "org.openclaw.build.fingerprint"
+# Bump when the fingerprint inputs change meaning.
+FINGERPRINT_VERSION = "2"
+FINGERPRINT_TAG_LEN = 20
+PLATFORM = "linux/amd64"
+CACHE_BACKENDS = ("registry", "gha", "local", "none")
+CACHE_TAG = "buildcache"
+LOCAL_CACHE_DIR = ".buildx-cache"
+COPY_RE = re.compile(r"^\s*(?:COPY|ADD)\s+(.+)$", re.IGNORECASE | re.MULTILINE)
+ARG_RE = re.compile(r"^\s*ARG\s+(\w+)=(\S+)\s*$", re.IGNORECASE | re.MULTILINE)
+COMMIT_RE = re.compile(r"^[0-9a-f]{40}$")
+GOGCLI_REPO = "https://github.com/steipete/gogcli.git"
+GIT_TIMEOUT = 30
 
 
 def load_saved_config(output_dir: Path) -> dict:
@@ -47,6 +73,177 @@ def save_config(config: dict, output_dir: Path) -> Path:
     return path
 
 
+def make_variables(config: dict) -> dict:
+    """Every value the Makefile needs, derived ones included, computed in one go."""
+    source = config.get("source", {})
+    target = config.get("target", {})
+    variables = {
+        "SOURCE_REGISTRY": source.get("registry", ""),
+        "SOURCE_IMAGE": source.get("image", ""),
+        "SOURCE_TAG": source.get("tag", ""),
+        "REGISTRY": target.get("registry", ""),
+        "IMAGE_NAME": target.get("image", ""),
+        "IMAGE_TAG": target.get("tag", ""),
+    }
+    variables["BASE_IMAGE"] = f"{variables['SOURCE_REGISTRY']}/{variables['SOURCE_IMAGE']}:{variables['SOURCE_TAG']}"
+    return variables
+
+
+def save_make_include(config: dict, output_dir: Path) -> Path:
+    """Write build-config.mk (always, so its mtime moves past build-config.json)."""
+    path = output_dir / MAKE_INCLUDE
+    lines = [f"# Generated by bin/configure.py from {CONFIG_FILE}; do not edit."]
+    for name, value in make_variables(config).items():
+        lines.append(f"{name} := {str(value).replace('$', '$$')}")
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text("\n".join(lines) + "\n")
+    os.replace(tmp, path)
+    return path
+
+
+def dockerfile_sources(dockerfile: Path, context: Path) -> List[Path]:
+    """Build-context files the Dockerfile copies in (COPY/ADD, except --from stages and URLs)."""
+    text = dockerfile.read_text().replace("\\\n", " ")
+    files = set()
+    for match in COPY_RE.finditer(text):
+        spec = match.group(1).strip()
+        if spec.startswith("["):
+            args = json.loads(spec)
+        else:
+            args = shlex.split(spec)
+        if any(a.startswith("--from") for a in args):
+            continue
+        for src in [a for a in args if not a.startswith("--")][:-1]:
+            if "://" in src:
+                continue
+            for path in sorted(context.glob(src)) if any(c in src for c in "*?[") else [context / src]:
+                if path.is_dir():
+                    files.update(p for p in path.rglob("*") if p.is_file())
+                elif path.exists():
+                    files.add(path)
+    return sorted(files)
+
+
+def dockerfile_args(dockerfile: Path) -> Dict[str, str]:
+    """Default values of the Dockerfile's ARGs (the first one wins)."""
+    args: Dict[str, str] = {}
+    for name, value in ARG_RE.findall(dockerfile.read_text()):
+        args.setdefault(name, value.strip("\"'"))
+    return args
+
+
+def resolve_git_ref(repo: str, ref: str, timeout: float = GIT_TIMEOUT) -> str:
+    """Commit a tag or branch of `repo` points at (git ls-remote); a full commit id is returned as is."""
+    if COMMIT_RE.match(ref):
+        return ref
+    out = subprocess.run(["git", "ls-remote", repo, ref, f"{ref}^{{}}"], capture_output=True, text=True,
+                         timeout=timeout, check=True).stdout
+    refs = {name: sha for sha, name in (line.split("\t", 1) for line in out.splitlines() if "\t" in line)}
+    # An annotated tag's ^{} entry is the commit; the plain entry is the tag object.
+    for name in (f"refs/tags/{ref}^{{}}", f"refs/tags/{ref}", f"refs/heads/{ref}"):
+        if name in refs:
+            return refs[name]
+    raise ValueError(f"no tag or branch {ref} in {repo}")
+
+
+def file_digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def build_fingerprint(context: Path, base_ref: str, platform: str, build_args: Optional[Dict[str, str]] = None) -> str:
+    """sha256 over the base image digest, platform, build args, Dockerfile and every file it copies.
+
+    Tool versions the Dockerfile pins (ARGs, tags, @versions) are covered by its
+    text, and gogcli by the commit passed as GOGCLI_REF; anything else it
+    fetches unpinned (npm latest, the Playwright browsers) is not.
+    """
+    dockerfile = context / "Dockerfile"
+    h = hashlib.sha256()
+    h.update(f"version {FINGERPRINT_VERSION}\nplatform {platform}\nbase {base_ref}\n".encode())
+    for name, value in sorted((build_args or {}).items()):
+        h.update(f"arg {name} {value}\n".encode())
+    for path in [dockerfile] + dockerfile_sources(dockerfile, context):
+        h.update(f"file {path.relative_to(context).as_posix()} {file_digest(path)}\n".encode())
+    return h.hexdigest()
+
+
+def cache_settings(backend: str, image: str) -> tuple:
+    """(--cache-from, --cache-to) values for docker buildx; empty strings disable."""
+    if backend == "registry":
+        ref = f"{image}:{CACHE_TAG}"
+        return f"type=registry,ref={ref}", f"type=registry,ref={ref},mode=max,image-manifest=true,oci-mediatypes=true"
+    if backend == "gha":
+        scope = image.rsplit("/", 1)[-1]
+        return f"type=gha,scope={scope}", f"type=gha,scope={scope},mode=max"
+    if backend == "local":
+        return f"type=local,src={LOCAL_CACHE_DIR}", f"type=local,dest={LOCAL_CACHE_DIR},mode=max"
+    return "", ""
+
+
+def plan_build(config: dict, context: Path, platform: str, cache: str, force: bool) -> dict:
+    """Decide skip / retag / rebuild for the configured target image.
+
+    skip:    the target tag already carries this fingerprint
+    retag:   an image with this fingerprint was pushed under another tag
+    rebuild: anything else (including registry errors: unchanged is never assumed)
+    """
+    from oci_registry import RegistryError, image_labels, pick_digest, resolve_digests, split_reference
+
+    variables = make_variables(config)
+    target = f"{variables['REGISTRY']}/{variables['IMAGE_NAME']}"
+    source_registry, source_repo = variables["SOURCE_REGISTRY"], variables["SOURCE_IMAGE"]
+    plan = {"BASE_REF": variables["BASE_IMAGE"], "FINGERPRINT_LABEL": FINGERPRINT_LABEL}
+    plan["CACHE_FROM"], plan["CACHE_TO"] = cache_settings(cache, target)
+
+    reason = None
+    try:
+        index_digest, platforms = resolve_digests(source_registry, source_repo, variables["SOURCE_TAG"])
+        plan["BASE_REF"] = f"{variables['BASE_IMAGE']}@{pick_digest(index_digest, platforms, platform)}"
+    except (RegistryError, OSError, ValueError) as e:
+        reason = f"base image digest unavailable ({e})"
+    args = dockerfile_args(context / "Dockerfile")
+    build_args = {}
+    if args.get("GOGCLI_REF"):
+        # A branch moves without the Dockerfile changing; build (and hash) the commit it is at now.
+        build_args["GOGCLI_REF"] = args["GOGCLI_REF"]
+        try:
+            build_args["GOGCLI_REF"] = resolve_git_ref(args.get("GOGCLI_REPO", GOGCLI_REPO), args["GOGCLI_REF"])
+        except (OSError, subprocess.SubprocessError, ValueError) as e:
+            reason = reason or f"gogcli {args['GOGCLI_REF']} unresolved ({e})"
+    plan["GOGCLI_REF"] = build_args.get("GOGCLI_REF", "")
+    plan["FINGERPRINT"] = build_fingerprint(context, plan["BASE_REF"], platform, build_args)
+    plan["FINGERPRINT_REF"] = f"{target}:fp-{plan['FINGERPRINT'][:FINGERPRINT_TAG_LEN]}"
+
+    if force:
+        reason = "forced"
+    if reason:
+        plan["PLAN_ACTION"], plan["PLAN_REASON"] = "rebuild", reason
+        return plan
+
+    registry, repository = split_reference(target)
+    try:
+        labels = image_labels(registry, repository, variables["IMAGE_TAG"], platform)
+        if labels.get(FINGERPRINT_LABEL) == plan["FINGERPRINT"]:
+            plan["PLAN_ACTION"], plan["PLAN_REASON"] = "skip", f"{target}:{variables['IMAGE_TAG']} has this fingerprint"
+            return plan
+        reason = f"{target}:{variables['IMAGE_TAG']} was built from other inputs"
+    except RegistryError as e:
+        if e.status not in (404,):
+            plan["PLAN_ACTION"], plan["PLAN_REASON"] = "rebuild", f"cannot read {target}:{variables['IMAGE_TAG']} ({e})"
+            return plan
+        reason = f"{target}:{variables['IMAGE_TAG']} does not exist"
+    except (OSError, ValueError, KeyError) as e:
+        plan["PLAN_ACTION"], plan["PLAN_REASON"] = "rebuild", f"cannot read {target}:{variables['IMAGE_TAG']} ({e})"
+        return plan
+
+    try:
+        resolve_digests(registry, repository, plan["FINGERPRINT_REF"].rsplit(":", 1)[1])
+        plan["PLAN_ACTION"], plan["PLAN_REASON"] = "retag", f"{reason}; {plan['FINGERPRINT_REF']} matches"
+    except (RegistryError, OSError, ValueError):
+        plan["PLAN_ACTION"], plan["PLAN_REASON"] = "rebuild", reason
+    return plan
+
+
 def get_env_or_prompt(
     env_var: str,
     prompt: str,
@@ -139,6 +336,14 @@ def main():
                         help="Read all values from environment variables (non-interactive)")
     parser.add_argument("--output-dir", type=Path, default=Path("."),
                         help="Directory to write build-config.json (default: .)")
+    parser.add_argument("--make-include", action="store_true",
+                        help=f"Only regenerate {MAKE_INCLUDE} from the saved {CONFIG_FILE} (run by make)")
+    parser.add_argument("--plan", action="store_true",
+                        help="Print the build plan (skip/retag/rebuild) as shell assignments (run by make)")
+    parser.add_argument("--platform", default=PLATFORM, help=f"Build platform for --plan (default: {PLATFORM})")
+    parser.add_argument("--cache", choices=CACHE_BACKENDS, default=os.environ.get("BUILD_CACHE", "registry"),
+                        help="BuildKit cache backend for --plan (default: $BUILD_CACHE or registry)")
+    parser.add_argument("--force", action="store_true", help="With --plan: always rebuild")
 
     # Source image
     parser.add_argument("--source-registry", help="Source image registry")
@@ -152,6 +357,24 @@ def main():
 
     args = parser.parse_args()
 
+    if args.make_include:
+        saved = load_saved_config(args.output_dir)
+        if not saved:
+            print(f"Error: no readable {args.output_dir / CONFIG_FILE}; run make configure", file=sys.stderr)
+            sys.exit(1)
+        print(f"  Saved:   {save_make_include(saved, args.output_dir)}")
+        return
+
+    if args.plan:
+        saved = load_saved_config(args.output_dir)
+        if not saved:
+            print(f"Error: no readable {args.output_dir / CONFIG_FILE}; run make configure", file=sys.stderr)
+            sys.exit(1)
+        plan = plan_build(saved, Path(__file__).resolve().parent.parent, args.platform, args.cache, args.force)
+        for name, value in plan.items():
+            print(f"{name}={shlex.quote(value)}")
+        return
+
     print("=== OpenClaw Kube - Makefile Configuration ===")
 
     saved = load_saved_config(args.output_dir)
@@ -159,6 +382,7 @@ def main():
 
     print()
     save_config(config, args.output_dir)
+    print(f"  Saved:   {save_make_include(config, args.output_dir)}")
 
     print("\n=== Next Steps ===")
     print("  make build   # Build the image")
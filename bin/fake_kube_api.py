@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+fake_kube_api.py
+
+Synthetic Kubernetes API server for exercising openclaw_diag.py without a
+cluster (used by bench_diag.py). It generates namespaces that each hold one
+OpenClaw release (StatefulSet, pods, Service, Ingress, token Secret, pod
+events) plus unrelated pods, ingresses and secrets. It serves the read-only
+calls diag makes over plain HTTP on 127.0.0.1:
+
+- get / list (namespaced and all-namespaces) with labelSelector, fieldSelector
+  and limit/continue paging
+- Accept: ...;as=PartialObjectMetadataList
+- pods/{name}/log
+
+Usage:
+  python bin/fake_kube_api.py --namespaces 50 --noise-pods 100
+  python bin/fake_kube_api.py --port 18080 --kubeconfig /tmp/fake.kubeconfig
+  KUBECONFIG=/tmp/fake.kubeconfig python bin/openclaw_diag.py -n bench-0000
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+RESOURCE_VERSION = "1000"
+RELEASE_LABELS = {"app.kubernetes.io/name": "openclaw"}
+IMAGE = "ghcr.io/openclaw/openclaw:2026.1.0"
+PATH_RE = re.compile(
+    r"^/(?:api/v1|apis/[^/]+/[^/]+)"
+    r"(?:/namespaces/(?P<ns>[^/]+))?/(?P<resource>[^/]+)(?:/(?P<name>[^/]+))?(?:/(?P<sub>log))?$"
+)
+
+
+def _meta(name: str, ns: str, labels: Optional[Dict[str, str]] = None, **extra) -> Dict[str, Any]:
+    meta = {
+        "name": name,
+        "namespace": ns,
+        "uid": f"{ns}-{name}",
+        "resourceVersion": RESOURCE_VERSION,
+        "creationTimestamp": "2026-01-01T00:00:00Z",
+        "labels": labels or {},
+    }
+    meta.update(extra)
+    return meta
+
+
+def _pod(ns: str, name: str, labels: Dict[str, str], index: int) -> Dict[str, Any]:
+    return {
+        "metadata": _meta(name, ns, labels, annotations={"checksum/config": "0" * 64}),
+        "spec": {
+            "nodeName": f"node-{index % 16}",
+            "initContainers": [{"name": "init-config", "image": IMAGE}],
+            "containers": [{
+                "name": "gateway",
+                "image": IMAGE,
+                "ports": [{"name": "gateway", "containerPort": 18789, "protocol": "TCP"}],
+                "env": [
+                    {"name": "OPENCLAW_GATEWAY_TOKEN", "valueFrom": {"secretKeyRef": {"name": "openclaw", "key": "gatewayToken"}}},
+                    {"name": "NODE_ENV", "value": "production"},
+                ],
+                "resources": {"requests": {"cpu": "250m", "memory": "512Mi"}, "limits": {"cpu": "1", "memory": "2Gi"}},
+                "readinessProbe": {"tcpSocket": {"port": "gateway"}, "periodSeconds": 10},
+                "volumeMounts": [{"name": "data", "mountPath": "/home/node/.openclaw"}],
+            }],
+        },
+        "status": {
+            "phase": "Running",
+            "podIP": f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}",
+            "hostIP": f"192.168.0.{index % 16}",
+            "startTime": "2026-01-01T00:00:01Z",
+            "conditions": [
+                {"type": "PodScheduled", "status": "True", "lastTransitionTime": "2026-01-01T00:00:01Z"},
+                {"type": "Initialized", "status": "True", "lastTransitionTime": "2026-01-01T00:00:09Z"},
+                {"type": "ContainersReady", "status": "True", "lastTransitionTime": "2026-01-01T00:00:21Z"},
+                {"type": "Ready", "status": "True", "lastTransitionTime": "2026-01-01T00:00:21Z"},
+            ],
+            "initContainerStatuses": [{
+                "name": "init-config", "ready": True, "restartCount": 0, "image": IMAGE,
+                "state": {"terminated": {"exitCode": 0, "reason": "Completed", "startedAt": "2026-01-01T00:00:08Z", "finishedAt": "2026-01-01T00:00:09Z"}},
+            }],
+            "containerStatuses": [{
+                "name": "gateway", "ready": True, "started": True, "restartCount": 0, "image": IMAGE,
+                "state": {"running": {"startedAt": "2026-01-01T00:00:10Z"}},
+            }],
+        },
+    }
+
+
+def _events(ns: str, pod: Dict[str, Any], count: int) -> List[Dict[str, Any]]:
+    name = pod["metadata"]["name"]
+    steps = [
+        ("Scheduled", "default-scheduler", f"Successfully assigned {ns}/{name}", "2026-01-01T00:00:01Z"),
+        ("Pulling", "kubelet", f'Pulling image "{IMAGE}"', "2026-01-01T00:00:02Z"),
+        ("Pulled", "kubelet", f'Successfully pulled image "{IMAGE}" in 5.5s (5.5s including waiting)', "2026-01-01T00:00:07Z"),
+        ("Created", "kubelet", "Created container gateway", "2026-01-01T00:00:10Z"),
+        ("Started", "kubelet", "Started container gateway", "2026-01-01T00:00:10Z"),
+    ]
+    out = []
+    for i in range(count):
+        reason, source, message, ts = steps[i % len(steps)]
+        out.append({
+            "metadata": _meta(f"{name}.{i:04x}", ns),
+            "involvedObject": {"kind": "Pod", "namespace": ns, "name": name, "uid": pod["metadata"]["uid"]},
+            "reason": reason,
+            "message": message,
+            "source": {"component": source},
+            "type": "Normal",
+            "count": 1,
+            "firstTimestamp": ts,
+            "lastTimestamp": ts,
+        })
+    return out
+
+
+class SyntheticCluster:
+    """
+    resource -> namespace -> [objects], built once up front.
+    """
+
+    def __init__(self, namespaces: int = 20, replicas: int = 1, noise_pods: int = 50,
+                 ingresses: int = 10, secrets: int = 20, events_per_pod: int = 5, log_lines: int = 200):
+        self.objects: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        self.log_lines = log_lines
+        pod_index = 0
+        for n in range(namespaces):
+            ns = f"bench-{n:04d}"
+            labels = dict(RELEASE_LABELS, **{"app.kubernetes.io/instance": ns})
+            self._add("statefulsets", ns, {
+                "metadata": _meta("openclaw", ns, labels),
+                "spec": {"replicas": replicas, "serviceName": "openclaw", "selector": {"matchLabels": labels},
+                         "template": {"metadata": {"labels": labels}, "spec": _pod(ns, "openclaw", labels, 0)["spec"]}},
+                "status": {"replicas": replicas, "readyReplicas": replicas, "updatedReplicas": replicas, "currentRevision": "openclaw-1", "updateRevision": "openclaw-1"},
+            })
+            self._add("services", ns, {
+                "metadata": _meta("openclaw", ns, labels),
+                "spec": {"type": "ClusterIP", "clusterIP": f"10.96.{n // 256 % 256}.{n % 256}",
+                         "ports": [{"name": "gateway", "port": 18789, "protocol": "TCP", "targetPort": "gateway"}]},
+            })
+            self._add("ingresses", ns, {
+                "metadata": _meta("openclaw", ns, labels),
+                "spec": {"rules": [{"host": f"{ns}.openclaw.example.com", "http": {"paths": [
+                    {"path": "/", "pathType": "Prefix", "backend": {"service": {"name": "openclaw", "port": {"number": 18789}}}}]}}]},
+            })
+            self._add("secrets", ns, {
+                "metadata": _meta("openclaw", ns, labels),
+                "type": "Opaque",
+                "data": {"gatewayToken": base64.b64encode(f"token-{ns}".encode()).decode()},
+            })
+            for r in range(replicas):
+                pod = _pod(ns, f"openclaw-{r}", labels, pod_index)
+                pod_index += 1
+                self._add("pods", ns, pod)
+                for ev in _events(ns, pod, events_per_pod):
+                    self._add("events", ns, ev)
+            other = {"app.kubernetes.io/name": "other"}
+            for i in range(noise_pods):
+                self._add("pods", ns, _pod(ns, f"other-{i}", other, pod_index))
+                pod_index += 1
+            for i in range(ingresses):
+                self._add("ingresses", ns, {"metadata": _meta(f"other-{i}", ns, other), "spec": {"rules": [{"host": f"other-{i}.{ns}.example.com"}]}})
+            for i in range(secrets):
+                self._add("secrets", ns, {"metadata": _meta(f"other-{i}", ns, other), "type": "Opaque", "data": {"key": "dmFsdWU="}})
+
+    def _add(self, resource: str, ns: str, obj: Dict[str, Any]):
+        self.objects.setdefault(resource, {}).setdefault(ns, []).append(obj)
+
+    def count(self, resource: str) -> int:
+        return sum(len(v) for v in self.objects.get(resource, {}).values())
+
+    def items(self, resource: str, ns: Optional[str]) -> List[Dict[str, Any]]:
+        by_ns = self.objects.get(resource, {})
+        if ns is not None:
+            return by_ns.get(ns, [])
+        return [o for objs in by_ns.values() for o in objs]
+
+    def get(self, resource: str, ns: str, name: str) -> Optional[Dict[str, Any]]:
+        return next((o for o in self.objects.get(resource, {}).get(ns, []) if o["metadata"]["name"] == name), None)
+
+    def log(self, ns: str, name: str, tail: Optional[int]) -> str:
+        n = self.log_lines if tail is None else min(tail, self.log_lines)
+        return "".join(f"2026-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}Z [{ns}/{name}] gateway heartbeat {i}\n"
+                       for i in range(self.log_lines - n, self.log_lines))
+
+
+def _field(obj: Dict[str, Any], path: str) -> Any:
+    for part in path.split("."):
+        obj = obj.get(part) if isinstance(obj, dict) else None
+    return obj
+
+
+def _matches(obj: Dict[str, Any], label_selector: Optional[str], field_selector: Optional[str]) -> bool:
+    # Equality-based selectors only (k=v, k==v, k!=v), which is all diag sends.
+    labels = obj["metadata"].get("labels") or {}
+    for term in filter(None, (label_selector or "").split(",")):
+        if "!=" in term:
+            k, v = term.split("!=", 1)
+            if labels.get(k) == v:
+                return False
+        else:
+            k, v = re.split(r"==?", term, maxsplit=1)
+            if labels.get(k) != v:
+                return False
+    for term in filter(None, (field_selector or "").split(",")):
+        k, v = re.split(r"==?", term, maxsplit=1)
+        if str(_field(obj, k)) != v:
+            return False
+    return True
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    cluster: SyntheticCluster
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _status(self, code: int, reason: str, message: str):
+        self._send(code, json.dumps({"kind": "Status", "apiVersion": "v1", "status": "Failure",
+                                     "reason": reason, "message": message, "code": code}).encode())
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = dict(parse_qsl(parts.query))
+        m = PATH_RE.match(parts.path)
+        if not m:
+            return self._status(404, "NotFound", f"no route for {parts.path}")
+        ns, resource, name, sub = m.group("ns"), m.group("resource"), m.group("name"), m.group("sub")
+        if name:
+            obj = self.cluster.get(resource, ns, name)
+            if obj is None:
+                return self._status(404, "NotFound", f'{resource} "{name}" not found')
+            if sub == "log":
+                tail = int(query["tailLines"]) if "tailLines" in query else None
+                return self._send(200, self.cluster.log(ns, name, tail).encode(), "text/plain")
+            return self._send(200, json.dumps(obj).encode())
+
+        items = [o for o in self.cluster.items(resource, ns) if _matches(o, query.get("labelSelector"), query.get("fieldSelector"))]
+        start = int(query.get("continue") or 0)
+        limit = int(query.get("limit") or 0) or len(items)
+        page = items[start:start + limit]
+        meta = {"resourceVersion": RESOURCE_VERSION}
+        if start + limit < len(items):
+            meta["continue"] = str(start + limit)
+        if "as=PartialObjectMetadataList" in (self.headers.get("Accept") or ""):
+            body = {"kind": "PartialObjectMetadataList", "apiVersion": "meta.k8s.io/v1", "metadata": meta,
+                    "items": [{"metadata": o["metadata"]} for o in page]}
+        else:
+            body = {"kind": "List", "apiVersion": "v1", "metadata": meta, "items": page}
+        self._send(200, json.dumps(body).encode())
+
+
+def serve(cluster: SyntheticCluster, port: int = 0) -> Tuple[ThreadingHTTPServer, threading.Thread]:
+    """
+    Start the server on 127.0.0.1:port (0 = any free port) in a daemon thread.
+    """
+    handler = type("BoundHandler", (Handler,), {"cluster": cluster})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="fake-kube-api", daemon=True)
+    thread.start()
+    return server, thread
+
+
+def write_kubeconfig(path: str, port: int, namespace: str = "bench-0000"):
+    # JSON is valid YAML, so both clients read it (and kube_lite needs no PyYAML).
+    kc = {
+        "apiVersion": "v1",
+        "kind": "Config",
+        "current-context": "fake",
+        "clusters": [{"name": "fake", "cluster": {"server": f"http://127.0.0.1:{port}"}}],
+        "users": [{"name": "fake", "user": {"token": "fake"}}],
+        "contexts": [{"name": "fake", "context": {"cluster": "fake", "user": "fake", "namespace": namespace}}],
+    }
+    with open(path, "w") as fh:
+        json.dump(kc, fh, indent=2)
+        fh.write("\n")
+
+
+def add_cluster_args(parser: argparse.ArgumentParser):
+    parser.add_argument("--namespaces", type=int, default=20, help="Namespaces, one OpenClaw release each (default: 20)")
+    parser.add_argument("--replicas", type=int, default=1, help="Pods per release (default: 1)")
+    parser.add_argument("--noise-pods", type=int, default=50, help="Unrelated pods per namespace (default: 50)")
+    parser.add_argument("--ingresses", type=int, default=10, help="Unrelated ingresses per namespace (default: 10)")
+    parser.add_argument("--secrets", type=int, default=20, help="Unrelated secrets per namespace (default: 20)")
+    parser.add_argument("--events-per-pod", type=int, default=5, help="Events per release pod (default: 5)")
+
+
+def cluster_from_args(args: argparse.Namespace) -> SyntheticCluster:
+    return SyntheticCluster(
+        namespaces=args.namespaces,
+        replicas=args.replicas,
+        noise_pods=args.noise_pods,
+        ingresses=args.ingresses,
+        secrets=args.secrets,
+        events_per_pod=args.events_per_pod,
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Serve a synthetic Kubernetes API for openclaw_diag.py")
+    add_cluster_args(parser)
+    parser.add_argument("--port", type=int, default=18080, help="Listen port on 127.0.0.1 (default: 18080)")
+    parser.add_argument("--kubeconfig", default=None, help="Also write a kubeconfig pointing at the server to this path")
+    args = parser.parse_args()
+
+    cluster = cluster_from_args(args)
+    server, thread = serve(cluster, args.port)
+    port = server.server_address[1]
+    if args.kubeconfig:
+        write_kubeconfig(args.kubeconfig, port)
+    print(f"Serving {args.namespaces} namespace(s), {cluster.count('pods')} pods, {cluster.count('ingresses')} ingresses, "
+          f"{cluster.count('secrets')} secrets on http://127.0.0.1:{port} (Ctrl-C to stop)")
+    try:
+        thread.join()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
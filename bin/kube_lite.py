@@ -0,0 +1,641 @@
+#!/usr/bin/env python3
+"""
+kube_lite.py
+
+Minimal stand-in for the parts of the official `kubernetes` package that
+openclaw_diag.py uses (`--backend lean`):
+
+- CoreV1Api / AppsV1Api / NetworkingV1Api with the list/read/log calls diag makes
+- ApiClient.request / ApiClient.call_api with the same signatures
+- Watch, ApiException, load_incluster_config, load_kube_config, list_kube_config_contexts
+- load_snapshot: answer requests from a snapshot recorded with
+  `openclaw_diag.py --record` instead of a cluster (`openclaw_diag.py --replay PATH`)
+
+It only imports the standard library (plus PyYAML if present for kubeconfig),
+keeps a small pool of keep-alive HTTPS connections, and returns JSON wrapped
+in objects that accept the client's snake_case attribute names
+(pod.status.pod_ip, sts.spec.selector.match_labels, ...).
+
+Kubeconfigs it cannot handle (exec/auth-provider plugins, proxies, merged
+KUBECONFIG lists) raise UnsupportedConfig so the caller can fall back to
+the official client.
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import http.client
+import json
+import os
+import queue
+import ssl
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit
+
+USER_AGENT = "openclaw-diag/kube-lite"
+SA_DIR = "/var/run/secrets/kubernetes.io/serviceaccount"
+TOKEN_REFRESH_SECONDS = 60
+DEFAULT_POOL_SIZE = 8
+SNAPSHOT_VERSION = 1
+
+# Fields whose values are free-form maps; returned as plain dicts, not wrapped.
+MAP_FIELDS = {"labels", "annotations", "data", "stringData", "binaryData", "matchLabels", "limits", "requests", "nodeSelector", "usage"}
+# snake_case names whose camelCase form is not a plain conversion.
+ALIASES = {
+    "pod_ip": "podIP",
+    "pod_i_ps": "podIPs",
+    "host_ip": "hostIP",
+    "cluster_ip": "clusterIP",
+    "cluster_i_ps": "clusterIPs",
+    "external_i_ps": "externalIPs",
+    "load_balancer_ip": "loadBalancerIP",
+    "container_id": "containerID",
+    "image_id": "imageID",
+}
+
+
+class ConfigException(Exception):
+    pass
+
+
+class UnsupportedConfig(ConfigException):
+    """The kubeconfig needs features only the official client implements."""
+
+
+class ApiException(Exception):
+    def __init__(self, status: Optional[int] = None, reason: Optional[str] = None, http_resp: Any = None):
+        if http_resp is not None:
+            self.status = http_resp.status
+            self.reason = http_resp.reason
+            self.body = http_resp.data
+            self.headers = http_resp.getheaders()
+        else:
+            self.status = status
+            self.reason = reason
+            self.body = None
+            self.headers = None
+        super().__init__(f"({self.status})\nReason: {self.reason}\n")
+
+
+def camel(name: str) -> str:
+    if name in ALIASES:
+        return ALIASES[name]
+    head, *rest = name.lstrip("_").split("_")
+    return head + "".join(w[:1].upper() + w[1:] for w in rest)
+
+
+class KubeObject:
+    """
+    Read-only view over a JSON object that answers snake_case attribute access.
+    Missing fields read as None, like unset fields on the client's models.
+    """
+
+    __slots__ = ("_raw",)
+
+    def __init__(self, raw: Dict[str, Any]):
+        self._raw = raw
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        key = camel(name)
+        value = self._raw.get(key)
+        if key in MAP_FIELDS:
+            return value
+        return wrap(value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._raw
+
+    def __repr__(self) -> str:
+        return f"KubeObject({self._raw!r})"
+
+
+def wrap(value: Any) -> Any:
+    if isinstance(value, dict):
+        return KubeObject(value)
+    if isinstance(value, list):
+        return [wrap(v) for v in value]
+    return value
+
+
+# -- configuration -------------------------------------------------------------
+
+
+class Configuration:
+    def __init__(self):
+        self.host = ""
+        self.ssl_context: Optional[ssl.SSLContext] = None
+        self.token: Optional[str] = None
+        self.token_file: Optional[str] = None
+        # request_key() -> {"status", "reason", "body"} when replaying a snapshot.
+        self.snapshot: Optional[Dict[str, Dict[str, Any]]] = None
+        self._token_read_at = 0.0
+
+    def auth_header(self) -> Optional[str]:
+        if self.token_file:
+            # Projected service-account tokens rotate; re-read them periodically.
+            if self.token is None or time.monotonic() - self._token_read_at > TOKEN_REFRESH_SECONDS:
+                with open(self.token_file) as fh:
+                    self.token = fh.read().strip()
+                self._token_read_at = time.monotonic()
+        return f"Bearer {self.token}" if self.token else None
+
+
+_default_config: Optional[Configuration] = None
+_default_client: Optional["ApiClient"] = None
+_default_lock = threading.Lock()
+
+
+def _ssl_context(ca_file: Optional[str] = None, ca_data: Optional[str] = None, insecure: bool = False) -> ssl.SSLContext:
+    ctx = ssl.create_default_context(cafile=ca_file, cadata=ca_data)
+    if insecure:
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+    return ctx
+
+
+def _load_cert_chain(ctx: ssl.SSLContext, cert_pem: bytes, key_pem: bytes):
+    # ssl only loads client certs from files; keep them on disk just long enough.
+    with tempfile.TemporaryDirectory() as tmp:
+        cert_path = os.path.join(tmp, "client.crt")
+        key_path = os.path.join(tmp, "client.key")
+        with open(cert_path, "wb") as fh:
+            fh.write(cert_pem)
+        with open(key_path, "wb") as fh:
+            fh.write(key_pem)
+        os.chmod(key_path, 0o600)
+        ctx.load_cert_chain(cert_path, key_path)
+
+
+def _set_default(cfg: Configuration):
+    global _default_config, _default_client
+    with _default_lock:
+        _default_config = cfg
+        _default_client = None
+
+
+def load_incluster_config():
+    host = os.environ.get("KUBERNETES_SERVICE_HOST")
+    port = os.environ.get("KUBERNETES_SERVICE_PORT")
+    token_file = os.path.join(SA_DIR, "token")
+    if not host or not port or not os.path.exists(token_file):
+        raise ConfigException("Service host/port or token file is not set.")
+    if ":" in host:
+        host = f"[{host}]"
+    cfg = Configuration()
+    cfg.host = f"https://{host}:{port}"
+    cfg.ssl_context = _ssl_context(ca_file=os.path.join(SA_DIR, "ca.crt"))
+    cfg.token_file = token_file
+    _set_default(cfg)
+
+
+def _kubeconfig_path(config_file: Optional[str]) -> str:
+    if config_file:
+        return os.path.expanduser(config_file)
+    env = os.environ.get("KUBECONFIG")
+    if env:
+        paths = [p for p in env.split(os.pathsep) if p]
+        if len(paths) > 1:
+            raise UnsupportedConfig("merged KUBECONFIG lists are not supported")
+        return os.path.expanduser(paths[0])
+    return os.path.expanduser("~/.kube/config")
+
+
+def _read_kubeconfig(config_file: Optional[str] = None) -> Tuple[Dict[str, Any], str]:
+    path = _kubeconfig_path(config_file)
+    if not os.path.exists(path):
+        raise ConfigException(f"Invalid kube-config file. No configuration found at {path}.")
+    with open(path) as fh:
+        text = fh.read()
+    try:
+        import yaml
+    except ImportError:
+        # Without PyYAML only JSON kubeconfigs can be read.
+        try:
+            return json.loads(text), path
+        except ValueError:
+            raise UnsupportedConfig("PyYAML is required to read YAML kubeconfigs")
+    return yaml.safe_load(text) or {}, path
+
+
+def _named(items: List[Dict[str, Any]], name: str, kind: str) -> Dict[str, Any]:
+    for item in items or []:
+        if item.get("name") == name:
+            return item.get(kind) or {}
+    raise ConfigException(f"Invalid kube-config file. Expected {kind} {name!r} to exist.")
+
+
+def list_kube_config_contexts(config_file: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    kc, _ = _read_kubeconfig(config_file)
+    contexts = kc.get("contexts") or []
+    current = kc.get("current-context")
+    active = next((c for c in contexts if c.get("name") == current), None)
+    return contexts, active
+
+
+def _file_or_data(entry: Dict[str, Any], key: str, base_dir: str) -> Optional[bytes]:
+    if entry.get(f"{key}-data"):
+        return base64.b64decode(entry[f"{key}-data"])
+    if entry.get(key):
+        path = entry[key]
+        if not os.path.isabs(path):
+            path = os.path.join(base_dir, path)
+        with open(path, "rb") as fh:
+            return fh.read()
+    return None
+
+
+def load_kube_config(config_file: Optional[str] = None, context: Optional[str] = None):
+    kc, path = _read_kubeconfig(config_file)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    ctx_name = context or kc.get("current-context")
+    ctx = _named(kc.get("contexts"), ctx_name, "context")
+    cluster = _named(kc.get("clusters"), ctx.get("cluster"), "cluster")
+    user = _named(kc.get("users"), ctx.get("user"), "user") if ctx.get("user") else {}
+
+    if user.get("exec") or user.get("auth-provider"):
+        raise UnsupportedConfig("exec/auth-provider credentials need the official client")
+    if user.get("username") or user.get("password"):
+        raise UnsupportedConfig("basic auth needs the official client")
+    if cluster.get("proxy-url"):
+        raise UnsupportedConfig("proxy-url needs the official client")
+
+    cfg = Configuration()
+    cfg.host = (cluster.get("server") or "").rstrip("/")
+    if not cfg.host.startswith(("https://", "http://")):
+        raise UnsupportedConfig(f"only http(s) servers are supported (got {cfg.host!r})")
+    ca = _file_or_data(cluster, "certificate-authority", base_dir)
+    cfg.ssl_context = _ssl_context(
+        ca_data=ca.decode("utf-8") if ca else None,
+        insecure=bool(cluster.get("insecure-skip-tls-verify")),
+    )
+    cert = _file_or_data(user, "client-certificate", base_dir)
+    key = _file_or_data(user, "client-key", base_dir)
+    if cert and key:
+        _load_cert_chain(cfg.ssl_context, cert, key)
+    if user.get("token"):
+        cfg.token = user["token"]
+    elif user.get("tokenFile"):
+        cfg.token_file = user["tokenFile"]
+    _set_default(cfg)
+
+
+# -- HTTP ------------------------------------------------------------------------
+
+
+class RESTResponse:
+    """
+    Fully-read response; mirrors the official client's RESTResponse.
+    """
+
+    def __init__(self, resp: http.client.HTTPResponse, data: bytes):
+        self.urllib3_response = resp
+        self.status = resp.status
+        self.reason = resp.reason
+        self.data = data
+
+    def getheaders(self):
+        return self.urllib3_response.headers
+
+    def getheader(self, name: str, default: Optional[str] = None):
+        return self.urllib3_response.headers.get(name, default)
+
+
+class StreamingResponse:
+    """
+    Unread response for _preload_content=False (logs, watches). Owns its
+    connection until release_conn().
+    """
+
+    def __init__(self, resp: http.client.HTTPResponse, conn: http.client.HTTPConnection):
+        self._resp = resp
+        self._conn = conn
+        self.status = resp.status
+        self.reason = resp.reason
+        self.headers = resp.headers
+
+    def stream(self, amt: int = 2 ** 16) -> Iterator[bytes]:
+        while True:
+            chunk = self._resp.read1(amt)
+            if not chunk:
+                return
+            yield chunk
+
+    def read(self) -> bytes:
+        return self._resp.read()
+
+    def release_conn(self):
+        # Partially-read bodies can't be reused for keep-alive; drop the socket.
+        self._conn.close()
+
+    close = release_conn
+
+
+class _ConnectionPool:
+    def __init__(self, cfg: Configuration, size: int):
+        parts = urlsplit(cfg.host)
+        # Plain http is only for local endpoints such as `kubectl proxy`.
+        self.https = parts.scheme == "https"
+        self.hostname = parts.hostname
+        self.port = parts.port or (443 if self.https else 80)
+        self.ssl_context = cfg.ssl_context
+        self.size = size
+        self._idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue()
+
+    def get(self) -> http.client.HTTPConnection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            if not self.https:
+                return http.client.HTTPConnection(self.hostname, self.port)
+            return http.client.HTTPSConnection(self.hostname, self.port, context=self.ssl_context)
+
+    def put(self, conn: http.client.HTTPConnection):
+        if self._idle.qsize() < self.size:
+            self._idle.put(conn)
+        else:
+            conn.close()
+
+
+def _timeout(value: Any) -> Optional[float]:
+    if isinstance(value, (tuple, list)):
+        return max(v for v in value if v is not None) if any(v is not None for v in value) else None
+    return value
+
+
+def _query_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+class ApiClient:
+    def __init__(self, configuration: Optional[Configuration] = None, pool_size: int = DEFAULT_POOL_SIZE):
+        self.configuration = configuration or _default_config
+        if self.configuration is None:
+            raise ConfigException("No configuration loaded; call load_incluster_config() or load_kube_config() first.")
+        self._pool = _ConnectionPool(self.configuration, pool_size) if self.configuration.snapshot is None else None
+
+    def request(self, method, url, query_params=None, headers=None, post_params=None, body=None, _preload_content=True, _request_timeout=None):
+        if self.configuration.snapshot is not None:
+            return self._replay(method, url, query_params, headers)
+        parts = urlsplit(url)
+        target = parts.path
+        if query_params:
+            target += "?" + urlencode([(k, _query_value(v)) for k, v in query_params])
+        elif parts.query:
+            target += "?" + parts.query
+        hdrs = {"Accept": "application/json", "User-Agent": USER_AGENT}
+        auth = self.configuration.auth_header()
+        if auth:
+            hdrs["Authorization"] = auth
+        hdrs.update(headers or {})
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            hdrs.setdefault("Content-Type", "application/json")
+        timeout = _timeout(_request_timeout)
+
+        for attempt in range(2):
+            conn = self._pool.get()
+            reused = conn.sock is not None
+            conn.timeout = timeout
+            try:
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                conn.request(method, target, body=payload, headers=hdrs)
+                resp = conn.getresponse()
+                break
+            except (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                # A pooled keep-alive socket the server already closed: retry once on a fresh one.
+                if reused and attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+
+        if not _preload_content and 200 <= resp.status <= 299:
+            return StreamingResponse(resp, conn)
+        data = resp.read()
+        if resp.will_close:
+            conn.close()
+        else:
+            self._pool.put(conn)
+        r = RESTResponse(resp, data)
+        if not 200 <= r.status <= 299:
+            raise ApiException(http_resp=r)
+        return r
+
+    def _replay(self, method, url, query_params, headers) -> RESTResponse:
+        key = request_key(method, url, query_params, headers)
+        entry = self.configuration.snapshot.get(key)
+        if entry is None:
+            raise ApiException(status=404, reason=f"Not Found (not in snapshot: {key})")
+        r = RESTResponse(_RecordedResponse(entry["status"], entry.get("reason")), entry["body"].encode("utf-8"))
+        if not 200 <= r.status <= 299:
+            raise ApiException(http_resp=r)
+        return r
+
+    def call_api(self, resource_path, method, path_params=None, query_params=None, header_params=None, body=None,
+                 post_params=None, files=None, response_type=None, auth_settings=None, async_req=None,
+                 _return_http_data_only=None, collection_formats=None, _preload_content=True,
+                 _request_timeout=None, _host=None):
+        path = resource_path
+        for k, v in (path_params or {}).items():
+            path = path.replace("{%s}" % k, quote(str(v), safe=""))
+        resp = self.request(
+            method, self.configuration.host + path,
+            query_params=query_params, headers=header_params, body=body,
+            _preload_content=_preload_content, _request_timeout=_request_timeout,
+        )
+        if not _preload_content:
+            return resp
+        if response_type == "str":
+            data = resp.data.decode("utf-8", errors="replace")
+        elif response_type == "object":
+            data = json.loads(resp.data or b"null")
+        else:
+            data = wrap(json.loads(resp.data or b"null"))
+        if _return_http_data_only:
+            return data
+        return data, resp.status, resp.getheaders()
+
+
+# -- snapshots -----------------------------------------------------------------------
+
+
+class _RecordedResponse:
+    def __init__(self, status: int, reason: Optional[str]):
+        self.status = status
+        self.reason = reason
+        self.headers = {"Content-Type": "application/json"}
+
+
+def request_key(method: str, url: str, query_params: Any = None, headers: Optional[Dict[str, str]] = None) -> str:
+    """
+    Snapshot key for a request: verb, path and sorted query, plus the Accept
+    header when it asks for a different representation (as=PartialObjectMetadataList).
+    Host and the official/lean client's differences in value spelling drop out.
+    """
+    parts = urlsplit(url)
+    if query_params:
+        query = [(k, _query_value(v)) for k, v in query_params if v is not None]
+    else:
+        query = parse_qsl(parts.query)
+    key = f"{method.upper()} {parts.path}"
+    if query:
+        key += "?" + urlencode(sorted(query))
+    accept = (headers or {}).get("Accept") or ""
+    if "as=" in accept:
+        key += f" [{accept}]"
+    return key
+
+
+def read_snapshot(path: str) -> Dict[str, Any]:
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        snap = json.load(fh)
+    if snap.get("version") != SNAPSHOT_VERSION:
+        raise ConfigException(f"{path}: unsupported snapshot version {snap.get('version')!r}")
+    return snap
+
+
+def write_snapshot(path: str, snap: Dict[str, Any]):
+    snap = dict(snap, version=SNAPSHOT_VERSION)
+    tmp = f"{path}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as fh:
+        json.dump(snap, fh, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def load_snapshot(path: str) -> Dict[str, Any]:
+    """
+    Make every ApiClient answer from the snapshot at path. Returns the
+    snapshot so the caller can read what it recorded (namespace, argv).
+    """
+    snap = read_snapshot(path)
+    cfg = Configuration()
+    cfg.host = "http://snapshot.invalid"
+    cfg.snapshot = snap.get("responses") or {}
+    _set_default(cfg)
+    return snap
+
+
+def _shared_client() -> ApiClient:
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = ApiClient()
+        return _default_client
+
+
+# -- typed APIs --------------------------------------------------------------------
+
+
+class _Api:
+    def __init__(self, api_client: Optional[ApiClient] = None):
+        # One shared client, so every API object reuses the same connection pool.
+        self.api_client = api_client or _shared_client()
+
+    def _get(self, path: str, path_params: Dict[str, str], kwargs: Dict[str, Any], response_type: Optional[str] = None):
+        preload = kwargs.pop("_preload_content", True)
+        timeout = kwargs.pop("_request_timeout", None)
+        query = [(camel(k), v) for k, v in kwargs.items() if v is not None]
+        return self.api_client.call_api(
+            path, "GET",
+            path_params=path_params,
+            query_params=query,
+            response_type=response_type,
+            _return_http_data_only=True,
+            _preload_content=preload,
+            _request_timeout=timeout,
+        )
+
+
+def _read(path: str):
+    def method(self, name, namespace, **kwargs):
+        return self._get(path, {"namespace": namespace, "name": name}, kwargs)
+    return method
+
+
+def _list_namespaced(path: str):
+    def method(self, namespace, **kwargs):
+        return self._get(path, {"namespace": namespace}, kwargs)
+    return method
+
+
+def _list_all(path: str):
+    def method(self, **kwargs):
+        return self._get(path, {}, kwargs)
+    return method
+
+
+class CoreV1Api(_Api):
+    read_namespaced_secret = _read("/api/v1/namespaces/{namespace}/secrets/{name}")
+    list_namespaced_secret = _list_namespaced("/api/v1/namespaces/{namespace}/secrets")
+    read_namespaced_service = _read("/api/v1/namespaces/{namespace}/services/{name}")
+    list_namespaced_service = _list_namespaced("/api/v1/namespaces/{namespace}/services")
+    list_service_for_all_namespaces = _list_all("/api/v1/services")
+    read_namespaced_pod = _read("/api/v1/namespaces/{namespace}/pods/{name}")
+    list_namespaced_pod = _list_namespaced("/api/v1/namespaces/{namespace}/pods")
+    list_pod_for_all_namespaces = _list_all("/api/v1/pods")
+    list_namespaced_event = _list_namespaced("/api/v1/namespaces/{namespace}/events")
+
+    def read_namespaced_pod_log(self, name, namespace, **kwargs):
+        return self._get("/api/v1/namespaces/{namespace}/pods/{name}/log", {"namespace": namespace, "name": name}, kwargs, response_type="str")
+
+
+class AppsV1Api(_Api):
+    read_namespaced_stateful_set = _read("/apis/apps/v1/namespaces/{namespace}/statefulsets/{name}")
+    list_namespaced_stateful_set = _list_namespaced("/apis/apps/v1/namespaces/{namespace}/statefulsets")
+    list_stateful_set_for_all_namespaces = _list_all("/apis/apps/v1/statefulsets")
+
+
+class NetworkingV1Api(_Api):
+    read_namespaced_ingress = _read("/apis/networking.k8s.io/v1/namespaces/{namespace}/ingresses/{name}")
+    list_namespaced_ingress = _list_namespaced("/apis/networking.k8s.io/v1/namespaces/{namespace}/ingresses")
+    list_ingress_for_all_namespaces = _list_all("/apis/networking.k8s.io/v1/ingresses")
+
+
+# -- watch -------------------------------------------------------------------------
+
+
+class Watch:
+    """
+    Same calling convention as kubernetes.watch.Watch: stream(list_fn, **kwargs)
+    yields {"type", "object", "raw_object"} per event.
+    """
+
+    def __init__(self):
+        self._stop = False
+        self._resp: Optional[StreamingResponse] = None
+
+    def stop(self):
+        self._stop = True
+
+    def stream(self, func, *args, **kwargs) -> Iterator[Dict[str, Any]]:
+        self._stop = False
+        kwargs["watch"] = True
+        kwargs["_preload_content"] = False
+        self._resp = func(*args, **kwargs)
+        partial = b""
+        try:
+            for chunk in self._resp.stream():
+                partial += chunk
+                *lines, partial = partial.split(b"\n")
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    raw = json.loads(line)
+                    obj = raw.get("object") or {}
+                    yield {"type": raw.get("type"), "object": wrap(obj), "raw_object": obj}
+                    if self._stop:
+                        return
+        finally:
+            self._resp.release_conn()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Minimal OCI distribution API client (read-only, stdlib only).
+
+Resolves tags to manifest digests and reads image config labels, for
+update_openclaw_tag.py --pin-digest and the configure.py build planner.
+
+Registries on localhost are spoken to over plain HTTP. Bearer-token
+challenges are answered anonymously, or with REGISTRY_USERNAME and
+REGISTRY_PASSWORD, or with the static "auth" entry for the registry in
+~/.docker/config.json (credential helpers are not consulted).
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+import re
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+TIMEOUT = 15
+INDEX_TYPES = (
+    "application/vnd.oci.image.index.v1+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+)
+MANIFEST_TYPES = (
+    "application/vnd.oci.image.manifest.v1+json",
+    "application/vnd.docker.distribution.manifest.v2+json",
+)
+DIGEST_RE = re.compile(r"^sha256:[0-9a-f]{64}$")
+CHALLENGE_RE = re.compile(r'(\w+)="([^"]*)"')
+USER_AGENT = "openclaw-kube"
+
+# (registry, repository) -> bearer token, reused across requests in one run.
+_tokens: Dict[Tuple[str, str], str] = {}
+
+
+class RegistryError(RuntimeError):
+    def __init__(self, message: str, status: int = 0):
+        super().__init__(message)
+        self.status = status
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+def split_reference(ref: str) -> Tuple[str, str]:
+    """"ghcr.io/openclaw/openclaw" -> ("ghcr.io", "openclaw/openclaw"); bare names are Docker Hub."""
+    first, _, rest = ref.partition("/")
+    if rest and ("." in first or ":" in first or first == "localhost"):
+        return first, rest
+    return "docker.io", ref
+
+
+def registry_base(registry: str) -> str:
+    host = "registry-1.docker.io" if registry in ("docker.io", "index.docker.io") else registry
+    local = host.split(":")[0] in ("localhost", "127.0.0.1", "::1")
+    return f"{'http' if local else 'https'}://{host}"
+
+
+def repository_path(registry: str, repository: str) -> str:
+    if registry in ("docker.io", "index.docker.io") and "/" not in repository:
+        return f"library/{repository}"
+    return repository
+
+
+def basic_credentials(registry: str) -> Optional[str]:
+    user, password = os.environ.get("REGISTRY_USERNAME"), os.environ.get("REGISTRY_PASSWORD")
+    if user and password:
+        return base64.b64encode(f"{user}:{password}".encode()).decode()
+    config = Path(os.environ.get("DOCKER_CONFIG") or Path.home() / ".docker") / "config.json"
+    try:
+        auths = json.loads(config.read_text()).get("auths", {})
+    except (OSError, ValueError):
+        return None
+    for key in (registry, f"https://{registry}", "https://index.docker.io/v1/" if registry == "docker.io" else None):
+        if key and auths.get(key, {}).get("auth"):
+            return auths[key]["auth"]
+    return None
+
+
+def bearer_token(registry: str, challenge: str, timeout: float) -> str:
+    # WWW-Authenticate: Bearer realm="https://ghcr.io/token",service="ghcr.io",scope="repository:x:pull"
+    params = dict(CHALLENGE_RE.findall(challenge))
+    if "realm" not in params:
+        raise RegistryError(f"Unsupported registry auth challenge: {challenge}")
+    query = urllib.parse.urlencode({k: v for k, v in params.items() if k in ("service", "scope")})
+    req = urllib.request.Request(f"{params['realm']}?{query}", headers={"User-Agent": USER_AGENT})
+    credentials = basic_credentials(registry)
+    if credentials:
+        req.add_header("Authorization", f"Basic {credentials}")
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        data = json.loads(resp.read().decode("utf-8"))
+    token = data.get("token") or data.get("access_token")
+    if not token:
+        raise RegistryError(f"No token from {params['realm']}")
+    return token
+
+
+def registry_get(registry: str, repository: str, path: str, accept: str = "*/*",
+                 timeout: float = TIMEOUT) -> Tuple[bytes, dict]:
+    """GET /v2/<repository>/<path>, answering one auth challenge; returns (body, headers).
+
+    Redirects (blob storage) are followed without the registry's Authorization header.
+    """
+    repository = repository_path(registry, repository)
+    url = f"{registry_base(registry)}/v2/{repository}/{path}"
+    opener = urllib.request.build_opener(_NoRedirect)
+    for attempt in range(2):
+        headers = {"Accept": accept, "User-Agent": USER_AGENT}
+        token = _tokens.get((registry, repository))
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        try:
+            with opener.open(urllib.request.Request(url, headers=headers), timeout=timeout) as resp:
+                return resp.read(), dict(resp.headers)
+        except urllib.error.HTTPError as e:
+            if e.code in (301, 302, 303, 307, 308) and e.headers.get("Location"):
+                location = urllib.parse.urljoin(url, e.headers["Location"])
+                req = urllib.request.Request(location, headers={"User-Agent": USER_AGENT})
+                with urllib.request.urlopen(req, timeout=timeout) as resp:
+                    return resp.read(), dict(resp.headers)
+            challenge = e.headers.get("WWW-Authenticate", "")
+            if e.code == 401 and attempt == 0 and challenge.lower().startswith("bearer "):
+                _tokens[(registry, repository)] = bearer_token(registry, challenge, timeout)
+                continue
+            raise RegistryError(f"{url}: {e.code} {e.reason}", e.code) from None
+    raise RegistryError(f"{url}: unauthorized", 401)
+
+
+def fetch_manifest(registry: str, repository: str, reference: str, timeout: float = TIMEOUT) -> Tuple[dict, str, str]:
+    """GET a manifest or index; returns (body, media type, digest)."""
+    raw, headers = registry_get(registry, repository, f"manifests/{reference}",
+                                ", ".join(INDEX_TYPES + MANIFEST_TYPES), timeout)
+    body = json.loads(raw.decode("utf-8"))
+    media_type = headers.get("Content-Type", "").split(";")[0] or body.get("mediaType", "")
+    # The registry's digest header is optional; the digest is always sha256 of the bytes served.
+    digest = headers.get("Docker-Content-Digest") or "sha256:" + hashlib.sha256(raw).hexdigest()
+    return body, media_type, digest
+
+
+def resolve_digests(registry: str, repository: str, tag: str, timeout: float = TIMEOUT) -> Tuple[str, Dict[str, str]]:
+    """Returns (digest of what the tag points at, {"os/arch[/variant]": manifest digest})."""
+    body, media_type, digest = fetch_manifest(registry, repository, tag, timeout)
+    if media_type not in INDEX_TYPES and "manifests" not in body:
+        return digest, {}
+    platforms = {}
+    for entry in body.get("manifests", []):
+        plat = entry.get("platform") or {}
+        if plat.get("os") in (None, "unknown"):
+            continue  # attestation manifests
+        name = "/".join(p for p in (plat.get("os"), plat.get("architecture"), plat.get("variant")) if p)
+        platforms[name] = entry["digest"]
+    return digest, platforms
+
+
+def pick_digest(index_digest: str, platforms: Dict[str, str], platform: str) -> str:
+    if platform == "index" or not platforms:
+        return index_digest
+    if platform in platforms:
+        return platforms[platform]
+    raise RegistryError(f"No {platform} manifest; available: {', '.join(sorted(platforms))}")
+
+
+def image_labels(registry: str, repository: str, reference: str, platform: str,
+                 timeout: float = TIMEOUT) -> Dict[str, str]:
+    """Config labels of the image for `platform` behind a tag or digest."""
+    index_digest, platforms = resolve_digests(registry, repository, reference, timeout)
+    body, _, _ = fetch_manifest(registry, repository, pick_digest(index_digest, platforms, platform), timeout)
+    raw, _ = registry_get(registry, repository, f"blobs/{body['config']['digest']}", timeout=timeout)
+    return (json.loads(raw.decode("utf-8")).get("config") or {}).get("Labels") or {}
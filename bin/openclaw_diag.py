@@ -4,6 +4,10 @@ openclaw_diag.py
 
 Diagnostics for an OpenClaw StatefulSet using the Kubernetes Python client.
 - No kubectl required
+- --backend lean (or OPENCLAW_DIAG_BACKEND=lean) skips importing the `kubernetes`
+  package and uses the small pooled HTTP client in kube_lite.py instead
+- --replay runs the report against a snapshot taken with --record (kube_lite
+  answers from the file), for offline debugging and benchmarks (bench_diag.py)
 - Defaults namespace to current kubeconfig context namespace (or "default")
 - Defaults statefulset name to "openclaw"
 
@@ -12,28 +16,137 @@ Usage examples:
   python openclaw_diag.py -n jeffw -s openclaw
   python openclaw_diag.py --print-token
   python openclaw_diag.py --tail-logs 200
+  python openclaw_diag.py --serial          # one API call at a time (old behaviour)
+  python openclaw_diag.py --all-namespaces  # fleet summary of every OpenClaw release
+  python openclaw_diag.py -A --selector app.kubernetes.io/instance=team-a --full-report
+  python openclaw_diag.py --watch           # report once, then stream incremental changes
+  python openclaw_diag.py --follow --grep 'error|warn' --since 10m
+  python openclaw_diag.py --profile --profile-json diag-profile.json
+  python openclaw_diag.py --backend lean    # fast start, e.g. as an in-cluster probe/CronJob
+  python openclaw_diag.py --probe --probe-requests 500 --probe-concurrency 20
+  python openclaw_diag.py --timeline        # per-pod startup breakdown (schedule, pull, init, probes)
+  python openclaw_diag.py -A --timeline     # fleet-wide startup percentiles
+  python openclaw_diag.py --sizing --sizing-window 10m --metrics-record metrics.json
+  python openclaw_diag.py --sizing --metrics-file metrics.json   # replay recorded samples
+  python openclaw_diag.py --record run.snap.gz   # save every API response of this run
+  python openclaw_diag.py --replay run.snap.gz   # same report from the snapshot, no cluster
+  python openclaw_diag.py --deadline 60s --request-timeout 10   # bounded run during API brownouts
 """
 
 from __future__ import annotations
 
 import argparse
+import atexit
 import base64
+import functools
+import http.client
+import json
+import math
 import os
+import random
 import re
+import ssl
 import sys
-from typing import Dict, List, Optional, Tuple
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
 
-from kubernetes import client, config
-from kubernetes.client import ApiException
+# Bound by load_backend(): the official `kubernetes` package, or kube_lite.
+client: Any = None
+config: Any = None
+watch: Any = None
+ApiException: Any = None
+
+BACKENDS = ("kubernetes", "lean")
 
 
 TOKEN_NAME_RE = re.compile(r"(GATEWAY|OPENCLAW|CLAWDBOT).*(TOKEN|AUTH)", re.IGNORECASE)
 
+DEFAULT_WORKERS = 8
+# With this many distinct Secrets to read, try one label-selected list first.
+SECRET_LIST_THRESHOLD = 3
+LIST_PAGE_SIZE = 250
+# Ask the API server for names/labels only (falls back to full objects on very old servers).
+PARTIAL_METADATA_LIST = "application/json;as=PartialObjectMetadataList;g=meta.k8s.io;v=v1,application/json"
+INGRESS_PATH = "/apis/networking.k8s.io/v1/namespaces/{namespace}/ingresses"
+DEFAULT_FLEET_SELECTOR = "app.kubernetes.io/name=openclaw"
+WATCH_TIMEOUT_SECONDS = 300
+
+# Per-call timeout and retry policy (see Deadline).
+REQUEST_TIMEOUT = 15.0
+API_RETRIES = 4
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_BASE_SECONDS = 0.25
+RETRY_MAX_SECONDS = 8.0
+
+LOG_CHUNK_BYTES = 16 * 1024
+LOG_MAX_LINE_BYTES = 64 * 1024
+LOG_BUFFER_LINES = 1000
+LOG_DEFAULT_TAIL = 10
+# Lines are held this long before printing so lines from other streams with
+# earlier timestamps can still be merged in front of them.
+LOG_MERGE_HOLDBACK = 0.5
+
+DEFAULT_GATEWAY_PORT = 18789
+PROBE_REQUESTS = 200
+PROBE_CONCURRENCY = 10
+PROBE_TIMEOUT = 5.0
+
+DURATION_RE = re.compile(r"^(\d+)([smhd]?)$")
+# Kubelet "Pulled" events: 'Successfully pulled image "x" in 12.3s (12.3s including waiting)'
+PULLED_IN_RE = re.compile(r"\bin ((?:[\d.]+(?:h|ms|m|s|us|µs|ns))+)")
+GO_DURATION_PART_RE = re.compile(r"([\d.]+)(h|ms|m|s|us|µs|ns)")
+GO_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 1e-3, "us": 1e-6, "µs": 1e-6, "ns": 1e-9}
+POD_EVENTS_FIELD_SELECTOR = "involvedObject.kind=Pod"
+STATEFULSET_EVENTS_FIELD_SELECTOR = "involvedObject.kind=StatefulSet,involvedObject.name={name}"
+
+POD_METRICS_PATH = "/apis/metrics.k8s.io/v1beta1/namespaces/{namespace}/pods"
+SIZING_WINDOW = 300
+SIZING_INTERVAL = 15
+QUANTITY_RE = re.compile(r"^([+-]?[\d.]+(?:[eE][+-]?\d+)?)([a-zA-Z]*)$")
+QUANTITY_SUFFIXES = {
+    "": 1.0, "n": 1e-9, "u": 1e-6, "m": 1e-3, "k": 1e3, "M": 1e6, "G": 1e9, "T": 1e12,
+    "Ki": 2.0 ** 10, "Mi": 2.0 ** 20, "Gi": 2.0 ** 30, "Ti": 2.0 ** 40,
+}
+# Headroom over observed usage for requests (p90) and limits (max).
+REQUEST_HEADROOM = 1.2
+LIMIT_HEADROOM = 1.5
+# Share of the memory limit to give the V8 old space. Playwright's Chromium
+# processes run in the same container cgroup, so leave them a large share.
+# scripts/openclaw-gateway.py applies the same values at startup from the cgroup
+# limits; it ships alone in the image, so the tests check that the two agree.
+NODE_HEAP_FRACTION = 0.6
+MIN_UV_THREADPOOL = 4
+MAX_UV_THREADPOOL = 64
+
 
 def eprint(*args, **kwargs):
     print(*args, file=sys.stderr, **kwargs)
 
 
+def load_backend(name: str) -> float:
+    """
+    Import the API backend and bind client/config/watch/ApiException to it.
+    Returns the import time in seconds.
+    """
+    global client, config, watch, ApiException
+    t0 = time.perf_counter()
+    if name in ("lean", "replay"):
+        import kube_lite
+        client = config = watch = kube_lite
+        ApiException = kube_lite.ApiException
+    else:
+        from kubernetes import client as k8s_client, config as k8s_config, watch as k8s_watch
+        client, config, watch = k8s_client, k8s_config, k8s_watch
+        ApiException = k8s_client.ApiException
+    return time.perf_counter() - t0
+
+
 def load_k8s_config() -> Tuple[str, str]:
     """
     Loads Kubernetes configuration.
@@ -70,6 +183,17 @@ def fmt_kv(title: str, items: Dict[str, str], indent: int = 2):
         print(f"{pad}{k}: {v}")
 
 
+def api_error(ex: Exception) -> str:
+    """
+    "403 Forbidden", or just the reason for status-0 errors (timeouts, unreachable API).
+    """
+    return f"{ex.status} {ex.reason}" if ex.status else str(ex.reason)
+
+
+def is_timeout(ex: Exception) -> bool:
+    return bool(getattr(ex, "timed_out", False))
+
+
 def short_secret(value: str) -> str:
     if value is None:
         return "(none)"
@@ -78,10 +202,466 @@ def short_secret(value: str) -> str:
     return f"{value[:4]}…{value[-4:]} (len={len(value)})"
 
 
+class _Deferred:
+    """
+    Future-like wrapper that runs its call on the first result().
+    Used by --serial so each lookup happens at the point the report needs it.
+    """
+
+    def __init__(self, fn: Callable[[], Any]):
+        self._fn = fn
+        self._done = False
+        self._value: Any = None
+        self._exc: Optional[BaseException] = None
+
+    def result(self) -> Any:
+        if not self._done:
+            try:
+                self._value = self._fn()
+            except BaseException as ex:
+                self._exc = ex
+            self._done = True
+        if self._exc is not None:
+            raise self._exc
+        return self._value
+
+
+class Lookups:
+    """
+    Runs independent API lookups on a bounded thread pool.
+    Results are fetched by key, so the report is still printed in a fixed order;
+    exceptions raised by a lookup are re-raised from result().
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, serial: bool = False):
+        self.serial = serial
+        self._pool = None if serial else ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="diag")
+        self._pending: Dict[str, Any] = {}
+
+    def submit(self, key: str, fn: Callable[..., Any], *args, **kwargs):
+        if key in self._pending:
+            return self._pending[key]
+        if self._pool is None:
+            fut = _Deferred(functools.partial(fn, *args, **kwargs))
+        else:
+            fut = self._pool.submit(fn, *args, **kwargs)
+        self._pending[key] = fut
+        return fut
+
+    def result(self, key: str) -> Any:
+        return self._pending[key].result()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._pending
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def describe_request(method: str, url: str, query_params: Any = None) -> Tuple[str, str]:
+    """
+    (verb, resource) for an API URL, e.g. GET .../namespaces/x/pods/y/log -> ("get", "pods/log").
+    """
+    parts = urlsplit(url)
+    query = dict(query_params or []) if not isinstance(query_params, dict) else query_params
+    query.update(parse_qsl(parts.query))
+    segs = [p for p in parts.path.split("/") if p]
+    # /api/v1/... or /apis/<group>/<version>/...
+    rest = segs[2:] if segs[:1] == ["api"] else segs[3:]
+    if len(rest) >= 2 and rest[0] == "namespaces":
+        rest = rest[2:]
+    resource = rest[0] if rest else "?"
+    if len(rest) >= 3:
+        resource = f"{resource}/{rest[2]}"
+    if str(query.get("watch", "")).lower() in ("true", "1"):
+        verb = "watch"
+    elif method.upper() == "GET":
+        verb = "list" if len(rest) == 1 else "get"
+    else:
+        verb = method.lower()
+    return verb, resource
+
+
+def peak_rss_kb() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, KiB elsewhere.
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+class Profiler:
+    """
+    Wall time per report phase and per API request (--profile).
+
+    Requests are captured by wrapping ApiClient.request, so every API group,
+    list, watch and log call is covered without touching the call sites.
+    Deadline retries happen inside the wrapper, so a retried call is one row
+    with its attempts counted under RETRIES. When disabled, mark() and
+    friends are no-ops.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.t0 = time.perf_counter()
+        self.phases: List[Dict[str, Any]] = []
+        self.requests: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._current: Optional[Dict[str, Any]] = None
+        self._call = threading.local()
+
+    def add_phase(self, name: str, seconds: float):
+        if self.enabled:
+            self.phases.append({"phase": name, "seconds": seconds})
+
+    def mark(self, name: Optional[str]):
+        """
+        End the running phase and, unless name is None, start a new one.
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._current is not None:
+            self._current["seconds"] = now - self._current.pop("_start")
+            self.phases.append(self._current)
+        self._current = {"phase": name, "_start": now} if name else None
+
+    def flag(self, status: str):
+        """
+        Attach a status (e.g. "timed out") to the running phase.
+        """
+        if self.enabled and self._current is not None:
+            self._current["status"] = status
+
+    def note_retries(self, retries: int):
+        """
+        Retries made by Deadline for the request running on this thread.
+        """
+        if self.enabled:
+            self._call.retries = retries
+
+    def record(self, method: str, url: str, query_params: Any, start: float, status: Optional[int], resp: Any, retries: int = 0):
+        verb, resource = describe_request(method, url, query_params)
+        size = None
+        if resp is not None:
+            raw = getattr(resp, "urllib3_response", resp)
+            if hasattr(resp, "urllib3_response"):
+                size = len(resp.data or b"")
+            else:
+                # Streaming (_preload_content=False): don't touch .data, it would drain the body.
+                length = (raw.headers or {}).get("Content-Length") if hasattr(raw, "headers") else None
+                size = int(length) if length else None
+            # urllib3's own retries (official client); kube_lite has none.
+            history = getattr(getattr(raw, "retries", None), "history", None)
+            retries += len(history or ())
+        with self._lock:
+            self.requests.append({
+                "verb": verb,
+                "resource": resource,
+                "status": status,
+                "start": start - self.t0,
+                "seconds": time.perf_counter() - start,
+                "bytes": size,
+                "retries": retries,
+                "thread": threading.current_thread().name,
+            })
+
+    def install(self):
+        if not self.enabled:
+            return
+        original = client.ApiClient.request
+        prof = self
+
+        @functools.wraps(original)
+        def request(api_client, method, url, query_params=None, *args, **kwargs):
+            start = time.perf_counter()
+            status = None
+            resp = None
+            prof._call.retries = 0
+            try:
+                resp = original(api_client, method, url, query_params, *args, **kwargs)
+                status = getattr(resp, "status", None)
+                return resp
+            except ApiException as ex:
+                status = ex.status
+                raise
+            finally:
+                prof.record(method, url, query_params, start, status, resp, prof._call.retries)
+
+        client.ApiClient.request = request
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = sorted(self.requests, key=lambda r: r["start"])
+        return {
+            "total_seconds": time.perf_counter() - self.t0,
+            "peak_rss_kb": peak_rss_kb(),
+            "phases": list(self.phases),
+            "requests": requests,
+        }
+
+    def report(self, json_path: Optional[str] = None):
+        self.mark(None)
+        data = self.to_dict()
+        print("")
+        print("== Profile ==")
+        print("Phases:")
+        fmt_table(["PHASE", "MS", "STATUS"], [[p["phase"], f"{p['seconds'] * 1000:.1f}", p.get("status", "ok")] for p in data["phases"]])
+
+        by_kind: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for r in data["requests"]:
+            by_kind.setdefault((r["verb"], r["resource"]), []).append(r)
+        print(f"API requests ({len(data['requests'])}):")
+        rows = []
+        for (verb, resource), reqs in sorted(by_kind.items(), key=lambda kv: -sum(r["seconds"] for r in kv[1])):
+            rows.append([
+                verb,
+                resource,
+                str(len(reqs)),
+                f"{sum(r['seconds'] for r in reqs) * 1000:.1f}",
+                f"{max(r['seconds'] for r in reqs) * 1000:.1f}",
+                str(sum(r["bytes"] or 0 for r in reqs)),
+                str(sum(r["retries"] for r in reqs)),
+            ])
+        fmt_table(["VERB", "RESOURCE", "COUNT", "TOTAL MS", "MAX MS", "BYTES", "RETRIES"], rows)
+
+        slowest = sorted(data["requests"], key=lambda r: -r["seconds"])[:10]
+        if slowest:
+            print("Slowest requests:")
+            fmt_table(
+                ["START MS", "VERB", "RESOURCE", "STATUS", "MS", "BYTES"],
+                [[f"{r['start'] * 1000:.1f}", r["verb"], r["resource"], str(r["status"]), f"{r['seconds'] * 1000:.1f}", str(r["bytes"] if r["bytes"] is not None else "-")] for r in slowest],
+            )
+        print(f"Total wall time: {data['total_seconds'] * 1000:.1f} ms")
+        if data["peak_rss_kb"] is not None:
+            print(f"Peak RSS: {data['peak_rss_kb'] / 1024:.1f} MiB")
+
+        if json_path:
+            with open(json_path, "w") as fh:
+                json.dump(data, fh, indent=2)
+                fh.write("\n")
+            print(f"Profile written to {json_path}")
+
+
+def retry_after_seconds(headers: Any) -> Optional[float]:
+    value = headers.get("Retry-After") if headers else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now().astimezone()).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_transient(ex: BaseException) -> bool:
+    if isinstance(ex, ApiException):
+        return ex.status in RETRY_STATUSES
+    # Resets, socket timeouts, and the official client's urllib3 errors.
+    return isinstance(ex, (OSError, http.client.HTTPException)) or type(ex).__module__.startswith("urllib3")
+
+
+def is_timeout_error(ex: BaseException) -> bool:
+    # urllib3 wraps read/connect timeouts in MaxRetryError(reason=...).
+    return any(
+        isinstance(e, TimeoutError) or "Timeout" in type(e).__name__
+        for e in (ex, getattr(ex, "reason", None)) if e is not None
+    )
+
+
+class Deadline:
+    """
+    Time budget for the report (--deadline) plus the per-call policy
+    (--request-timeout, --retries).
+
+    install() wraps ApiClient.request inside Profiler, so a call is profiled
+    once and its retries are reported to it. Every fully-read GET gets a timeout capped by the remaining
+    budget. 429/5xx responses and connection errors are retried with jittered
+    exponential backoff, never sooner than Retry-After. A call that runs out
+    of budget, or never gets through, raises ApiException(status=0). Timeouts
+    carry timed_out=True so sections can report them and carry on.
+    """
+
+    def __init__(self, seconds: Optional[float], request_timeout: float, retries: int, prof: Profiler):
+        self.seconds = seconds
+        # None is no budget; 0 is a budget that is already spent.
+        self.expires = time.monotonic() + seconds if seconds is not None else None
+        self.request_timeout = request_timeout
+        self.retries = retries
+        self.prof = prof
+        self.timed_out_phases: List[str] = []
+
+    def remaining(self) -> Optional[float]:
+        return None if self.expires is None else self.expires - time.monotonic()
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def release(self):
+        """
+        Drop the budget (after the report, before --watch/--follow); timeouts and retries stay.
+        """
+        self.expires = None
+
+    def error(self, reason: str, timed_out: bool = True) -> Exception:
+        ex = ApiException(status=0, reason=reason)
+        ex.timed_out = timed_out
+        return ex
+
+    def timed_out(self, phase: str, detail: str = ""):
+        """
+        Report phase as timed out and keep going.
+        """
+        if phase not in self.timed_out_phases:
+            self.timed_out_phases.append(phase)
+        self.prof.flag("timed out")
+        eprint(f"  ✗ timed out{f' ({detail})' if detail else ''}")
+
+    def install(self):
+        original = client.ApiClient.request
+        dl = self
+
+        @functools.wraps(original)
+        def request(api_client, method, url, query_params=None, *args, **kwargs):
+            if not kwargs.get("_preload_content", True):
+                # Streams (watch, --follow) outlive the report and reconnect on their own.
+                return original(api_client, method, url, query_params, *args, **kwargs)
+            attempt = 0
+            try:
+                while True:
+                    remaining = dl.remaining()
+                    if remaining is not None and remaining <= 0:
+                        raise dl.error(f"--deadline {dl.seconds:g}s reached")
+                    call_kwargs = dict(kwargs)
+                    if call_kwargs.get("_request_timeout") is None:
+                        call_kwargs["_request_timeout"] = dl.request_timeout if remaining is None else min(dl.request_timeout, remaining)
+                    try:
+                        return original(api_client, method, url, query_params, *args, **call_kwargs)
+                    except Exception as ex:
+                        if method != "GET" or not is_transient(ex):
+                            raise
+                        what = api_error(ex) if isinstance(ex, ApiException) else f"{type(ex).__name__}: {ex}"
+                        if attempt >= dl.retries:
+                            if isinstance(ex, ApiException):
+                                raise
+                            raise dl.error(f"{what} (after {attempt + 1} attempts)", timed_out=is_timeout_error(ex)) from ex
+                        delay = random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+                        if isinstance(ex, ApiException):
+                            delay = max(delay, retry_after_seconds(ex.headers) or 0.0)
+                        remaining = dl.remaining()
+                        if remaining is not None and delay >= remaining:
+                            raise dl.error(f"--deadline {dl.seconds:g}s reached while retrying {what}") from ex
+                        time.sleep(delay)
+                        attempt += 1
+            finally:
+                dl.prof.note_retries(attempt)
+
+        client.ApiClient.request = request
+
+
+class SnapshotRecorder:
+    """
+    Records every fully-read API response (--record) by wrapping
+    ApiClient.request, like Profiler. Streams (watch, --follow logs) are not
+    recorded. The snapshot is written at exit and replayed with --replay.
+    """
+
+    def __init__(self, path: str, context_namespace: str):
+        import kube_lite
+        self.kube_lite = kube_lite
+        self.path = path
+        self.context_namespace = context_namespace
+        self.responses: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _store(self, key: str, status: int, reason: Optional[str], body: Any):
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", errors="replace")
+        with self._lock:
+            self.responses[key] = {"status": status, "reason": reason, "body": body or ""}
+
+    def install(self):
+        original = client.ApiClient.request
+        rec = self
+
+        @functools.wraps(original)
+        def request(api_client, method, url, query_params=None, *args, **kwargs):
+            key = rec.kube_lite.request_key(method, url, query_params, kwargs.get("headers"))
+            try:
+                resp = original(api_client, method, url, query_params, *args, **kwargs)
+            except ApiException as ex:
+                if ex.status:
+                    rec._store(key, ex.status, ex.reason, ex.body)
+                raise
+            if kwargs.get("_preload_content", True):
+                rec._store(key, resp.status, resp.reason, resp.data)
+            return resp
+
+        client.ApiClient.request = request
+
+    def save(self):
+        with self._lock:
+            responses = dict(self.responses)
+        self.kube_lite.write_snapshot(self.path, {
+            "recorded_at": datetime.now().astimezone().isoformat(timespec="seconds"),
+            "context_namespace": self.context_namespace,
+            "argv": sys.argv[1:],
+            "responses": responses,
+        })
+        eprint(f"Snapshot of {len(responses)} response(s) written to {self.path}")
+
+
 def get_statefulset(apps: client.AppsV1Api, ns: str, name: str) -> client.V1StatefulSet:
     return apps.read_namespaced_stateful_set(name=name, namespace=ns)
 
 
+def list_all(list_fn: Callable[..., Any], page_size: int = LIST_PAGE_SIZE, **kwargs) -> Tuple[List[Any], Optional[str]]:
+    """
+    Page through a list call with limit/continue.
+    Returns (items, resourceVersion of the list snapshot).
+    """
+    items: List[Any] = []
+    token = None
+    while True:
+        page = list_fn(limit=page_size, _continue=token, **kwargs)
+        items.extend(page.items or [])
+        token = page.metadata._continue if page.metadata else None
+        if not token:
+            return items, (page.metadata.resource_version if page.metadata else None)
+
+
+def list_metadata(api_client: client.ApiClient, path: str, ns: str, page_size: int = LIST_PAGE_SIZE) -> List[Dict[str, Any]]:
+    """
+    Names-only listing: metadata dicts from a PartialObjectMetadataList, paged.
+    """
+    out: List[Dict[str, Any]] = []
+    token = None
+    while True:
+        query = [("limit", page_size)]
+        if token:
+            query.append(("continue", token))
+        page = api_client.call_api(
+            path, "GET",
+            path_params={"namespace": ns},
+            query_params=query,
+            header_params={"Accept": PARTIAL_METADATA_LIST},
+            response_type="object",
+            auth_settings=["BearerToken"],
+            _return_http_data_only=True,
+        )
+        out.extend((item.get("metadata") or {}) for item in page.get("items") or [])
+        token = (page.get("metadata") or {}).get("continue")
+        if not token:
+            return out
+
+
 def labels_to_selector(labels: Dict[str, str]) -> str:
     # e.g. {"app":"openclaw","release":"openclaw"} -> "app=openclaw,release=openclaw"
     return ",".join([f"{k}={v}" for k, v in (labels or {}).items()])
@@ -154,13 +734,10 @@ def collect_secret_refs(container: client.V1Container) -> List[Tuple[str, str, s
     return out
 
 
-def decode_secret_key(v1: client.CoreV1Api, ns: str, secret_name: str, key: str) -> Optional[str]:
-    try:
-        sec = v1.read_namespaced_secret(name=secret_name, namespace=ns)
-    except ApiException as ex:
-        eprint(f"  ! Failed reading secret {ns}/{secret_name}: {ex.status} {ex.reason}")
-        return None
-
+def decode_secret_value(ns: str, secret_name: str, sec: client.V1Secret, key: str) -> Optional[str]:
+    """
+    Decode one key of an already-fetched Secret.
+    """
     data = (sec.data or {})
     if key not in data:
         eprint(f"  ! Secret {ns}/{secret_name} does not contain key '{key}' (has: {', '.join(data.keys())})")
@@ -174,23 +751,146 @@ def decode_secret_key(v1: client.CoreV1Api, ns: str, secret_name: str, key: str)
         return None
 
 
+def token_secret_names(container: client.V1Container) -> List[str]:
+    """
+    Names of the Secrets --print-token will read: token-like secretKeyRefs plus envFrom secretRefs.
+    Order is preserved and duplicates dropped, so each Secret is fetched once.
+    """
+    names = []
+    for env_name, sec_name, sec_key in collect_secret_refs(container):
+        if TOKEN_NAME_RE.search(env_name) or TOKEN_NAME_RE.search(sec_key):
+            names.append(sec_name)
+    for ef in container.env_from or []:
+        if ef.secret_ref and ef.secret_ref.name:
+            names.append(ef.secret_ref.name)
+    return list(dict.fromkeys(names))
+
+
+class SecretCache:
+    """
+    Secrets fetched during one run, keyed by name.
+
+    Each Secret is fetched at most once: reads go through `lookups`, which
+    de-duplicates by key, and prefetch() can satisfy several names with a
+    single label-selected list. Values stay base64-encoded until decode()
+    asks for a specific key.
+    """
+
+    def __init__(self, v1: client.CoreV1Api, ns: str, lookups: Lookups):
+        self.v1 = v1
+        self.ns = ns
+        self.lookups = lookups
+        self._lock = threading.Lock()
+        self._decoded: Dict[Tuple[str, str], Optional[str]] = {}
+
+    def _list(self, label_selector: str) -> Dict[str, client.V1Secret]:
+        try:
+            items = self.v1.list_namespaced_secret(namespace=self.ns, label_selector=label_selector).items or []
+        except ApiException:
+            # list may be forbidden where get is allowed; get() falls back to reads.
+            return {}
+        return {sec.metadata.name: sec for sec in items}
+
+    def prefetch(self, names: List[str], label_selector: Optional[str] = None):
+        """
+        Start fetching names in the background. With enough names and a
+        selector, one list call covers every Secret carrying the release labels.
+        """
+        names = list(dict.fromkeys(names))
+        if label_selector and len(names) >= SECRET_LIST_THRESHOLD:
+            self.lookups.submit("secrets:list", self._list, label_selector)
+            return
+        for name in names:
+            self._submit_read(name)
+
+    def _submit_read(self, name: str):
+        with self._lock:
+            return self.lookups.submit(f"secret:{name}", self.v1.read_namespaced_secret, name=name, namespace=self.ns)
+
+    def get(self, name: str) -> client.V1Secret:
+        """
+        Return the Secret, raising ApiException if it cannot be read.
+        """
+        if "secrets:list" in self.lookups:
+            listed = self.lookups.result("secrets:list")
+            if name in listed:
+                return listed[name]
+        return self._submit_read(name).result()
+
+    def decode(self, name: str, key: str) -> Optional[str]:
+        """
+        Decoded value of name[key]; None (with a message) if it is missing or undecodable.
+        """
+        if (name, key) not in self._decoded:
+            self._decoded[(name, key)] = decode_secret_value(self.ns, name, self.get(name), key)
+        return self._decoded[(name, key)]
+
+
+def find_gateway_token(container: client.V1Container, secrets: SecretCache) -> Optional[str]:
+    """
+    The first gateway token the container would see: a literal env value,
+    then token-like secretKeyRefs, then token-like keys of envFrom Secrets.
+    """
+    for env in container.env or []:
+        if env.value and TOKEN_NAME_RE.search(env.name or ""):
+            return env.value
+    for env_name, sec_name, sec_key in collect_secret_refs(container):
+        if TOKEN_NAME_RE.search(env_name) or TOKEN_NAME_RE.search(sec_key):
+            try:
+                val = secrets.decode(sec_name, sec_key)
+            except ApiException:
+                continue
+            if val:
+                return val
+    for ef in container.env_from or []:
+        if not (ef.secret_ref and ef.secret_ref.name):
+            continue
+        try:
+            sec = secrets.get(ef.secret_ref.name)
+        except ApiException:
+            continue
+        for k in (sec.data or {}):
+            if TOKEN_NAME_RE.search(k):
+                val = secrets.decode(ef.secret_ref.name, k)
+                if val:
+                    return val
+    return None
+
+
 def try_find_service(v1: client.CoreV1Api, ns: str, name: str) -> Optional[client.V1Service]:
     try:
         return v1.read_namespaced_service(name=name, namespace=ns)
-    except ApiException:
+    except ApiException as ex:
+        if is_timeout(ex):
+            raise
         return None
 
 
-def list_ingresses(networking: client.NetworkingV1Api, ns: str, name_hint: str) -> List[client.V1Ingress]:
+def list_ingresses(
+    networking: client.NetworkingV1Api,
+    ns: str,
+    name_hint: str,
+    label_selector: Optional[str] = None,
+) -> List[client.V1Ingress]:
+    """
+    Ingresses for a release. The chart labels its Ingress like the StatefulSet,
+    so try the label selector server-side first; if that finds nothing, fall back
+    to matching name_hint against a names-only listing and read just the hits.
+    """
     try:
-        ing_list = networking.list_namespaced_ingress(namespace=ns)
-    except ApiException:
+        if label_selector:
+            hits, _ = list_all(networking.list_namespaced_ingress, namespace=ns, label_selector=label_selector)
+            if hits:
+                return hits
+        names = [
+            m["name"] for m in list_metadata(networking.api_client, INGRESS_PATH, ns)
+            if m.get("name") and (m["name"] == name_hint or name_hint in m["name"])
+        ]
+        return [networking.read_namespaced_ingress(name=n, namespace=ns) for n in names]
+    except ApiException as ex:
+        if is_timeout(ex):
+            raise
         return []
-    hits = []
-    for ing in ing_list.items or []:
-        if ing.metadata and (ing.metadata.name == name_hint or name_hint in ing.metadata.name):
-            hits.append(ing)
-    return hits
 
 
 def tail_logs(v1: client.CoreV1Api, ns: str, pod: str, container: str, lines: int) -> str:
@@ -203,20 +903,1256 @@ def tail_logs(v1: client.CoreV1Api, ns: str, pod: str, container: str, lines: in
     )
 
 
+def ingress_hosts(ing: client.V1Ingress) -> List[str]:
+    hosts = []
+    if ing.spec and ing.spec.rules:
+        for r in ing.spec.rules:
+            if r.host:
+                hosts.append(r.host)
+    return hosts
+
+
+def print_pods(pods: List[client.V1Pod]):
+    for p in pods:
+        name = p.metadata.name if p.metadata else "?"
+        phase = p.status.phase if p.status else "?"
+        pod_ip = p.status.pod_ip if p.status else "?"
+        print(f"  - {name:30} {phase:10} ip={pod_ip}")
+
+
+def print_container(container: client.V1Container):
+    print(f"  container: {container.name}")
+    print(f"  image:     {container.image}")
+
+    env_hits = scan_env_for_token_candidates(container)
+    if env_hits:
+        print("  token-related env vars found:")
+        for name, src in env_hits:
+            print(f"    - {name}: {src}")
+    else:
+        print("  (no token-related env vars matched pattern)")
+
+    # envFrom sources (often used for Secrets/ConfigMaps)
+    if container.env_from:
+        print("  envFrom sources:")
+        for ef in container.env_from:
+            if ef.secret_ref:
+                print(f"    - secretRef: {ef.secret_ref.name}")
+            if ef.config_map_ref:
+                print(f"    - configMapRef: {ef.config_map_ref.name}")
+
+
+def print_service(ns: str, name: str, svc: Optional[client.V1Service]):
+    if svc:
+        t = svc.spec.type if svc.spec else "?"
+        ports = []
+        if svc.spec and svc.spec.ports:
+            for p in svc.spec.ports:
+                ports.append(f"{p.port}/{p.protocol}")
+        print(f"  ✓ Service {ns}/{name}: type={t} ports={ports or '(none)'}")
+        if svc.spec and svc.spec.cluster_ip:
+            print(f"    clusterIP={svc.spec.cluster_ip}")
+    else:
+        print(f"  (no Service named {ns}/{name})")
+
+
+def print_ingresses(name_hint: str, ing_hits: List[client.V1Ingress]):
+    if ing_hits:
+        print(f"  ✓ Ingresses matching '{name_hint}':")
+        for ing in ing_hits:
+            n = ing.metadata.name if ing.metadata else "?"
+            hosts = ingress_hosts(ing)
+            print(f"    - {n} hosts={hosts or '(none)'}")
+    else:
+        print("  (no matching Ingress found)")
+
+
+def print_pod_status(pod: client.V1Pod):
+    phase = pod.status.phase if pod.status else "?"
+    print(f"  phase: {phase}")
+    if pod.status and pod.status.conditions:
+        for c in pod.status.conditions:
+            print(f"  condition {c.type:18} = {c.status} (reason={c.reason or ''})")
+
+
+def labels_match(match_labels: Dict[str, str], labels: Optional[Dict[str, str]]) -> bool:
+    labels = labels or {}
+    return all(labels.get(k) == v for k, v in (match_labels or {}).items())
+
+
+def pod_restarts(pod: client.V1Pod) -> int:
+    statuses = (pod.status.container_statuses if pod.status else None) or []
+    return sum((cs.restart_count or 0) for cs in statuses)
+
+
+def list_fleet(
+    v1: client.CoreV1Api,
+    apps: client.AppsV1Api,
+    net: client.NetworkingV1Api,
+    lookups: Lookups,
+    selector: str,
+    ns: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Find every StatefulSet matching selector (cluster-wide when ns is None) and
+    attach its pods, Service and Ingresses.
+
+    Uses one label-selected, paginated list per resource kind instead of a read
+    per release; the four lists run concurrently through lookups.
+    """
+    if ns is None:
+        lookups.submit("fleet:sts", list_all, apps.list_stateful_set_for_all_namespaces, label_selector=selector)
+        lookups.submit("fleet:pods", list_all, v1.list_pod_for_all_namespaces, label_selector=selector)
+        lookups.submit("fleet:services", list_all, v1.list_service_for_all_namespaces, label_selector=selector)
+        lookups.submit("fleet:ingresses", list_all, net.list_ingress_for_all_namespaces, label_selector=selector)
+    else:
+        lookups.submit("fleet:sts", list_all, apps.list_namespaced_stateful_set, namespace=ns, label_selector=selector)
+        lookups.submit("fleet:pods", list_all, v1.list_namespaced_pod, namespace=ns, label_selector=selector)
+        lookups.submit("fleet:services", list_all, v1.list_namespaced_service, namespace=ns, label_selector=selector)
+        lookups.submit("fleet:ingresses", list_all, net.list_namespaced_ingress, namespace=ns, label_selector=selector)
+
+    sts_items, _ = lookups.result("fleet:sts")
+    pods, _ = lookups.result("fleet:pods")
+    services, _ = lookups.result("fleet:services")
+    try:
+        ingresses, _ = lookups.result("fleet:ingresses")
+    except ApiException as ex:
+        # Ingress RBAC is often narrower than core resources; the summary is still useful without it.
+        eprint(f"  ! Failed listing ingresses: {api_error(ex)}")
+        ingresses = []
+
+    def by_namespace(items):
+        out: Dict[str, List[Any]] = {}
+        for item in items:
+            out.setdefault(item.metadata.namespace, []).append(item)
+        return out
+
+    pods_by_ns = by_namespace(pods)
+    svcs_by_ns = by_namespace(services)
+    ings_by_ns = by_namespace(ingresses)
+
+    releases = []
+    for sts in sorted(sts_items, key=lambda s: (s.metadata.namespace, s.metadata.name)):
+        sts_ns = sts.metadata.namespace
+        sts_name = sts.metadata.name
+        match_labels = (sts.spec.selector.match_labels if sts.spec and sts.spec.selector else {}) or {}
+        rel_pods = [p for p in pods_by_ns.get(sts_ns, []) if labels_match(match_labels, p.metadata.labels)]
+        rel_pods.sort(key=lambda p: p.metadata.name)
+        svc = next((s for s in svcs_by_ns.get(sts_ns, []) if s.metadata.name == sts_name), None)
+        rel_ings = [i for i in ings_by_ns.get(sts_ns, []) if i.metadata and sts_name in i.metadata.name]
+        releases.append({"sts": sts, "pods": rel_pods, "service": svc, "ingresses": rel_ings})
+    return releases
+
+
+def fmt_table(headers: List[str], rows: List[List[str]]):
+    widths = [len(h) for h in headers]
+    for row in rows:
+        for i, cell in enumerate(row):
+            widths[i] = max(widths[i], len(cell))
+    print("  " + "  ".join(h.ljust(widths[i]) for i, h in enumerate(headers)).rstrip())
+    for row in rows:
+        print("  " + "  ".join(cell.ljust(widths[i]) for i, cell in enumerate(row)).rstrip())
+
+
+def fleet_row(rel: Dict[str, Any]) -> List[str]:
+    sts = rel["sts"]
+    pods = rel["pods"]
+    replicas = sts.spec.replicas if sts.spec else None
+    ready = (sts.status.ready_replicas if sts.status else None) or 0
+    running = sum(1 for p in pods if p.status and p.status.phase == "Running")
+    pod = pick_main_pod(pods, sts.metadata.name)
+    container = find_container(pod) if pod else None
+    svc = rel["service"]
+    if svc and svc.spec:
+        svc_cell = f"{svc.spec.type}/{svc.spec.cluster_ip or '-'}"
+    else:
+        svc_cell = "-"
+    hosts = [h for ing in rel["ingresses"] for h in ingress_hosts(ing)]
+    return [
+        sts.metadata.namespace,
+        sts.metadata.name,
+        f"{ready}/{replicas}",
+        f"{running}/{len(pods)}",
+        str(sum(pod_restarts(p) for p in pods)),
+        svc_cell,
+        ",".join(hosts) or "-",
+        (container.image if container else None) or "-",
+    ]
+
+
+def print_release_report(rel: Dict[str, Any]):
+    sts = rel["sts"]
+    ns = sts.metadata.namespace
+    name = sts.metadata.name
+    print(f"--- {ns}/{name} ---")
+    replicas = sts.spec.replicas if sts.spec else None
+    ready = sts.status.ready_replicas if sts.status else None
+    print(f"  replicas: {replicas} | ready: {ready}")
+    pods = rel["pods"]
+    if not pods:
+        print("  ✗ No pods found for this StatefulSet selector.")
+    else:
+        print_pods(pods)
+        pod = pick_main_pod(pods, name)
+        print(f"  -> Inspecting pod: {pod.metadata.name}")
+        container = find_container(pod, prefer="gateway")
+        if container:
+            print_container(container)
+        print_pod_status(pod)
+    print_service(ns, name, rel["service"])
+    print_ingresses(name, rel["ingresses"])
+    print("")
+
+
+def run_fleet(
+    args: argparse.Namespace,
+    v1: client.CoreV1Api,
+    apps: client.AppsV1Api,
+    net: client.NetworkingV1Api,
+    mode: str,
+    ctx_ns: str,
+    prof: Profiler,
+    deadline: Deadline,
+):
+    selector = args.selector or DEFAULT_FLEET_SELECTOR
+    ns = None if args.all_namespaces else (args.namespace or ctx_ns)
+
+    print("== OpenClaw Fleet Diagnostic ==")
+    print(f"Config mode: {mode}")
+    print(f"Namespace:  {ns or '(all)'}")
+    print(f"Selector:   {selector}")
+    print("")
+
+    prof.mark("fleet lists")
+    lookups = Lookups(workers=args.workers, serial=args.serial)
+    events_by_uid: Dict[str, List[Any]] = {}
+    try:
+        releases = list_fleet(v1, apps, net, lookups, selector, ns)
+        if args.timeline:
+            namespaces = sorted({rel["sts"].metadata.namespace for rel in releases})
+            for rel_ns in namespaces:
+                lookups.submit(f"pod-events:{rel_ns}", list_all, v1.list_namespaced_event, namespace=rel_ns, field_selector=POD_EVENTS_FIELD_SELECTOR)
+            for rel_ns in namespaces:
+                try:
+                    events, _ = lookups.result(f"pod-events:{rel_ns}")
+                except ApiException as ex:
+                    if is_timeout(ex):
+                        deadline.timed_out("fleet pod events", rel_ns)
+                    else:
+                        eprint(f"  ! Failed listing pod events in {rel_ns}: {api_error(ex)}")
+                    continue
+                events_by_uid.update(events_by_pod_uid(events))
+    except ApiException as ex:
+        eprint(f"  ✗ Failed listing releases: {api_error(ex)}")
+        sys.exit(2)
+    finally:
+        lookups.close()
+
+    if not releases:
+        print(f"  ✗ No StatefulSets match selector '{selector}'.")
+        sys.exit(2)
+
+    prof.mark("fleet report")
+    fmt_table(
+        ["NAMESPACE", "STATEFULSET", "READY", "RUNNING", "RESTARTS", "SERVICE", "HOSTS", "IMAGE"],
+        [fleet_row(rel) for rel in releases],
+    )
+    print("")
+
+    if args.timeline:
+        pods = [p for rel in releases for p in rel["pods"]]
+        print(f"Startup timeline ({len(pods)} pod(s)):")
+        print_timeline_percentiles([pod_startup_timeline(p, events_by_uid.get(p.metadata.uid, [])) for p in pods])
+        print("")
+
+    if args.full_report:
+        for rel in releases:
+            print_release_report(rel)
+            if args.timeline:
+                for p in rel["pods"]:
+                    print_pod_timeline(p, events_by_uid.get(p.metadata.uid, []))
+                print("")
+
+    print_timed_out(deadline)
+    print(f"== Done ({len(releases)} release(s)) ==")
+
+
+def print_timed_out(deadline: Deadline):
+    if deadline.timed_out_phases:
+        print(f"Timed out: {', '.join(deadline.timed_out_phases)}")
+        print("")
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return None
+    # pct * n first: pct / 100 is inexact (0.07 * 100 > 7), which would push ranks up by one.
+    rank = max(1, math.ceil(pct * len(sorted_values) / 100.0))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def probe_targets(
+    pod: client.V1Pod,
+    container: client.V1Container,
+    svc: Optional[client.V1Service],
+    ing_hits: List[client.V1Ingress],
+) -> List[Tuple[str, str]]:
+    """
+    (hop, base URL) for each way into the gateway: pod IP, Service ClusterIP, Ingress hosts.
+    """
+    targets = []
+    port = next((p.container_port for p in container.ports or [] if p.name == "gateway"), DEFAULT_GATEWAY_PORT)
+    pod_ip = pod.status.pod_ip if pod.status else None
+    if pod_ip:
+        targets.append(("pod", f"http://{f'[{pod_ip}]' if ':' in pod_ip else pod_ip}:{port}"))
+    if svc and svc.spec and svc.spec.cluster_ip and svc.spec.cluster_ip != "None":
+        ports = svc.spec.ports or []
+        svc_port = next((p.port for p in ports if p.name == "gateway"), ports[0].port if ports else DEFAULT_GATEWAY_PORT)
+        targets.append(("service", f"http://{svc.spec.cluster_ip}:{svc_port}"))
+    for ing in ing_hits:
+        tls_hosts = {h for t in ((ing.spec.tls if ing.spec else None) or []) for h in (t.hosts or [])}
+        for host in ingress_hosts(ing):
+            targets.append(("ingress", f"{'https' if host in tls_hosts else 'http'}://{host}"))
+    return targets
+
+
+def probe_url(
+    url: str,
+    token: Optional[str],
+    total: int = PROBE_REQUESTS,
+    concurrency: int = PROBE_CONCURRENCY,
+    timeout: float = PROBE_TIMEOUT,
+    insecure: bool = False,
+) -> Dict[str, Any]:
+    """
+    Send `total` authenticated GETs to url from `concurrency` workers, each on
+    its own keep-alive connection. Latencies are kept for successful requests;
+    failures are counted by HTTP status or exception type.
+    """
+    parts = urlsplit(url)
+    target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    headers = {"User-Agent": "openclaw-diag-probe"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    ctx = None
+    if parts.scheme == "https":
+        ctx = ssl.create_default_context()
+        if insecure:
+            ctx.check_hostname = False
+            ctx.verify_mode = ssl.CERT_NONE
+
+    def connect() -> http.client.HTTPConnection:
+        if ctx is not None:
+            return http.client.HTTPSConnection(parts.hostname, parts.port or 443, timeout=timeout, context=ctx)
+        return http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+
+    lock = threading.Lock()
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    issued = [0]
+
+    def worker():
+        conn = None
+        while True:
+            with lock:
+                if issued[0] >= total:
+                    break
+                issued[0] += 1
+            err = None
+            start = time.perf_counter()
+            try:
+                if conn is None:
+                    conn = connect()
+                conn.request("GET", target, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+                if resp.will_close:
+                    conn.close()
+                    conn = None
+                if resp.status >= 400:
+                    err = f"HTTP {resp.status}"
+            except (OSError, http.client.HTTPException) as ex:
+                err = type(ex).__name__
+                if conn is not None:
+                    conn.close()
+                    conn = None
+            elapsed = time.perf_counter() - start
+            with lock:
+                if err:
+                    errors[err] = errors.get(err, 0) + 1
+                else:
+                    latencies.append(elapsed)
+        if conn is not None:
+            conn.close()
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=worker, name=f"probe-{i}", daemon=True) for i in range(max(1, min(concurrency, total)))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+
+    latencies.sort()
+    failed = sum(errors.values())
+    return {
+        "url": url,
+        "requests": total,
+        "ok": len(latencies),
+        "errors": errors,
+        "error_rate": failed / total if total else 0.0,
+        "seconds": wall,
+        "rps": total / wall if wall > 0 else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": latencies[-1] if latencies else None,
+    }
+
+
+def print_probe_results(results: List[Tuple[str, Dict[str, Any]]]):
+    def ms(v: Optional[float]) -> str:
+        return f"{v * 1000:.1f}" if v is not None else "-"
+
+    fmt_table(
+        ["HOP", "URL", "REQS", "OK", "ERR%", "RPS", "P50 MS", "P95 MS", "P99 MS", "MAX MS"],
+        [
+            [hop, r["url"], str(r["requests"]), str(r["ok"]), f"{r['error_rate'] * 100:.1f}", f"{r['rps']:.1f}",
+             ms(r["p50"]), ms(r["p95"]), ms(r["p99"]), ms(r["max"])]
+            for hop, r in results
+        ],
+    )
+    for hop, r in results:
+        for err, count in sorted(r["errors"].items(), key=lambda kv: -kv[1]):
+            print(f"  {hop} {r['url']}: {count} x {err}")
+
+
+def container_state_label(cs: client.V1ContainerStatus) -> str:
+    st = cs.state
+    if st is None:
+        return "unknown"
+    if st.running:
+        return "running"
+    if st.waiting:
+        return f"waiting:{st.waiting.reason or ''}"
+    if st.terminated:
+        return f"terminated:{st.terminated.reason or st.terminated.exit_code}"
+    return "unknown"
+
+
+def pod_snapshot(pod: client.V1Pod) -> Dict[str, Any]:
+    """
+    The subset of pod status --watch compares between updates.
+    """
+    status = pod.status
+    statuses = ((status.init_container_statuses or []) + (status.container_statuses or [])) if status else []
+    return {
+        "phase": status.phase if status else None,
+        "conditions": {c.type: c.status for c in ((status.conditions if status else None) or [])},
+        "restarts": {cs.name: cs.restart_count or 0 for cs in statuses},
+        "states": {cs.name: container_state_label(cs) for cs in statuses},
+    }
+
+
+def statefulset_snapshot(sts: client.V1StatefulSet) -> Dict[str, Any]:
+    spec = sts.spec
+    status = sts.status
+    return {
+        "replicas": spec.replicas if spec else None,
+        "ready": (status.ready_replicas if status else None) or 0,
+        "updated": (status.updated_replicas if status else None) or 0,
+        "currentRevision": status.current_revision if status else None,
+        "updateRevision": status.update_revision if status else None,
+    }
+
+
+def diff_pod(name: str, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> List[str]:
+    if old is None and new is None:
+        return []
+    if old is None:
+        return [f"pod/{name} added (phase={new['phase']})"]
+    if new is None:
+        return [f"pod/{name} deleted"]
+    out = []
+    if old["phase"] != new["phase"]:
+        out.append(f"pod/{name} phase {old['phase']} -> {new['phase']}")
+    for ctype in sorted(set(old["conditions"]) | set(new["conditions"])):
+        before, after = old["conditions"].get(ctype), new["conditions"].get(ctype)
+        if before != after:
+            out.append(f"pod/{name} condition {ctype} {before} -> {after}")
+    for cname, count in sorted(new["restarts"].items()):
+        if count > old["restarts"].get(cname, 0):
+            out.append(f"pod/{name} container {cname} restarted (restarts={count})")
+    for cname, state in sorted(new["states"].items()):
+        before = old["states"].get(cname)
+        if before is not None and before != state:
+            out.append(f"pod/{name} container {cname} {before} -> {state}")
+    return out
+
+
+def diff_statefulset(name: str, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> List[str]:
+    if old is None and new is None:
+        return []
+    if old is None:
+        return [f"statefulset/{name} added"]
+    if new is None:
+        return [f"statefulset/{name} deleted"]
+    return [
+        f"statefulset/{name} {key} {old[key]} -> {new[key]}"
+        for key in new
+        if old.get(key) != new[key]
+    ]
+
+
+class _WatchExpired(Exception):
+    pass
+
+
+class ReleaseWatcher:
+    """
+    Keeps one release's StatefulSet, pods and their events in memory, fed by
+    watch streams that resume from the last seen resourceVersion.
+
+    When a watch expires (410 Gone) only that resource is re-listed, and the
+    fresh list is diffed against the in-memory state, so the output stays
+    incremental instead of re-dumping the release.
+    """
+
+    def __init__(self, v1: client.CoreV1Api, apps: client.AppsV1Api, ns: str, sts: client.V1StatefulSet, selector: str):
+        self.v1 = v1
+        self.apps = apps
+        self.ns = ns
+        self.sts_name = sts.metadata.name
+        self.selector = selector
+        self.stop = threading.Event()
+        self._lock = threading.Lock()
+        self.sts_state: Optional[Dict[str, Any]] = statefulset_snapshot(sts)
+        self.pods: Dict[str, Dict[str, Any]] = {}
+        self.event_counts: Dict[str, int] = {}
+
+    def emit(self, line: str):
+        with self._lock:
+            print(f"[{time.strftime('%H:%M:%S')}] {line}", flush=True)
+
+    # -- per-resource plumbing: (list call, list kwargs, apply one object, resync from a full list)
+
+    def _sts_list(self):
+        return self.apps.list_namespaced_stateful_set, {"namespace": self.ns, "field_selector": f"metadata.name={self.sts_name}"}
+
+    def _pods_list(self):
+        return self.v1.list_namespaced_pod, {"namespace": self.ns, "label_selector": self.selector or None}
+
+    def _pod_events_list(self):
+        # Field selectors cannot OR pod names, so this is every pod's events in
+        # the namespace; apply_event keeps the release's.
+        return self.v1.list_namespaced_event, {"namespace": self.ns, "field_selector": POD_EVENTS_FIELD_SELECTOR}
+
+    def _sts_events_list(self):
+        return self.v1.list_namespaced_event, {
+            "namespace": self.ns,
+            "field_selector": STATEFULSET_EVENTS_FIELD_SELECTOR.format(name=self.sts_name),
+        }
+
+    def apply_sts(self, ev_type: str, sts: client.V1StatefulSet):
+        new = None if ev_type == "DELETED" else statefulset_snapshot(sts)
+        for line in diff_statefulset(self.sts_name, self.sts_state, new):
+            self.emit(line)
+        self.sts_state = new
+
+    def apply_pod(self, ev_type: str, pod: client.V1Pod):
+        name = pod.metadata.name
+        new = None if ev_type == "DELETED" else pod_snapshot(pod)
+        for line in diff_pod(name, self.pods.get(name), new):
+            self.emit(line)
+        if new is None:
+            self.pods.pop(name, None)
+        else:
+            self.pods[name] = new
+
+    def apply_event(self, ev_type: str, event: client.CoreV1Event):
+        obj = event.involved_object
+        if ev_type == "DELETED" or obj is None:
+            return
+        if obj.name != self.sts_name and obj.name not in self.pods:
+            return
+        uid, count = self._event_key(event)
+        if self.event_counts.get(uid, 0) >= count:
+            return
+        self.event_counts[uid] = count
+        suffix = f" (x{count})" if count > 1 else ""
+        self.emit(f"event {event.type} {(obj.kind or '').lower()}/{obj.name} {event.reason}: {(event.message or '').strip()}{suffix}")
+
+    @staticmethod
+    def _event_key(event: client.CoreV1Event) -> Tuple[str, int]:
+        return event.metadata.uid or f"{event.involved_object.name}/{event.reason}", event.count or 1
+
+    def seed_events(self, items):
+        # Events that predate the watch: remembered, never printed, so a re-list
+        # after a 410 only prints what happened since.
+        for event in items:
+            if event.involved_object is not None:
+                uid, count = self._event_key(event)
+                self.event_counts[uid] = max(self.event_counts.get(uid, 0), count)
+
+    def resync_sts(self, items):
+        self.apply_sts("MODIFIED" if items else "DELETED", items[0] if items else None)
+
+    def resync_pods(self, items):
+        seen = set()
+        for pod in items:
+            seen.add(pod.metadata.name)
+            self.apply_pod("MODIFIED", pod)
+        for name in sorted(set(self.pods) - seen):
+            for line in diff_pod(name, self.pods.pop(name), None):
+                self.emit(line)
+
+    def resync_events(self, items):
+        for event in items:
+            self.apply_event("MODIFIED", event)
+
+    def _relist(self, list_call, resync) -> str:
+        fn, kwargs = list_call()
+        items, rv = list_all(fn, **kwargs)
+        resync(items)
+        return rv
+
+    def _loop(self, kind: str, list_call, apply, resync, rv: str):
+        backoff = 1
+        while not self.stop.is_set():
+            fn, kwargs = list_call()
+            w = watch.Watch()
+            try:
+                for ev in w.stream(fn, resource_version=rv, timeout_seconds=WATCH_TIMEOUT_SECONDS, allow_watch_bookmarks=True, **kwargs):
+                    if self.stop.is_set():
+                        w.stop()
+                        break
+                    raw = ev.get("raw_object") or {}
+                    if ev["type"] == "ERROR":
+                        if raw.get("code") == 410:
+                            raise _WatchExpired()
+                        raise ApiException(status=raw.get("code"), reason=raw.get("message"))
+                    rv = (raw.get("metadata") or {}).get("resourceVersion") or rv
+                    if ev["type"] != "BOOKMARK":
+                        apply(ev["type"], ev["object"])
+                backoff = 1
+            except (_WatchExpired, ApiException) as ex:
+                if isinstance(ex, ApiException) and ex.status != 410:
+                    self.emit(f"! watch {kind} failed: {api_error(ex)}; retrying in {backoff}s")
+                    self.stop.wait(backoff)
+                    backoff = min(backoff * 2, 30)
+                    continue
+                # resourceVersion too old: re-list just this resource and diff against memory.
+                try:
+                    rv = self._relist(list_call, resync)
+                except ApiException as lex:
+                    self.emit(f"! re-list {kind} failed: {api_error(lex)}; retrying in {backoff}s")
+                    self.stop.wait(backoff)
+                    backoff = min(backoff * 2, 30)
+            except Exception as ex:
+                # Dropped connections and the like: resume from the last resourceVersion.
+                self.emit(f"! watch {kind} interrupted: {ex}; retrying in {backoff}s")
+                self.stop.wait(backoff)
+                backoff = min(backoff * 2, 30)
+
+    def run(self, pods: List[client.V1Pod], sts_rv: str, pods_rv: str):
+        for pod in pods:
+            self.pods[pod.metadata.name] = pod_snapshot(pod)
+        streams = [
+            ("statefulset", self._sts_list, self.apply_sts, self.resync_sts, sts_rv),
+            ("pods", self._pods_list, self.apply_pod, self.resync_pods, pods_rv),
+        ]
+        for kind, list_call in (("pod events", self._pod_events_list), ("statefulset events", self._sts_events_list)):
+            # Start from "now" instead of replaying the history, which is only recorded.
+            fn, kwargs = list_call()
+            items, events_rv = list_all(fn, **kwargs)
+            self.seed_events(items)
+            streams.append((kind, list_call, self.apply_event, self.resync_events, events_rv))
+        threads = [
+            threading.Thread(target=self._loop, args=stream, name=f"watch-{stream[0]}", daemon=True)
+            for stream in streams
+        ]
+        for t in threads:
+            t.start()
+        try:
+            while not self.stop.wait(1):
+                pass
+        except KeyboardInterrupt:
+            self.stop.set()
+
+
+def to_datetime(value: Any) -> Optional[datetime]:
+    """
+    API timestamps as datetimes: the official client already parses them,
+    kube_lite hands back RFC3339 strings.
+    """
+    if value is None or isinstance(value, datetime):
+        return value
+    text = str(value).replace("Z", "+00:00")
+    # fromisoformat before 3.11 rejects fractional seconds that aren't 3 or 6 digits.
+    m = re.match(r"^(.*T\d\d:\d\d:\d\d)(\.\d+)?(.*)$", text)
+    if m and m.group(2):
+        text = m.group(1) + m.group(2)[:7].ljust(7, "0") + m.group(3)
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+def seconds_between(start: Any, end: Any) -> Optional[float]:
+    a, b = to_datetime(start), to_datetime(end)
+    if a is None or b is None:
+        return None
+    return (b - a).total_seconds()
+
+
+def parse_go_duration(text: str) -> Optional[float]:
+    parts = GO_DURATION_PART_RE.findall(text)
+    if not parts:
+        return None
+    return sum(float(n) * GO_DURATION_UNITS[u] for n, u in parts)
+
+
+def event_time(event: client.CoreV1Event) -> Any:
+    return event.last_timestamp or event.event_time or event.first_timestamp
+
+
+def events_by_pod_uid(events: List[client.CoreV1Event]) -> Dict[str, List[client.CoreV1Event]]:
+    # Keyed by uid, not name: StatefulSet pods reuse names across restarts.
+    out: Dict[str, List[Any]] = {}
+    for ev in events:
+        obj = ev.involved_object
+        if obj is not None and obj.uid:
+            out.setdefault(obj.uid, []).append(ev)
+    return out
+
+
+def pod_startup_timeline(pod: client.V1Pod, events: List[client.CoreV1Event]) -> List[Tuple[str, Optional[float]]]:
+    """
+    Seconds spent in each startup stage, built from pod conditions, container
+    state timestamps and the pod's events. Stages that can't be determined
+    (e.g. events already expired) are None.
+
+    Condition times are the latest transition, so a pod that flapped reports
+    its most recent recovery.
+    """
+    status = pod.status
+    created = pod.metadata.creation_timestamp
+    conditions = {c.type: c.last_transition_time for c in ((status.conditions if status else None) or []) if c.status == "True"}
+
+    stages: List[Tuple[str, Optional[float]]] = [("schedule", seconds_between(created, conditions.get("PodScheduled")))]
+
+    pulls = [ev for ev in events if ev.reason == "Pulled"]
+    pull_seconds = None
+    if pulls:
+        pull_seconds = 0.0
+        for ev in pulls:
+            m = PULLED_IN_RE.search(ev.message or "")
+            if m:
+                pull_seconds += parse_go_duration(m.group(1)) or 0.0
+    stages.append(("image pull", pull_seconds))
+
+    last_init_end = None
+    for cs in ((status.init_container_statuses if status else None) or []):
+        term = cs.state.terminated if cs.state else None
+        if term is None and cs.last_state is not None:
+            term = cs.last_state.terminated
+        stages.append((f"init:{cs.name}", seconds_between(term.started_at, term.finished_at) if term else None))
+        if term is not None:
+            last_init_end = term.finished_at
+
+    main = next((cs for cs in ((status.container_statuses if status else None) or []) if cs.name == "gateway"), None)
+    if main is None and status and status.container_statuses:
+        main = status.container_statuses[0]
+    main_started = main.state.running.started_at if main and main.state and main.state.running else None
+    stages.append(("container start", seconds_between(last_init_end or conditions.get("Initialized"), main_started)))
+    stages.append(("probes to Ready", seconds_between(main_started, conditions.get("Ready"))))
+    stages.append(("total to Ready", seconds_between(created, conditions.get("Ready"))))
+    return stages
+
+
+def probe_failures(events: List[client.CoreV1Event]) -> int:
+    return sum((ev.count or 1) for ev in events if ev.reason == "Unhealthy")
+
+
+def print_pod_timeline(pod: client.V1Pod, events: List[client.CoreV1Event]):
+    ready = any(c.type == "Ready" and c.status == "True" for c in ((pod.status.conditions if pod.status else None) or []))
+    print(f"  {pod.metadata.name} ({'Ready' if ready else 'not Ready'})")
+    for stage, secs in pod_startup_timeline(pod, events):
+        print(f"    {stage:22} {f'{secs:.1f}s' if secs is not None else '-'}")
+    failures = probe_failures(events)
+    if failures:
+        print(f"    probe failures         {failures}")
+
+
+def print_timeline_percentiles(timelines: List[List[Tuple[str, Optional[float]]]]):
+    samples: Dict[str, List[float]] = {}
+    for timeline in timelines:
+        for stage, secs in timeline:
+            samples.setdefault(stage, [])
+            if secs is not None:
+                samples[stage].append(secs)
+
+    def fmt(v: Optional[float]) -> str:
+        return f"{v:.1f}" if v is not None else "-"
+
+    rows = []
+    for stage, values in samples.items():
+        values.sort()
+        rows.append([stage, str(len(values)), fmt(percentile(values, 50)), fmt(percentile(values, 90)), fmt(percentile(values, 99)), fmt(values[-1] if values else None)])
+    fmt_table(["STAGE", "PODS", "P50 S", "P90 S", "P99 S", "MAX S"], rows)
+
+
+def parse_quantity(value: Any) -> Optional[float]:
+    """
+    Kubernetes quantity -> float (CPU in cores, memory in bytes): "250m" -> 0.25, "1Gi" -> 1073741824.
+    """
+    if value is None:
+        return None
+    m = QUANTITY_RE.match(str(value).strip())
+    if not m or m.group(2) not in QUANTITY_SUFFIXES:
+        return None
+    return float(m.group(1)) * QUANTITY_SUFFIXES[m.group(2)]
+
+
+def fmt_cpu(cores: Optional[float]) -> str:
+    return f"{int(round(cores * 1000))}m" if cores is not None else "-"
+
+
+def fmt_mem(size: Optional[float]) -> str:
+    if size is None:
+        return "-"
+    mib = size / 2 ** 20
+    return f"{mib / 1024:g}Gi" if mib >= 1024 and mib % 1024 == 0 else f"{int(math.ceil(mib))}Mi"
+
+
+def round_up(value: float, step: float) -> float:
+    return math.ceil(value / step) * step
+
+
+def sample_pod_metrics(
+    api_client: client.ApiClient,
+    ns: str,
+    selector: str,
+    window: int,
+    interval: int,
+) -> List[Dict[str, Any]]:
+    """
+    Poll metrics.k8s.io PodMetrics for the release's pods every `interval`
+    seconds for `window` seconds. Returns the raw PodMetricsList documents,
+    which is also the --metrics-record/--metrics-file format.
+    """
+    samples = []
+    deadline = time.monotonic() + window
+    while True:
+        try:
+            samples.append(api_client.call_api(
+                POD_METRICS_PATH, "GET",
+                path_params={"namespace": ns},
+                query_params=[("labelSelector", selector)] if selector else [],
+                response_type="object",
+                auth_settings=["BearerToken"],
+                _return_http_data_only=True,
+            ))
+        except ApiException as ex:
+            # Out of --deadline part way through the window: size from what we have.
+            if samples and is_timeout(ex):
+                return samples
+            raise
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return samples
+        print(f"  sampled {len(samples)} ({int(remaining)}s left)", flush=True)
+        time.sleep(min(interval, remaining))
+
+
+def usage_series(samples: List[Dict[str, Any]]) -> Dict[str, Dict[str, List[float]]]:
+    """
+    container name -> {"cpu": [cores...], "memory": [bytes...]} across all pods and samples.
+    """
+    out: Dict[str, Dict[str, List[float]]] = {}
+    for doc in samples:
+        for item in doc.get("items") or []:
+            for c in item.get("containers") or []:
+                usage = c.get("usage") or {}
+                series = out.setdefault(c.get("name"), {"cpu": [], "memory": []})
+                cpu, mem = parse_quantity(usage.get("cpu")), parse_quantity(usage.get("memory"))
+                if cpu is not None:
+                    series["cpu"].append(cpu)
+                if mem is not None:
+                    series["memory"].append(mem)
+    return out
+
+
+def load_metrics_file(path: str) -> List[Dict[str, Any]]:
+    """
+    Samples from a --metrics-record file; ValueError if the file is not one.
+    """
+    with open(path) as fh:
+        doc = json.load(fh)
+    samples = doc.get("samples") if isinstance(doc, dict) else None
+    if not isinstance(samples, list) or not all(isinstance(s, dict) for s in samples):
+        raise ValueError('expected a JSON object with a "samples" list, as written by --metrics-record')
+    return samples
+
+
+def oom_kills(pods: List[client.V1Pod]) -> Dict[str, int]:
+    """
+    container name -> pods whose last termination of it was OOMKilled.
+    """
+    out: Dict[str, int] = {}
+    for p in pods:
+        for cs in ((p.status.container_statuses if p.status else None) or []):
+            for st in (cs.state, cs.last_state):
+                if st is not None and st.terminated is not None and st.terminated.reason == "OOMKilled":
+                    out[cs.name] = out.get(cs.name, 0) + 1
+                    break
+    return out
+
+
+def recommend_resources(
+    cpu: List[float],
+    memory: List[float],
+    current: Dict[str, Dict[str, Optional[float]]],
+    oom_killed: bool,
+) -> Dict[str, Any]:
+    """
+    Requests from p90 usage, limits from peak usage, both with headroom. After
+    an OOM kill the memory limit never drops below 1.5x the current limit, since
+    the peak that killed the container was not observed.
+    """
+    cpu, memory = sorted(cpu), sorted(memory)
+    cpu_req = max(0.05, round_up(percentile(cpu, 90) * REQUEST_HEADROOM, 0.05)) if cpu else current["requests"]["cpu"]
+    cpu_lim = max(cpu_req or 0.1, round_up(cpu[-1] * LIMIT_HEADROOM, 0.1)) if cpu else current["limits"]["cpu"]
+    mib64 = 64 * 2 ** 20
+    mem_req = max(mib64, round_up(percentile(memory, 90) * REQUEST_HEADROOM, mib64)) if memory else current["requests"]["memory"]
+    mem_lim = max(mem_req or mib64, round_up(memory[-1] * LIMIT_HEADROOM, mib64)) if memory else current["limits"]["memory"]
+    if oom_killed and current["limits"]["memory"]:
+        mem_lim = max(mem_lim or 0, round_up(current["limits"]["memory"] * LIMIT_HEADROOM, mib64))
+
+    # Same arithmetic as the gateway wrapper's runtime_tuning.
+    heap_mib = int(mem_lim // 2 ** 20 * NODE_HEAP_FRACTION) if mem_lim else None
+    threads = MIN_UV_THREADPOOL
+    if cpu_lim:
+        threads = min(MAX_UV_THREADPOOL, max(MIN_UV_THREADPOOL, 2 * int(math.ceil(cpu_lim))))
+    return {
+        "requests": {"cpu": cpu_req, "memory": mem_req},
+        "limits": {"cpu": cpu_lim, "memory": mem_lim},
+        "max_old_space_mib": heap_mib,
+        "uv_threadpool_size": threads,
+    }
+
+
+def container_resources(container: client.V1Container) -> Dict[str, Dict[str, Optional[float]]]:
+    res = container.resources
+    requests = (res.requests if res else None) or {}
+    limits = (res.limits if res else None) or {}
+    return {
+        "requests": {"cpu": parse_quantity(requests.get("cpu")), "memory": parse_quantity(requests.get("memory"))},
+        "limits": {"cpu": parse_quantity(limits.get("cpu")), "memory": parse_quantity(limits.get("memory"))},
+    }
+
+
+def print_sizing(sts: client.V1StatefulSet, pods: List[client.V1Pod], samples: List[Dict[str, Any]]):
+    template = sts.spec.template.spec.containers if sts.spec and sts.spec.template and sts.spec.template.spec else []
+    series = usage_series(samples)
+    ooms = oom_kills(pods)
+    restarts: Dict[str, int] = {}
+    for p in pods:
+        for cs in ((p.status.container_statuses if p.status else None) or []):
+            restarts[cs.name] = restarts.get(cs.name, 0) + (cs.restart_count or 0)
+
+    rows = []
+    for c in template or []:
+        cur = container_resources(c)
+        cpu = sorted(series.get(c.name, {}).get("cpu", []))
+        mem = sorted(series.get(c.name, {}).get("memory", []))
+        rows.append([
+            c.name, str(len(cpu)),
+            f"{fmt_cpu(percentile(cpu, 50))}/{fmt_cpu(percentile(cpu, 90))}/{fmt_cpu(cpu[-1] if cpu else None)}",
+            f"{fmt_cpu(cur['requests']['cpu'])}/{fmt_cpu(cur['limits']['cpu'])}",
+            f"{fmt_mem(percentile(mem, 50))}/{fmt_mem(percentile(mem, 90))}/{fmt_mem(mem[-1] if mem else None)}",
+            f"{fmt_mem(cur['requests']['memory'])}/{fmt_mem(cur['limits']['memory'])}",
+            str(restarts.get(c.name, 0)), str(ooms.get(c.name, 0)),
+        ])
+    fmt_table(["CONTAINER", "SAMPLES", "CPU P50/P90/MAX", "CPU REQ/LIM", "MEM P50/P90/MAX", "MEM REQ/LIM", "RESTARTS", "OOMKILLED"], rows)
+
+    gateway = next((c for c in template or [] if c.name == "gateway"), None)
+    if gateway is None:
+        return
+    usage = series.get("gateway", {})
+    rec = recommend_resources(usage.get("cpu", []), usage.get("memory", []), container_resources(gateway), ooms.get("gateway", 0) > 0)
+    if not usage.get("memory") and not usage.get("cpu"):
+        print("  (no gateway usage samples; recommendation keeps current values)")
+    print("  Recommended values.yaml (gateway):")
+    print("    resources:")
+    for kind in ("requests", "limits"):
+        print(f"      {kind}:")
+        print(f"        cpu: {fmt_cpu(rec[kind]['cpu'])}")
+        print(f"        memory: {fmt_mem(rec[kind]['memory'])}")
+    print("    env:")
+    if rec["max_old_space_mib"]:
+        print(f'      NODE_OPTIONS: "--max-old-space-size={rec["max_old_space_mib"]}"')
+    print(f'      UV_THREADPOOL_SIZE: "{rec["uv_threadpool_size"]}"')
+
+
+def parse_duration(text: str) -> int:
+    """
+    "90" / "90s" / "10m" / "2h" / "1d" -> seconds.
+    """
+    m = DURATION_RE.match(text.strip())
+    if not m:
+        raise argparse.ArgumentTypeError(f"invalid duration: {text!r} (use e.g. 30s, 10m, 2h)")
+    value, unit = int(m.group(1)), m.group(2) or "s"
+    return value * {"s": 1, "m": 60, "h": 3600, "d": 86400}[unit]
+
+
+def log_sort_key(ts: str) -> Tuple[str, str]:
+    # RFC3339Nano drops trailing zeros, so pad the fraction before comparing.
+    base, _, frac = ts.rstrip("Z").partition(".")
+    return base, frac.ljust(9, "0")
+
+
+class LogStream:
+    """
+    One followed pod/container log. Only the newest `maxlen` unprinted lines
+    are kept; older ones are dropped (and counted) if the reader outpaces output.
+    """
+
+    def __init__(self, pod: str, container: str, maxlen: int = LOG_BUFFER_LINES):
+        self.pod = pod
+        self.container = container
+        self.buf: deque = deque(maxlen=max(1, maxlen))
+        self.dropped = 0
+        self.done = False
+        self.error: Optional[str] = None
+
+    def push(self, line: str, grep: Optional[re.Pattern]):
+        ts, _, text = line.partition(" ")
+        if grep and not grep.search(text):
+            return
+        if len(self.buf) == self.buf.maxlen:
+            self.dropped += 1
+        self.buf.append((log_sort_key(ts), time.monotonic(), ts, text))
+
+
+def follow_container_log(
+    v1: client.CoreV1Api,
+    ns: str,
+    stream: LogStream,
+    tail: Optional[int],
+    since_seconds: Optional[int],
+    grep: Optional[re.Pattern],
+    stop: threading.Event,
+):
+    """
+    Stream one container's log in chunks (no whole-response buffering) into stream.
+    """
+    kwargs: Dict[str, Any] = {
+        "name": stream.pod,
+        "namespace": ns,
+        "container": stream.container,
+        "follow": True,
+        "timestamps": True,
+        "_preload_content": False,
+    }
+    if tail:
+        kwargs["tail_lines"] = tail
+    if since_seconds:
+        kwargs["since_seconds"] = since_seconds
+    try:
+        resp = v1.read_namespaced_pod_log(**kwargs)
+    except ApiException as ex:
+        stream.error = f"{api_error(ex)}"
+        stream.done = True
+        return
+
+    partial = b""
+    try:
+        for chunk in resp.stream(LOG_CHUNK_BYTES):
+            if stop.is_set():
+                break
+            partial += chunk
+            *lines, partial = partial.split(b"\n")
+            if len(partial) > LOG_MAX_LINE_BYTES:
+                lines.append(partial)
+                partial = b""
+            for raw in lines:
+                stream.push(raw.decode("utf-8", errors="replace"), grep)
+        if partial:
+            stream.push(partial.decode("utf-8", errors="replace"), grep)
+    except Exception as ex:
+        if not stop.is_set():
+            stream.error = str(ex)
+    finally:
+        resp.release_conn()
+        stream.done = True
+
+
+def merge_log_streams(streams: List[LogStream], stop: threading.Event, holdback: float = LOG_MERGE_HOLDBACK):
+    """
+    Print lines from all streams in timestamp order until every stream ends or stop is set.
+    """
+    while True:
+        finished = all(st.done for st in streams)
+        cutoff = time.monotonic() - (0 if finished or stop.is_set() else holdback)
+        ready = []
+        for st in streams:
+            while st.buf and st.buf[0][1] <= cutoff:
+                ready.append((st.buf.popleft(), st))
+        ready.sort(key=lambda item: item[0][0])
+        for (_, _, ts, text), st in ready:
+            print(f"{ts} [{st.pod}/{st.container}] {text}")
+        sys.stdout.flush()
+        if stop.is_set() or (finished and not any(st.buf for st in streams)):
+            return
+        stop.wait(0.2)
+
+
+def follow_logs(v1: client.CoreV1Api, ns: str, pods: List[client.V1Pod], args: argparse.Namespace):
+    grep = args.grep
+    tail = args.tail_logs or (None if args.since else LOG_DEFAULT_TAIL)
+    stop = threading.Event()
+
+    streams = []
+    for pod in pods:
+        for c in (pod.spec.containers if pod.spec else None) or []:
+            streams.append(LogStream(pod.metadata.name, c.name, args.buffer_lines))
+    if not streams:
+        print("  ✗ No containers to follow.")
+        return
+
+    print(f"== Following logs: {len(streams)} container(s) in {len(pods)} pod(s) (Ctrl-C to stop) ==")
+    for st in streams:
+        threading.Thread(
+            target=follow_container_log,
+            args=(v1, ns, st, tail, args.since, grep, stop),
+            name=f"log-{st.pod}-{st.container}",
+            daemon=True,
+        ).start()
+    try:
+        merge_log_streams(streams, stop)
+    except KeyboardInterrupt:
+        stop.set()
+
+    for st in streams:
+        if st.error:
+            eprint(f"  ! {st.pod}/{st.container}: {st.error}")
+        if st.dropped:
+            eprint(f"  ! {st.pod}/{st.container}: dropped {st.dropped} line(s) (buffer full; raise --buffer-lines)")
+
+
 def main():
     ap = argparse.ArgumentParser(description="OpenClaw Helm/K8s diagnostic (StatefulSet).")
     ap.add_argument("-n", "--namespace", default=None, help="Namespace (default: current kube context namespace)")
     ap.add_argument("-s", "--statefulset", default="openclaw", help='StatefulSet name (default: "openclaw")')
     ap.add_argument("--print-token", action="store_true", help="Decode and print candidate gateway token(s) from referenced Secrets (careful).")
     ap.add_argument("--tail-logs", type=int, default=0, help="If >0, tail this many log lines from main container.")
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"Max concurrent API lookups once the pod is known (default: {DEFAULT_WORKERS}).")
+    ap.add_argument("--serial", action="store_true", help="Run API lookups one at a time, in report order (for comparison).")
+    ap.add_argument("-A", "--all-namespaces", action="store_true", help="Fleet mode: summarize every matching StatefulSet in the cluster.")
+    ap.add_argument("--selector", default=None, help=f'Fleet mode label selector (default: "{DEFAULT_FLEET_SELECTOR}"); without -A, scoped to the namespace.')
+    ap.add_argument("--full-report", action="store_true", help="Fleet mode: also print a per-release report after the summary table.")
+    follow_mode = ap.add_mutually_exclusive_group()
+    follow_mode.add_argument("--watch", action="store_true", help="After the report, keep watching the StatefulSet, its pods and events, printing only changes (Ctrl-C to stop).")
+    follow_mode.add_argument("--follow", action="store_true", help="After the report, stream logs from every pod/container of the StatefulSet, merged by timestamp (Ctrl-C to stop).")
+    ap.add_argument("--grep", default=None, help="With --follow: only print log lines matching this regex.")
+    ap.add_argument("--since", type=parse_duration, default=None, help="With --follow: only logs newer than this (e.g. 30s, 10m, 2h).")
+    ap.add_argument("--buffer-lines", type=int, default=LOG_BUFFER_LINES, help=f"With --follow: max unprinted lines kept per container (default: {LOG_BUFFER_LINES}).")
+    ap.add_argument("--profile", action="store_true", help="Print wall time per phase and per API request (verb, resource, latency, size, retries) at exit.")
+    ap.add_argument("--profile-json", default=None, metavar="PATH", help="Also write the profile as JSON to PATH (implies --profile).")
+    ap.add_argument("--probe", action="store_true", help="Load-test the gateway via pod IP, Service ClusterIP and Ingress hosts (uses the token --print-token finds).")
+    ap.add_argument("--probe-url", action="append", default=[], metavar="URL", help="Probe this URL instead of the discovered hops (repeatable).")
+    ap.add_argument("--probe-path", default="/", help='Request path for discovered hops (default: "/").')
+    ap.add_argument("--probe-requests", type=int, default=PROBE_REQUESTS, help=f"Requests per hop (default: {PROBE_REQUESTS}).")
+    ap.add_argument("--probe-concurrency", type=int, default=PROBE_CONCURRENCY, help=f"Concurrent connections per hop (default: {PROBE_CONCURRENCY}).")
+    ap.add_argument("--probe-timeout", type=float, default=PROBE_TIMEOUT, help=f"Per-request timeout in seconds (default: {PROBE_TIMEOUT}).")
+    ap.add_argument("--probe-token", default=os.environ.get("OPENCLAW_GATEWAY_TOKEN"), help="Gateway token to send (default: $OPENCLAW_GATEWAY_TOKEN, else discovered from the pod).")
+    ap.add_argument("--probe-insecure", action="store_true", help="Skip TLS verification for https Ingress hosts.")
+    ap.add_argument("--timeline", action="store_true", help="Startup timeline per pod (schedule, image pull, init containers, probes, Ready); fleet mode prints percentiles.")
+    ap.add_argument("--sizing", action="store_true", help="Sample metrics.k8s.io usage and recommend resources / Node heap / threadpool sizes.")
+    ap.add_argument("--sizing-window", type=parse_duration, default=SIZING_WINDOW, help=f"With --sizing: how long to sample (default: {SIZING_WINDOW}s).")
+    ap.add_argument("--sizing-interval", type=parse_duration, default=SIZING_INTERVAL, help=f"With --sizing: seconds between samples (default: {SIZING_INTERVAL}s).")
+    ap.add_argument("--metrics-record", default=None, metavar="PATH", help="With --sizing: save the raw metrics samples to PATH.")
+    ap.add_argument("--metrics-file", default=None, metavar="PATH", help="With --sizing: use samples recorded with --metrics-record instead of the metrics API.")
+    ap.add_argument("--backend", choices=BACKENDS, default=os.environ.get("OPENCLAW_DIAG_BACKEND", "kubernetes"),
+                    help="API client: the official kubernetes package (default) or the lean kube_lite client; "
+                         "lean falls back to kubernetes for kubeconfigs it cannot handle.")
+    ap.add_argument("--deadline", type=parse_duration, default=None, help="Overall time budget for the report (e.g. 60s, 2m); sections that miss it are reported as timed out.")
+    ap.add_argument("--request-timeout", type=float, default=REQUEST_TIMEOUT, help=f"Per API call timeout in seconds (default: {REQUEST_TIMEOUT:g}).")
+    ap.add_argument("--retries", type=int, default=API_RETRIES, help=f"Retries for throttled (429), 5xx and connection-failed API calls (default: {API_RETRIES}).")
+    ap.add_argument("--record", default=None, metavar="PATH", help="Save every API response of this run to a gzipped snapshot at PATH.")
+    ap.add_argument("--replay", default=None, metavar="PATH", help="Run against a snapshot from --record instead of a cluster (no kubeconfig needed).")
     args = ap.parse_args()
 
-    mode, ctx_ns = load_k8s_config()
+    if args.replay and (args.watch or args.follow):
+        ap.error("--watch/--follow stream from a live cluster and cannot be replayed")
+    if args.replay and args.record:
+        ap.error("--record and --replay are mutually exclusive")
+    if args.deadline is not None and args.deadline <= 0:
+        ap.error("--deadline must be positive")
+    if (args.grep is not None or args.since is not None) and not args.follow:
+        ap.error("--grep and --since only apply to --follow")
+    if args.grep is not None:
+        try:
+            args.grep = re.compile(args.grep)
+        except re.error as ex:
+            ap.error(f"--grep: invalid regex {args.grep!r}: {ex}")
+    metrics_samples = None
+    if args.metrics_file:
+        # Read up front: a bad file should fail before the report, not after it.
+        try:
+            metrics_samples = load_metrics_file(args.metrics_file)
+        except (OSError, ValueError) as ex:
+            eprint(f"  ✗ Could not read metrics file {args.metrics_file}: {ex}")
+            sys.exit(1)
+
+    prof = Profiler(enabled=args.profile or bool(args.profile_json))
+    deadline = Deadline(args.deadline, args.request_timeout, args.retries, prof)
+    backend = "replay" if args.replay else args.backend
+    prof.add_phase(f"import backend ({backend})", load_backend(backend))
+
+    prof.mark("load kubeconfig")
+    if args.replay:
+        try:
+            snap = client.load_snapshot(args.replay)
+        except (OSError, ValueError, client.ConfigException) as ex:
+            eprint(f"  ✗ Could not read snapshot {args.replay}: {ex}")
+            sys.exit(2)
+        mode, ctx_ns = "snapshot", snap.get("context_namespace") or "default"
+    else:
+        try:
+            mode, ctx_ns = load_k8s_config()
+        except Exception as ex:
+            if backend != "lean":
+                raise
+            eprint(f"  ! lean backend cannot use this config ({ex}); falling back to the kubernetes client")
+            backend = "kubernetes"
+            prof.add_phase(f"import backend ({backend})", load_backend(backend))
+            mode, ctx_ns = load_k8s_config()
+
+    if args.record:
+        recorder = SnapshotRecorder(args.record, ctx_ns)
+        recorder.install()
+        atexit.register(recorder.save)
+    # Profiler goes on last (outermost) so Deadline retries stay within one profiled call.
+    deadline.install()
+    prof.install()
+    if prof.enabled:
+        # atexit so the profile is still printed on the sys.exit(2) paths.
+        atexit.register(prof.report, args.profile_json)
+
+    if args.all_namespaces or args.selector:
+        run_fleet(args, client.CoreV1Api(), client.AppsV1Api(), client.NetworkingV1Api(), mode, ctx_ns, prof, deadline)
+        return
+
     ns = args.namespace or ctx_ns
     sts_name = args.statefulset
 
     print("== OpenClaw Diagnostic ==")
-    print(f"Config mode: {mode}")
+    print(f"Config mode: {mode} ({backend} client)")
     print(f"Namespace:  {ns}")
     print(f"StatefulSet: {sts_name}")
     print("")
@@ -226,12 +2162,13 @@ def main():
     net = client.NetworkingV1Api()
 
     # 1) Fetch StatefulSet
+    prof.mark("1) StatefulSet")
     print("1) StatefulSet")
     try:
         sts = get_statefulset(apps, ns, sts_name)
         print(f"  ✓ Found StatefulSet {ns}/{sts_name}")
     except ApiException as ex:
-        eprint(f"  ✗ Could not find StatefulSet {ns}/{sts_name}: {ex.status} {ex.reason}")
+        eprint(f"  ✗ Could not find StatefulSet {ns}/{sts_name}: {api_error(ex)}")
         sys.exit(2)
 
     replicas = sts.spec.replicas if sts.spec else None
@@ -245,23 +2182,19 @@ def main():
     print("")
 
     # 2) List pods for the StatefulSet
+    prof.mark("2) Pods")
     print("2) Pods")
     try:
-        pod_list = v1.list_namespaced_pod(namespace=ns, label_selector=selector if selector else None)
-        pods = pod_list.items or []
+        pods, pods_rv = list_all(v1.list_namespaced_pod, namespace=ns, label_selector=selector if selector else None)
     except ApiException as ex:
-        eprint(f"  ✗ Failed listing pods in {ns}: {ex.status} {ex.reason}")
+        eprint(f"  ✗ Failed listing pods in {ns}: {api_error(ex)}")
         sys.exit(2)
 
     if not pods:
         print("  ✗ No pods found for this StatefulSet selector.")
         sys.exit(2)
 
-    for p in pods:
-        name = p.metadata.name if p.metadata else "?"
-        phase = p.status.phase if p.status else "?"
-        pod_ip = p.status.pod_ip if p.status else "?"
-        print(f"  - {name:30} {phase:10} ip={pod_ip}")
+    print_pods(pods)
     pod = pick_main_pod(pods, sts_name)
     if not pod or not pod.metadata:
         print("  ✗ Could not select a pod to inspect.")
@@ -272,34 +2205,31 @@ def main():
     print("")
 
     # 3) Inspect container + env
+    prof.mark("3) Container")
     print("3) Container / Env / Token candidates")
     container = find_container(pod, prefer="gateway")
     if not container:
         print("  ✗ No containers found on pod.")
         sys.exit(2)
 
-    print(f"  container: {container.name}")
-    print(f"  image:     {container.image}")
-
-    env_hits = scan_env_for_token_candidates(container)
-    if env_hits:
-        print("  token-related env vars found:")
-        for name, src in env_hits:
-            print(f"    - {name}: {src}")
-    else:
-        print("  (no token-related env vars matched pattern)")
+    # Everything below only depends on the pod/container, so start the remaining
+    # lookups now and print their results in the usual section order.
+    lookups = Lookups(workers=args.workers, serial=args.serial)
+    secrets = SecretCache(v1, ns, lookups)
+    if args.print_token or args.probe:
+        secrets.prefetch(token_secret_names(container), label_selector=selector)
+    lookups.submit("service", try_find_service, v1, ns, sts_name)
+    lookups.submit("ingresses", list_ingresses, net, ns, sts_name, selector)
+    if args.tail_logs and args.tail_logs > 0:
+        lookups.submit("logs", tail_logs, v1, ns, pod_name, container.name, args.tail_logs)
+    if args.timeline:
+        lookups.submit("pod-events", list_all, v1.list_namespaced_event, namespace=ns, field_selector=POD_EVENTS_FIELD_SELECTOR)
 
-    # envFrom sources (often used for Secrets/ConfigMaps)
-    if container.env_from:
-        print("  envFrom sources:")
-        for ef in container.env_from:
-            if ef.secret_ref:
-                print(f"    - secretRef: {ef.secret_ref.name}")
-            if ef.config_map_ref:
-                print(f"    - configMapRef: {ef.config_map_ref.name}")
+    print_container(container)
     print("")
 
     # 4) Decode secrets if requested
+    prof.mark("4) Secret decoding")
     if args.print_token:
         print("4) Secret decoding (requested)")
         refs = collect_secret_refs(container)
@@ -317,7 +2247,14 @@ def main():
             print("  secretKeyRef env vars:")
             for env_name, sec_name, sec_key in refs:
                 if TOKEN_NAME_RE.search(env_name) or TOKEN_NAME_RE.search(sec_key):
-                    val = decode_secret_key(v1, ns, sec_name, sec_key)
+                    try:
+                        val = secrets.decode(sec_name, sec_key)
+                    except ApiException as ex:
+                        if is_timeout(ex):
+                            deadline.timed_out("4) Secret decoding", f"{sec_name}: {api_error(ex)}")
+                        else:
+                            eprint(f"  ! Failed reading secret {ns}/{sec_name}: {api_error(ex)}")
+                        continue
                     if val is not None:
                         decoded_any = True
                         print(f"    - {env_name} from {sec_name}/{sec_key}: {val}")
@@ -328,9 +2265,12 @@ def main():
             print("  envFrom secretRefs (scanning for likely token keys):")
             for sec_name in envfrom_secrets:
                 try:
-                    sec = v1.read_namespaced_secret(sec_name, ns)
+                    sec = secrets.get(sec_name)
                 except ApiException as ex:
-                    eprint(f"    ! Failed reading secret {ns}/{sec_name}: {ex.status} {ex.reason}")
+                    if is_timeout(ex):
+                        deadline.timed_out("4) Secret decoding", f"{sec_name}: {api_error(ex)}")
+                    else:
+                        eprint(f"    ! Failed reading secret {ns}/{sec_name}: {api_error(ex)}")
                     continue
                 keys = list((sec.data or {}).keys())
                 likely = [k for k in keys if TOKEN_NAME_RE.search(k)]
@@ -338,7 +2278,7 @@ def main():
                 if likely:
                     print(f"      likely token keys: {likely}")
                     for k in likely:
-                        val = decode_secret_key(v1, ns, sec_name, k)
+                        val = secrets.decode(sec_name, k)
                         if val is not None:
                             decoded_any = True
                             print(f"      {sec_name}/{k}: {val}")
@@ -352,62 +2292,131 @@ def main():
         print("")
 
     # 5) Service/Ingress presence
+    prof.mark("5) Service / Ingress")
     print("5) Service / Ingress")
-    svc = try_find_service(v1, ns, sts_name)
-    if svc:
-        t = svc.spec.type if svc.spec else "?"
-        ports = []
-        if svc.spec and svc.spec.ports:
-            for p in svc.spec.ports:
-                ports.append(f"{p.port}/{p.protocol}")
-        print(f"  ✓ Service {ns}/{sts_name}: type={t} ports={ports or '(none)'}")
-        if svc.spec and svc.spec.cluster_ip:
-            print(f"    clusterIP={svc.spec.cluster_ip}")
-    else:
-        print(f"  (no Service named {ns}/{sts_name})")
-
-    ing_hits = list_ingresses(net, ns, sts_name)
-    if ing_hits:
-        print(f"  ✓ Ingresses matching '{sts_name}':")
-        for ing in ing_hits:
-            n = ing.metadata.name if ing.metadata else "?"
-            hosts = []
-            if ing.spec and ing.spec.rules:
-                for r in ing.spec.rules:
-                    if r.host:
-                        hosts.append(r.host)
-            print(f"    - {n} hosts={hosts or '(none)'}")
-    else:
-        print("  (no matching Ingress found)")
+    for key, show in (("service", lambda svc: print_service(ns, sts_name, svc)), ("ingresses", lambda ings: print_ingresses(sts_name, ings))):
+        try:
+            show(lookups.result(key))
+        except ApiException as ex:
+            if not is_timeout(ex):
+                raise
+            deadline.timed_out("5) Service / Ingress", f"{key}: {api_error(ex)}")
     print("")
 
     # 6) Quick pod conditions/events
+    prof.mark("6) Pod status summary")
     print("6) Pod status summary")
-    phase = pod.status.phase if pod.status else "?"
-    print(f"  phase: {phase}")
-    if pod.status and pod.status.conditions:
-        for c in pod.status.conditions:
-            print(f"  condition {c.type:18} = {c.status} (reason={c.reason or ''})")
+    print_pod_status(pod)
     print("")
 
     # 7) Optional log tail
+    prof.mark("7) Log tail")
     if args.tail_logs and args.tail_logs > 0:
         print("7) Log tail")
         try:
-            text = tail_logs(v1, ns, pod_name, container.name, args.tail_logs)
+            text = lookups.result("logs")
             print(text.rstrip())
         except ApiException as ex:
-            eprint(f"  ✗ Failed to read logs: {ex.status} {ex.reason}")
+            if is_timeout(ex):
+                deadline.timed_out("7) Log tail", api_error(ex))
+            else:
+                eprint(f"  ✗ Failed to read logs: {api_error(ex)}")
         print("")
     else:
         print("7) Log tail")
         print("  (skipped; re-run with --tail-logs N to fetch logs)")
         print("")
 
+    # 8) Optional gateway probe
+    if args.probe:
+        prof.mark("8) Gateway probe")
+        print("8) Gateway probe")
+        try:
+            if deadline.expired():
+                raise deadline.error(f"--deadline {deadline.seconds:g}s reached; skipped")
+            targets = [("url", u) for u in args.probe_url] or probe_targets(
+                pod, container, lookups.result("service"), lookups.result("ingresses"),
+            )
+        except ApiException as ex:
+            if not is_timeout(ex):
+                raise
+            deadline.timed_out("8) Gateway probe", api_error(ex))
+            targets = None
+        if targets is not None:
+            token = args.probe_token or find_gateway_token(container, secrets)
+            if not token:
+                print("  ! no gateway token found; probing unauthenticated")
+            results = []
+            for hop, base in targets:
+                url = base if hop == "url" else base.rstrip("/") + args.probe_path
+                print(f"  probing {hop}: {url} ({args.probe_requests} requests, concurrency {args.probe_concurrency})")
+                results.append((hop, probe_url(url, token, args.probe_requests, args.probe_concurrency, args.probe_timeout, args.probe_insecure)))
+            if results:
+                print_probe_results(results)
+            else:
+                print("  (no pod IP, Service or Ingress to probe)")
+        print("")
+
+    # 9) Optional startup timeline
+    if args.timeline:
+        prof.mark("9) Startup timeline")
+        print("9) Startup timeline")
+        try:
+            events, _ = lookups.result("pod-events")
+        except ApiException as ex:
+            if is_timeout(ex):
+                deadline.timed_out("9) Startup timeline", api_error(ex))
+            else:
+                eprint(f"  ! Failed listing pod events: {api_error(ex)} (image pull / probe data unavailable)")
+            events = []
+        by_uid = events_by_pod_uid(events)
+        for p in pods:
+            print_pod_timeline(p, by_uid.get(p.metadata.uid, []))
+        print("")
+
+    # 10) Optional resource sizing
+    if args.sizing:
+        prof.mark("10) Resource sizing")
+        print("10) Resource sizing")
+        samples = None
+        if args.metrics_file:
+            samples = metrics_samples
+            print(f"  replaying {len(samples)} sample(s) from {args.metrics_file}")
+        else:
+            print(f"  sampling metrics.k8s.io every {args.sizing_interval}s for {args.sizing_window}s")
+            try:
+                samples = sample_pod_metrics(v1.api_client, ns, selector, args.sizing_window, args.sizing_interval)
+            except ApiException as ex:
+                if is_timeout(ex):
+                    deadline.timed_out("10) Resource sizing", api_error(ex))
+                else:
+                    eprint(f"  ✗ Failed reading pod metrics (is metrics-server installed?): {api_error(ex)}")
+            if samples is not None and args.metrics_record:
+                with open(args.metrics_record, "w") as fh:
+                    json.dump({"namespace": ns, "selector": selector, "samples": samples}, fh, indent=2)
+                    fh.write("\n")
+                print(f"  recorded {len(samples)} sample(s) to {args.metrics_record}")
+        if samples is not None:
+            print_sizing(sts, pods, samples)
+        print("")
+    lookups.close()
+    prof.mark(None)
+
+    print_timed_out(deadline)
     print("== Done ==")
     print("Tip: If the dashboard says 'gateway token missing', re-run with --print-token and look for a token env/secret.")
     print("     If you're using NetworkPolicy with default-deny egress, ensure egress to the API server is allowed.")
 
+    deadline.release()
+    if args.watch:
+        print("")
+        print(f"== Watching {ns}/{sts_name} (Ctrl-C to stop) ==")
+        watcher = ReleaseWatcher(v1, apps, ns, sts, selector)
+        watcher.run(pods, sts.metadata.resource_version, pods_rv)
+    elif args.follow:
+        print("")
+        follow_logs(v1, ns, pods, args)
+
 
 if __name__ == "__main__":
     main()
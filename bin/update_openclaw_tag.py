@@ -7,74 +7,178 @@ Defaults:
 
 Optional:
 - --build-config to update build-config.json if present
-- --values PATH to update a different values file
+- --values PATH to update a different values file (repeatable, globs allowed;
+  see update_values.py for other keys)
 - --dry-run to print changes only
+
+Release lookups are cached on disk (--cache). Within --cache-ttl seconds the
+cached tag is used without a request; after that the API is asked with
+If-None-Match, and a 304 (which GitHub does not count against the rate
+limit) just refreshes the entry. An unreachable API or a rate-limit answer
+(403/429) falls back to the cached tag. --offline only reads the cache. A token
+from --token, GITHUB_TOKEN or GH_TOKEN raises the rate limit; --api-url
+points the lookup at another endpoint (e.g. a local stand-in).
+
+--pin-digest also resolves the tag to a manifest digest through the OCI
+registry API of the source image in build-config.json (default
+ghcr.io/openclaw/openclaw) and writes it to image.digest, so pods run
+exactly that content and nodes only pull when it changes. The multi-arch
+index digest is pinned unless --platform names one platform (e.g.
+linux/amd64), which only suits single-architecture clusters. Registries on
+localhost are spoken to over plain HTTP; see oci_registry.py for
+credentials.
 """
 from __future__ import annotations
 
 import argparse
 import json
+import os
 import sys
+import time
+import urllib.error
 import urllib.request
 from pathlib import Path
+from typing import Optional, Tuple
+
+from oci_registry import DIGEST_RE, pick_digest, resolve_digests
+from update_values import expand, set_values, update_files, write_atomic
 
 API_URL = "https://api.github.com/repos/openclaw/openclaw/releases/latest"
+CACHE_PATH = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "openclaw-helm" / "releases.json"
+CACHE_TTL = 300
+TIMEOUT = 15
+# Only these release fields are kept in the cache.
+CACHED_FIELDS = ("tag_name", "name", "published_at", "html_url")
+# GitHub answers an exhausted rate limit with 403 (primary) or 429 (secondary).
+RATE_LIMITED = (403, 429)
 
+TAG_PATH = ("image", "tag")
+DIGEST_PATH = ("image", "digest")
+DEFAULT_SOURCE = {"registry": "ghcr.io", "image": "openclaw/openclaw"}
+# The multi-arch index, so nodes of every architecture pull their own image.
+PLATFORM = "index"
 
-def fetch_latest_tag() -> str:
-    req = urllib.request.Request(
-        API_URL,
-        headers={"Accept": "application/vnd.github+json", "User-Agent": "openclaw-kube"},
-    )
-    with urllib.request.urlopen(req, timeout=15) as resp:
-        data = json.loads(resp.read().decode("utf-8"))
+
+def load_cache(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(path: Path, cache: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+    tmp.write_text(json.dumps(cache, indent=2, sort_keys=True) + "\n")
+    os.replace(tmp, path)
+
+
+def release_tag(data: dict) -> str:
     tag = data.get("tag_name")
     if not tag:
         raise RuntimeError("No tag_name in GitHub release response")
     return tag
 
 
-def update_values_yaml(path: Path, tag: str, dry_run: bool) -> bool:
+def fetch_latest_tag(
+    api_url: str = API_URL,
+    cache_path: Optional[Path] = CACHE_PATH,
+    ttl: float = CACHE_TTL,
+    token: Optional[str] = None,
+    offline: bool = False,
+    timeout: float = TIMEOUT,
+) -> str:
+    cache = load_cache(cache_path) if cache_path else {}
+    entry = cache.get(api_url)
+    if offline:
+        if not entry:
+            raise RuntimeError(f"--offline: no cached release for {api_url} in {cache_path}")
+        return release_tag(entry["data"])
+    if entry and time.time() - entry.get("checked_at", 0) < ttl:
+        return release_tag(entry["data"])
+
+    headers = {"Accept": "application/vnd.github+json", "User-Agent": "openclaw-kube"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    req = urllib.request.Request(api_url, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            data = json.loads(resp.read().decode("utf-8"))
+            etag = resp.headers.get("ETag")
+        entry = {"etag": etag, "data": {k: data.get(k) for k in CACHED_FIELDS}}
+    except urllib.error.HTTPError as e:
+        if entry and e.code in RATE_LIMITED:
+            print(f"Warning: {api_url}: HTTP {e.code} {e.reason} (rate limited?); using cached release", file=sys.stderr)
+            return release_tag(entry["data"])
+        if e.code != 304 or not entry:
+            raise
+    except (urllib.error.URLError, OSError) as e:
+        if not entry:
+            raise
+        print(f"Warning: {api_url}: {getattr(e, 'reason', e)}; using cached release", file=sys.stderr)
+        return release_tag(entry["data"])
+
+    tag = release_tag(entry["data"])
+    if cache_path:
+        entry["checked_at"] = time.time()
+        cache[api_url] = entry
+        try:
+            save_cache(cache_path, cache)
+        except OSError as e:
+            print(f"Warning: could not write {cache_path}: {e}", file=sys.stderr)
+    return tag
+
+
+def source_image(path: Path) -> Tuple[str, str]:
+    """(registry, repository) of the source image from build-config.json, or the upstream default."""
+    source = dict(DEFAULT_SOURCE)
+    if path.exists():
+        source.update({k: v for k, v in json.loads(path.read_text()).get("source", {}).items() if v})
+    return source["registry"], source["image"]
+
+
+def image_updates(tag: str, digest: Optional[str]) -> Tuple[dict, tuple]:
+    """(updates, existing_only) for set_values.
+
+    image.tag is never added: a file without one does not set the image tag.
+    Without --pin-digest an existing image.digest is cleared, since a digest
+    left from an earlier pinned run would keep pods on the old image while
+    values name the new tag; files without the key are left alone.
+    """
+    return {TAG_PATH: tag, DIGEST_PATH: digest or ""}, (TAG_PATH,) if digest else (TAG_PATH, DIGEST_PATH)
+
+
+def update_values_yaml(path: Path, tag: str, dry_run: bool, digest: Optional[str] = None) -> bool:
     if not path.exists():
         raise FileNotFoundError(f"values file not found: {path}")
     text = path.read_text()
-    lines = text.splitlines()
-    changed = False
-    out = []
-    in_image = False
-    for line in lines:
-        stripped = line.strip()
-        if stripped.startswith("image:"):
-            in_image = True
-            out.append(line)
-            continue
-        if in_image:
-            if stripped and not line.startswith(" ") and not line.startswith("\t"):
-                in_image = False
-        if in_image and stripped.startswith("tag:"):
-            prefix = line.split("tag:", 1)[0]
-            new_line = f"{prefix}tag: \"{tag}\""
-            out.append(new_line)
-            changed = True
-            continue
-        out.append(line)
-    if not changed:
+    new_text, notes, missing = set_values(text, *image_updates(tag, digest))
+    if TAG_PATH in missing:
         raise RuntimeError("Did not find image.tag to update in values file")
-    new_text = "\n".join(out) + ("\n" if text.endswith("\n") else "")
+    for note in notes:
+        if note.startswith("image.digest: sha256:") and not digest:
+            print(f"Cleared {note.split(' -> ')[0]} (use --pin-digest to pin {tag})", file=sys.stderr)
     if dry_run:
         sys.stdout.write(new_text)
-    else:
-        path.write_text(new_text)
-    return changed
+    elif new_text != text:
+        write_atomic(path, new_text)
+    return new_text != text
 
 
 def update_build_config(path: Path, tag: str, dry_run: bool) -> bool:
     if not path.exists():
         return False
     data = json.loads(path.read_text())
-    if data.get("source_tag") == tag:
+    # The Makefile reads source.tag; older files kept a top-level source_tag.
+    source = data.get("source") if isinstance(data.get("source"), dict) else None
+    if (source or data).get("tag" if source else "source_tag") == tag:
         return False
-    data["source_tag"] = tag
+    if source is not None:
+        source["tag"] = tag
+    else:
+        data["source_tag"] = tag
     if dry_run:
         json.dump(data, sys.stdout, indent=2)
         sys.stdout.write("\n")
@@ -85,17 +189,65 @@ def update_build_config(path: Path, tag: str, dry_run: bool) -> bool:
 
 def main() -> int:
     parser = argparse.ArgumentParser()
-    parser.add_argument("--values", default="chart/values.yaml", help="Path to values.yaml")
+    parser.add_argument("--values", action="append", default=None,
+                        help="Values file or glob to update (repeatable; default: chart/values.yaml)")
     parser.add_argument("--build-config", action="store_true", help="Also update build-config.json")
     parser.add_argument("--dry-run", action="store_true", help="Print changes only")
+    parser.add_argument("--api-url", default=API_URL, help="Latest-release API endpoint")
+    parser.add_argument("--token", default=os.environ.get("GITHUB_TOKEN") or os.environ.get("GH_TOKEN"),
+                        help="GitHub token (default: $GITHUB_TOKEN or $GH_TOKEN)")
+    parser.add_argument("--cache", default=str(CACHE_PATH), help=f"Release cache file (default: {CACHE_PATH})")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the release cache")
+    parser.add_argument("--cache-ttl", type=float, default=CACHE_TTL,
+                        help=f"Seconds a cached release is used without asking the API (default: {CACHE_TTL})")
+    parser.add_argument("--offline", action="store_true", help="Use the cached release only; no network")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help=f"API timeout in seconds (default: {TIMEOUT})")
+    parser.add_argument("--pin-digest", action="store_true",
+                        help="Also resolve the tag to a manifest digest and write image.digest")
+    parser.add_argument("--platform", default=PLATFORM,
+                        help=f"'index' for the multi-arch index, or a platform (e.g. linux/amd64) to pin its manifest only (default: {PLATFORM})")
     args = parser.parse_args()
+    if args.offline and args.no_cache:
+        parser.error("--offline needs the cache; drop --no-cache")
 
-    tag = fetch_latest_tag()
+    tag = fetch_latest_tag(
+        api_url=args.api_url,
+        cache_path=None if args.no_cache else Path(args.cache),
+        ttl=args.cache_ttl,
+        token=args.token,
+        offline=args.offline,
+        timeout=args.timeout,
+    )
     print(f"Latest tag: {tag}")
 
-    values_path = Path(args.values)
-    update_values_yaml(values_path, tag, args.dry_run)
-    print(f"Updated: {values_path}")
+    digest = None
+    if args.pin_digest:
+        registry, repository = source_image(Path("build-config.json"))
+        index_digest, platforms = resolve_digests(registry, repository, tag, args.timeout)
+        for name, platform_digest in sorted(platforms.items()):
+            print(f"  {name}: {platform_digest}")
+        digest = pick_digest(index_digest, platforms, args.platform)
+        if not DIGEST_RE.match(digest):
+            raise RuntimeError(f"Unexpected digest from {registry}: {digest}")
+        print(f"Pinned digest ({args.platform}): {registry}/{repository}@{digest}")
+
+    failed = False
+    files = expand(args.values or ["chart/values.yaml"])
+    if len(files) == 1:
+        values_path = Path(files[0])
+        update_values_yaml(values_path, tag, args.dry_run, digest)
+        print(f"Updated: {values_path}")
+    else:
+        updates, existing_only = image_updates(tag, digest)
+        for result in update_files(files, updates, dry_run=args.dry_run, existing_only=existing_only):
+            if result["status"] == "error":
+                print(f"Error: {result['path']}: {'; '.join(result['notes'])}", file=sys.stderr)
+                failed = True
+            elif TAG_PATH in result["missing"]:
+                print(f"Missing: {result['path']} (no image.tag)", file=sys.stderr)
+                failed = True
+            else:
+                print(f"{result['status'].capitalize()}: {result['path']}")
 
     if args.build_config:
         updated = update_build_config(Path("build-config.json"), tag, args.dry_run)
@@ -104,7 +256,7 @@ def main() -> int:
         else:
             print("Skipped: build-config.json (missing or already up to date)")
 
-    return 0
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
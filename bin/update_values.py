@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""Set dotted key paths in many Helm values files at once.
+
+Edits the YAML text in place, so comments, blank lines, key order and the
+quoting style of each value are kept. Only the value of the addressed key is
+touched; a missing leaf is added under its parent mapping when the parent
+exists. Files that already hold the requested values are not rewritten, and
+changed files are replaced atomically.
+
+Paths are dotted keys; list items are addressed by index and a literal dot
+in a key is escaped as "\\.":
+  image.tag
+  extraContainers.0.image
+  podAnnotations.prometheus\\.io/port
+
+Usage:
+  python bin/update_values.py --set image.tag=2026.1.5 chart/values.yaml 'chart/examples/*.yaml'
+  python bin/update_values.py --set image.tag=2026.1.5 --set image.digest=sha256:... --diff 'envs/**/*.yaml'
+  python bin/update_values.py --set image.tag=2026.1.5 --dry-run --jobs 8 'envs/**/values-*.yaml'
+"""
+from __future__ import annotations
+
+import argparse
+import difflib
+import glob
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Collection, Dict, List, Optional, Sequence, Tuple, Union
+
+Key = Union[str, int]
+
+# "key: rest" or "- key: rest"; keys may be quoted. Values are matched separately.
+KEY_RE = re.compile(r"""^(?P<indent> *)(?P<dash>-(?: +|$))?(?P<key>"[^"]*"|'[^']*'|[^\s#'"\-][^#]*?|-[^\s#][^#]*?) *:(?: +(?P<rest>.*)|$)""")
+DASH_RE = re.compile(r"^(?P<indent> *)-(?: +(?P<rest>.*)|$)")
+# Plain scalars safe to write unquoted without YAML reading them as another type.
+PLAIN_SAFE_RE = re.compile(r"^[A-Za-z_./@+][A-Za-z0-9_./@:+-]*$")
+PLAIN_TYPED_RE = re.compile(r"^(?:true|false|yes|no|on|off|null|~|y|n)$", re.IGNORECASE)
+# Below this many files the process pool costs more than it saves.
+PARALLEL_MIN_FILES = 64
+
+
+def parse_path(dotted: str) -> Tuple[Key, ...]:
+    parts = re.split(r"(?<!\\)\.", dotted)
+    if not all(parts):
+        raise ValueError(f"empty segment in key path: {dotted}")
+    return tuple(int(p) if p.isdigit() else p.replace("\\.", ".") for p in parts)
+
+
+def format_path(path: Sequence[Key]) -> str:
+    return ".".join(str(p).replace(".", "\\.") for p in path)
+
+
+def split_comment(rest: str) -> Tuple[str, str]:
+    """Split "value  # comment" into ("value", "  # comment"), respecting quotes."""
+    quote = None
+    for i, ch in enumerate(rest):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "\"'" and (i == 0 or rest[i - 1] in " \t"):
+            quote = ch
+        elif ch == "#" and (i == 0 or rest[i - 1] in " \t"):
+            value = rest[:i].rstrip()
+            return value, rest[len(value):]
+    return rest.rstrip(), rest[len(rest.rstrip()):]
+
+
+def unquote(raw: str) -> str:
+    if len(raw) >= 2 and raw[0] == raw[-1] == '"':
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return raw[1:-1]
+    if len(raw) >= 2 and raw[0] == raw[-1] == "'":
+        return raw[1:-1].replace("''", "'")
+    return raw
+
+
+def format_scalar(value: str, old_raw: Optional[str]) -> str:
+    """Render value in the quoting style of the value it replaces (double quotes for new keys)."""
+    if old_raw and old_raw[0] == "'":
+        return "'" + value.replace("'", "''") + "'"
+    if old_raw and old_raw[0] != '"' and PLAIN_SAFE_RE.match(value) and not PLAIN_TYPED_RE.match(value):
+        return value
+    return json.dumps(value)
+
+
+class ValuesIndex:
+    """Where every key of a block-style YAML document sits in its lines.
+
+    Flow collections ({...}, [...]) are treated as opaque values and block
+    scalars (|, >) are skipped, which covers how values files are written.
+    With `wanted`, scanning stops at the first top-level key after which every
+    wanted path is either found or can no longer be added (its parent block
+    has ended), so a bump of image.tag reads only the top of each file.
+    """
+
+    def __init__(self, lines: List[str], wanted: Sequence[Tuple[Key, ...]] = ()):
+        # path -> (line number, column where the value starts, raw value, comment)
+        self.values: Dict[Tuple[Key, ...], Tuple[int, int, str, str]] = {}
+        # mapping path -> indent of its keys, and the last line of its block
+        self.child_indent: Dict[Tuple[Key, ...], int] = {}
+        self.last_line: Dict[Tuple[Key, ...], int] = {}
+        stack: List[Tuple[int, Key]] = []
+        seq_index: Dict[Tuple[Tuple[Key, ...], int], int] = {}
+        block_indent: Optional[int] = None
+
+        for n, line in enumerate(lines):
+            stripped = line.strip()
+            indent = len(line) - len(line.lstrip(" "))
+            if block_indent is not None:
+                if not stripped or indent > block_indent:
+                    self._extend(stack, n)
+                    continue
+                block_indent = None
+            if not stripped or stripped.startswith("#"):
+                continue
+            if stripped in ("---", "..."):
+                stack = []
+                continue
+
+            m = KEY_RE.match(line)
+            dash = DASH_RE.match(line) if not m or m.group("dash") else None
+            if dash:
+                col = len(dash.group("indent"))
+                while stack and stack[-1][0] >= col:
+                    stack.pop()
+                parent = tuple(k for _, k in stack)
+                index = seq_index.get((parent, col), -1) + 1
+                seq_index[(parent, col)] = index
+                self.child_indent.setdefault(parent, col)
+                stack.append((col, index))
+                if m:
+                    # "- key: value" opens a mapping item; record the item itself.
+                    self.values[tuple(k for _, k in stack)] = (n, len(line), "", "")
+                else:
+                    self._extend(stack, n)
+                    self.values[tuple(k for _, k in stack)] = (n, len(line) - len(dash.group("rest") or ""), *split_comment(dash.group("rest") or ""))
+                    continue
+            if not m:
+                self._extend(stack, n)
+                continue
+
+            col = len(m.group("indent")) + len(m.group("dash") or "")
+            if col == 0 and wanted and self._resolved(wanted, unquote(m.group("key").strip())):
+                break
+            while stack and stack[-1][0] >= col:
+                stack.pop()
+            parent = tuple(k for _, k in stack)
+            self.child_indent.setdefault(parent, col)
+            key = unquote(m.group("key").strip())
+            stack.append((col, key))
+            path = tuple(k for _, k in stack)
+            rest = m.group("rest") or ""
+            value, comment = split_comment(rest)
+            start = m.start("rest") if m.group("rest") is not None else len(line.rstrip())
+            self.values[path] = (n, start, value, comment)
+            self._extend(stack, n)
+            if value[:1] in ("|", ">"):
+                block_indent = col
+
+    def _resolved(self, wanted: Sequence[Tuple[Key, ...]], next_key: Key) -> bool:
+        for path in wanted:
+            if path in self.values:
+                continue
+            parent = path[:-1]
+            if not parent or parent not in self.values or parent[0] == next_key:
+                return False
+        return True
+
+    def _extend(self, stack: List[Tuple[int, Key]], n: int) -> None:
+        path = tuple(k for _, k in stack)
+        for i in range(len(path) + 1):
+            self.last_line[path[:i]] = n
+
+
+def set_values(text: str, updates: Dict[Tuple[Key, ...], str],
+               existing_only: Collection[Tuple[Key, ...]] = ()) -> Tuple[str, List[str], List[Tuple[Key, ...]]]:
+    """Apply updates to YAML text. Returns (new text, per-key notes, missing paths).
+
+    Paths in existing_only are changed where the file has them but never added.
+    Missing paths are those the text still lacks: absent existing_only paths and
+    paths whose parent mapping does not exist.
+    """
+    lines = text.splitlines()
+    notes = []
+    missing: List[Tuple[Key, ...]] = []
+    inserts: List[Tuple[int, str]] = []
+    index = ValuesIndex(lines, list(updates))
+    for path, value in updates.items():
+        name = format_path(path)
+        found = index.values.get(path)
+        if found:
+            n, start, raw, comment = found
+            if raw and unquote(raw) == value and raw[:1] not in ("|", ">", "{", "["):
+                notes.append(f"{name}: unchanged")
+                continue
+            if raw[:1] in ("|", ">", "{", "[") or (raw == "" and path in index.child_indent):
+                notes.append(f"{name}: skipped (not a scalar)")
+                continue
+            line = lines[n]
+            sep = "" if start < len(line) else " "
+            rendered = format_scalar(value, raw or None) + (" " if not raw and comment else "")
+            lines[n] = line[:start] + sep + rendered + comment
+            notes.append(f"{name}: {unquote(raw) or '(empty)'} -> {value}")
+            continue
+        parent = path[:-1]
+        if path in existing_only:
+            notes.append(f"{name}: missing (not added)")
+        elif parent and parent not in index.values:
+            notes.append(f"{name}: missing")
+        elif isinstance(path[-1], int) or parent not in index.child_indent:
+            notes.append(f"{name}: missing (no block mapping at {format_path(parent) or 'top level'})")
+        else:
+            key = path[-1]
+            key_text = key if re.match(r"^[A-Za-z0-9_./-]+$", key) else json.dumps(key)
+            inserts.append((index.last_line[parent], " " * index.child_indent[parent] + f"{key_text}: {format_scalar(value, None)}"))
+            notes.append(f"{name}: added {value}")
+            continue
+        missing.append(path)
+    # Bottom-up, so earlier line numbers stay valid; keys added after the same
+    # line go in last-requested first, which leaves them in request order.
+    for n, line in reversed(sorted(inserts, key=lambda item: item[0])):
+        lines.insert(n + 1, line)
+    return "\n".join(lines) + ("\n" if text.endswith("\n") or not text else ""), notes, missing
+
+
+def write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+    try:
+        tmp.write_text(text)
+        os.chmod(tmp, path.stat().st_mode & 0o7777)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def update_file(path: str, updates: Dict[Tuple[Key, ...], str], dry_run: bool = False, diff: bool = False,
+                existing_only: Collection[Tuple[Key, ...]] = ()) -> dict:
+    """Update one file; returns {"path", "status", "notes", "missing", "diff"}.
+
+    status: updated/unchanged, partial (some keys missing, the rest applied),
+    missing (every key missing) or error. "missing" lists the paths the file
+    lacks, as in set_values; absent existing_only paths don't affect status.
+    """
+    result = {"path": path, "status": "unchanged", "notes": [], "missing": [], "diff": ""}
+    try:
+        text = Path(path).read_text()
+        new_text, notes, result["missing"] = set_values(text, updates, existing_only)
+        result["notes"] = notes
+        missing = [p for p in result["missing"] if p not in existing_only]
+        if missing:
+            result["status"] = "missing" if len(result["missing"]) == len(updates) else "partial"
+        if new_text == text:
+            return result
+        if not missing:
+            result["status"] = "updated"
+        if diff:
+            result["diff"] = "".join(difflib.unified_diff(text.splitlines(True), new_text.splitlines(True), path, path))
+        if not dry_run:
+            write_atomic(Path(path), new_text)
+    except (OSError, UnicodeDecodeError) as e:
+        result["status"] = "error"
+        result["notes"] = [str(e)]
+    return result
+
+
+def expand(patterns: Sequence[str]) -> List[str]:
+    files: Dict[str, None] = {}
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        for match in matches:
+            if os.path.isfile(match) or not glob.has_magic(pattern):
+                files[match] = None
+    return list(files)
+
+
+def update_files(files: Sequence[str], updates: Dict[Tuple[Key, ...], str], dry_run: bool = False,
+                 diff: bool = False, jobs: Optional[int] = None,
+                 existing_only: Collection[Tuple[Key, ...]] = ()) -> List[dict]:
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(files) < PARALLEL_MIN_FILES:
+        return [update_file(f, updates, dry_run, diff, existing_only) for f in files]
+    chunksize = max(1, len(files) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(update_file, files, [updates] * len(files), [dry_run] * len(files),
+                             [diff] * len(files), [existing_only] * len(files), chunksize=chunksize))
+
+
+def parse_set(item: str) -> Tuple[Tuple[Key, ...], str]:
+    path, sep, value = item.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected PATH=VALUE, got {item!r}")
+    try:
+        return parse_path(path), value
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Set dotted key paths in many values files")
+    parser.add_argument("files", nargs="+", help="Values files or globs (quote globs; ** recurses)")
+    parser.add_argument("--set", dest="sets", action="append", type=parse_set, required=True, metavar="PATH=VALUE",
+                        help="Key path and string value, e.g. image.tag=2026.1.5 (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing")
+    parser.add_argument("--diff", action="store_true", help="Print a unified diff per changed file")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--quiet", action="store_true", help="Only print the totals")
+    args = parser.parse_args()
+
+    files = expand(args.files)
+    if not files:
+        print("No files matched", file=sys.stderr)
+        return 1
+    updates = dict(args.sets)
+    results = update_files(files, updates, args.dry_run, args.diff, args.jobs)
+
+    totals: Dict[str, int] = {}
+    for result in results:
+        totals[result["status"]] = totals.get(result["status"], 0) + 1
+        if args.quiet or (result["status"] == "unchanged" and not args.diff):
+            continue
+        print(f"{result['status']:9} {result['path']}: {'; '.join(result['notes'])}")
+        if result["diff"]:
+            sys.stdout.write(result["diff"])
+    verb = "would update" if args.dry_run else "updated"
+    print(f"{len(results)} file(s): {totals.get('updated', 0)} {verb}, {totals.get('unchanged', 0)} unchanged, "
+          f"{totals.get('partial', 0)} partial (some keys missing), {totals.get('missing', 0)} missing key(s), "
+          f"{totals.get('error', 0)} error(s)")
+    return 1 if totals.get("error") else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
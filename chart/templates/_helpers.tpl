@@ -87,9 +87,12 @@ Create the name of the config map to use
 Create the image reference
 */}}
 {{- define "openclaw.image" -}}
+{{- $ref := printf "%s:%s" .Values.image.repository (.Values.image.tag | default .Chart.AppVersion) }}
 {{- if .Values.image.registry }}
-{{- printf "%s/%s:%s" .Values.image.registry .Values.image.repository (.Values.image.tag | default .Chart.AppVersion) }}
-{{- else }}
-{{- printf "%s:%s" .Values.image.repository (.Values.image.tag | default .Chart.AppVersion) }}
+{{- $ref = printf "%s/%s" .Values.image.registry $ref }}
+{{- end }}
+{{- if .Values.image.digest }}
+{{- $ref = printf "%s@%s" $ref .Values.image.digest }}
 {{- end }}
+{{- $ref }}
 {{- end }}
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# Cold vs warm gateway start: seconds until the gateway port accepts
+# connections with the compile cache off, empty (cold) and populated (warm).
+# Runs inside the image next to a live gateway without touching it: each run
+# gets a throwaway state dir and cache dir, its own ports and no channels.
+#
+#   kubectl exec openclaw-0 -- openclaw-bench-startup --runs 5
+import argparse
+import os
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def wait_for_port(port, proc, timeout):
+    start = time.monotonic()
+    while time.monotonic() - start < timeout:
+        if proc.poll() is not None:
+            return None
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return time.monotonic() - start
+        except OSError:
+            time.sleep(0.05)
+    return None
+
+
+def stop(proc):
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        os.killpg(proc.pid, signal.SIGKILL)
+        proc.wait()
+    except ProcessLookupError:
+        pass
+
+
+def start_once(args, cache_dir, cache_enabled):
+    state = tempfile.mkdtemp(prefix="openclaw-bench-")
+    env = {k: v for k, v in os.environ.items() if not k.startswith("OPENCLAW_CFG__") and k not in ("OPENCLAW_GATEWAY_TOKEN", "NODE_COMPILE_CACHE")}
+    env.update({
+        "OPENCLAW_STATE_DIR": state,
+        "OPENCLAW_GATEWAY_PORT": str(args.port),
+        "OPENCLAW_BRIDGE_PORT": str(args.port + 1),
+        "OPENCLAW_COMPILE_CACHE": "1" if cache_enabled else "0",
+        "OPENCLAW_COMPILE_CACHE_DIR": cache_dir,
+    })
+    cmd = [args.wrapper, "--bind", "loopback", "--port", str(args.port), "--allow-unconfigured"]
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    try:
+        return wait_for_port(args.port, proc, args.timeout)
+    finally:
+        stop(proc)
+        shutil.rmtree(state, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark gateway cold/warm startup with the compile cache")
+    parser.add_argument("--runs", type=int, default=3, help="Starts per mode (default: 3)")
+    parser.add_argument("--port", type=int, default=18889, help="Gateway port for the benchmark instance; port+1 is its bridge port (default: 18889)")
+    parser.add_argument("--timeout", type=float, default=180, help="Seconds to wait for the port per start (default: 180)")
+    parser.add_argument("--wrapper", default="/usr/local/bin/openclaw-gateway", help="Gateway wrapper to start")
+    args = parser.parse_args()
+
+    cache_root = tempfile.mkdtemp(prefix="openclaw-bench-cache-")
+    results = {}
+    try:
+        for mode in ("off", "cold", "warm"):
+            times = []
+            for _ in range(args.runs):
+                if mode == "cold":
+                    shutil.rmtree(cache_root, ignore_errors=True)
+                    os.makedirs(cache_root)
+                seconds = start_once(args, cache_root, cache_enabled=mode != "off")
+                if seconds is None:
+                    print(f"{mode}: gateway did not open port {args.port} within {args.timeout:g}s", file=sys.stderr)
+                    return 1
+                times.append(seconds)
+            results[mode] = times
+    finally:
+        shutil.rmtree(cache_root, ignore_errors=True)
+
+    print(f"{'MODE':6} {'RUNS':>4} {'MEDIAN S':>9} {'MIN S':>7}")
+    for mode, times in results.items():
+        print(f"{mode:6} {len(times):4} {statistics.median(times):9.2f} {min(times):7.2f}")
+    off, warm = statistics.median(results["off"]), statistics.median(results["warm"])
+    print(f"warm vs off: {off - warm:+.2f}s ({(1 - warm / off) * 100:.0f}% faster)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,29 +1,1106 @@
 #!/usr/bin/env python3
 import argparse
+import base64
+import ctypes
+import ctypes.util
+import hashlib
+import ipaddress
 import json
+import math
 import os
+import re
+import select
+import shutil
+import signal
+import socket
+import struct
 import subprocess
 import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from urllib.parse import urlsplit
+
+# OPENCLAW_CFG__gateway__auth__token=abc sets {"gateway": {"auth": {"token": "abc"}}}.
+# Values are parsed as JSON when possible (numbers, booleans, objects, null);
+# anything else is taken as a string. Quote a value ('"8080"') to force a string.
+CFG_ENV_PREFIX = "OPENCLAW_CFG__"
+CFG_ENV_SEP = "__"
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+# cgroup v1 reports "no limit" as a huge page-aligned number rather than "max".
+CGROUP_V1_UNLIMITED = 1 << 60
+# Same split as `openclaw_diag.py --sizing`: V8 old space gets this share of the
+# memory limit; Chromium (Playwright) and native memory share the rest.
+# bin/openclaw_diag.py has its own copy (this script ships alone in the image,
+# so it cannot import them); the tests check that the two agree.
+NODE_HEAP_FRACTION = 0.6
+MIN_UV_THREADPOOL = 4
+MAX_UV_THREADPOOL = 64
+
+# --watch-config: the ConfigMap mount, synced into the state dir like the init-config
+# container does (same hash and backup files), then the gateway is signalled.
+WATCH_CONFIG = "/config/openclaw.json"
+CONFIG_HASH_FILE = ".openclaw.json.sha256"
+CONFIG_BACKUP_FILE = "openclaw.json.bak"
+RELOAD_SIGNAL = "SIGUSR1"
+# The kubelet updates a ConfigMap volume by renaming a new ..data symlink into
+# place (IN_MOVED_TO on the mount dir); a plain file replaced in place shows up
+# as IN_CLOSE_WRITE/IN_CREATE/IN_MOVED_TO with the file's own name.
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_EVENT = struct.Struct("iIII")
+# Wait for the rest of a burst of events before syncing once.
+WATCH_SETTLE_SECONDS = 0.5
+
+# Node's module compile cache (NODE_COMPILE_CACHE, Node >= 22.1) on the /home/node PVC.
+COMPILE_CACHE_ROOT = "/home/node/.cache/openclaw-compile"
+COMPILE_CACHE_MAX_MB = 256
+# Evict down to this share of the cap so the next start doesn't evict again.
+COMPILE_CACHE_LOW_WATER = 0.8
+COMPILE_CACHE_KEY_RE = re.compile(r"^[0-9a-f]{16}$")
+
+# --supervise: readiness file for the exec readinessProbe, drain and restart policy.
+READY_FILE = "/tmp/openclaw-gateway.ready"
+DRAIN_SECONDS = 30
+STOP_SECONDS = 10
+RESTART_BACKOFF_MAX = 60
+# A child that stayed up this long resets the backoff and the restart count.
+RESTART_RESET_SECONDS = 120
+MAX_RESTARTS = 10
+POLL_SECONDS = 0.2
+PORT_CHECK_SECONDS = 5
+FORWARDED_SIGNALS = (signal.SIGHUP, signal.SIGUSR1, signal.SIGUSR2)
+TCP_ESTABLISHED = "01"
+PROC_NET_TCP = ("/proc/net/tcp", "/proc/net/tcp6")
+
+# --metrics-port: Prometheus text endpoint fed from /proc by a sampling thread.
+METRICS_INTERVAL = 15
+METRICS_PATH = "/metrics"
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# A descendant whose name matches (and everything below it) counts as "browser":
+# Playwright's Chromium/headless_shell, Firefox and WebKit.
+BROWSER_RE = re.compile(r"chrom|headless_shell|firefox|webkit", re.IGNORECASE)
+PROCESS_GROUPS = ("gateway", "browser", "other")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+# --browser-pool: warm headless Chromium instances with CDP on 127.0.0.1:<port + i>,
+# advertised to the gateway as browser profiles pool-0..pool-N-1.
+BROWSER_BINARY = "chromium"
+BROWSER_POOL_PORT = 9222
+BROWSER_POOL_DIR = "/tmp/openclaw-browser-pool"
+BROWSER_MAX_USES = 50
+BROWSER_MAX_MEMORY_MB = 1024
+BROWSER_CHECK_SECONDS = 5
+# Failed CDP checks in a row before a browser is replaced; a fresh one gets a grace period.
+BROWSER_MAX_FAILURES = 3
+BROWSER_START_SECONDS = 30
+# A page target counts as a use once it has one of these URLs no longer.
+BLANK_PAGE_URLS = ("", "about:blank")
+# browser.profiles entries the pool owns; stale ones are dropped from openclaw.json.
+POOL_PROFILE_RE = re.compile(r"^pool-\d+$")
+BROWSER_FLAGS = (
+    "--headless=new",
+    "--remote-debugging-address=127.0.0.1",
+    # Same as Playwright's default (chromiumSandbox: false); the pod runs unprivileged.
+    "--no-sandbox",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-background-networking",
+)
+
+
+def log(msg):
+    print(f"[openclaw-gateway] {msg}", file=sys.stderr)
+
+
+def parse_value(raw):
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+def config_overlays(environ):
+    # Ordered (path, value) pairs; OPENCLAW_CFG__ entries win over the legacy token variable.
+    overlays = []
+    token = environ.get("OPENCLAW_GATEWAY_TOKEN")
+    if token:
+        overlays.append((["gateway", "auth", "token"], token))
+    for name in sorted(environ):
+        if not name.startswith(CFG_ENV_PREFIX):
+            continue
+        path = name[len(CFG_ENV_PREFIX):].split(CFG_ENV_SEP)
+        if not all(path):
+            log(f"Warning: ignoring {name}: empty path segment")
+            continue
+        overlays.append((path, parse_value(environ[name])))
+    return overlays
+
+
+def apply_overlay(data, path, value):
+    node = data
+    for key in path[:-1]:
+        child = node.get(key)
+        if child is None:
+            child = node[key] = {}
+        elif not isinstance(child, dict):
+            raise ValueError(f"{'.'.join(path)}: {key} is not an object")
+        node = child
+    node[path[-1]] = value
+
+
+def content_hash(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def write_atomic(path, text):
+    # Temp file in the same directory + fsync + rename: readers (and a crash) see the old or the new file, never half of one.
+    tmp = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+    try:
+        with open(tmp, "w") as fh:
+            fh.write(text)
+            fh.flush()
+            os.fsync(fh.fileno())
+        if path.exists():
+            os.chmod(tmp, path.stat().st_mode & 0o7777)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    dir_fd = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def apply_overlays(data, overlays):
+    applied = []
+    for path, value in overlays:
+        try:
+            apply_overlay(data, path, value)
+            applied.append(".".join(path))
+        except ValueError as e:
+            log(f"Warning: skipping override {e}")
+    return applied
+
+
+def drop_pool_profiles(data, overlays):
+    # Pool profiles only ever come from overlays, so any pool-N profile this start
+    # doesn't set is left over from a larger pool, a disabled one or one that failed
+    # to start; a defaultProfile pointing at one of them goes too.
+    browser = data.get("browser")
+    if not isinstance(browser, dict):
+        return []
+    live = {path[2] for path, _ in overlays if len(path) > 2 and path[:2] == ["browser", "profiles"]}
+    dropped = []
+    profiles = browser.get("profiles")
+    if isinstance(profiles, dict):
+        for name in [name for name in profiles if POOL_PROFILE_RE.match(name) and name not in live]:
+            del profiles[name]
+            dropped.append(f"browser.profiles.{name}")
+    default = browser.get("defaultProfile")
+    if isinstance(default, str) and POOL_PROFILE_RE.match(default) and default not in live:
+        del browser["defaultProfile"]
+        dropped.append("browser.defaultProfile")
+    return dropped
+
+
+def overlay_config(config_path, environ):
+    overlays = config_overlays(environ)
+    if not config_path.exists():
+        return
+    data = json.loads(config_path.read_text())
+    before = content_hash(data)
+    applied = apply_overlays(data, overlays)
+    dropped = drop_pool_profiles(data, overlays)
+    if content_hash(data) == before:
+        if overlays:
+            log(f"Config already up to date ({len(applied)} override(s)); not rewriting {config_path}")
+        return
+    write_atomic(config_path, json.dumps(data, indent=2))
+    log(f"Updated {config_path}: {', '.join(applied + [f'removed {path}' for path in dropped])}")
+
+
+def sync_config(src, dst, environ):
+    # init-config's sha256 sync: copy src over dst (keeping a backup) when its hash
+    # differs from the recorded one. Unlike init-config, env overrides are applied
+    # (and stale pool profiles dropped, as at startup) before the single atomic
+    # write, so the gateway never sees a file without them.
+    raw = src.read_bytes()
+    src_hash = hashlib.sha256(raw).hexdigest()
+    hash_file = dst.with_name(CONFIG_HASH_FILE)
+    old_hash = read_text(hash_file) if hash_file.exists() else ""
+    if old_hash.strip() == src_hash:
+        return False
+    data = json.loads(raw)
+    overlays = config_overlays(environ)
+    apply_overlays(data, overlays)
+    drop_pool_profiles(data, overlays)
+    if dst.exists():
+        shutil.copy2(dst, dst.with_name(CONFIG_BACKUP_FILE))
+    write_atomic(dst, json.dumps(data, indent=2))
+    write_atomic(hash_file, f"{src_hash}\n")
+    return True
+
+
+def reload_signal(name):
+    # "USR1", "SIGUSR1" or "none" (leave it to the gateway's own file watcher).
+    name = name.upper()
+    if name == "NONE":
+        return None
+    return signal.Signals[name if name.startswith("SIG") else f"SIG{name}"]
+
+
+class ConfigWatcher:
+    # Blocks in read(2) on an inotify fd watching the ConfigMap mount directory;
+    # each change is synced into the state dir and the gateway gets `signum` via
+    # the supervisor (which forwards it to the current child, if any).
+
+    def __init__(self, src, dst, environ, supervisor, signum):
+        self.src = Path(src)
+        self.dst = dst
+        self.environ = environ
+        self.supervisor = supervisor
+        self.signum = signum
+        self.names = {self.src.name, "..data"}
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_init1: {os.strerror(ctypes.get_errno())}")
+        if libc.inotify_add_watch(self.fd, str(self.src.parent).encode(), IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch {self.src.parent}: {os.strerror(errno)}")
+
+    def changed(self, buf):
+        offset = 0
+        while offset + IN_EVENT.size <= len(buf):
+            _, _, _, length = IN_EVENT.unpack_from(buf, offset)
+            name = buf[offset + IN_EVENT.size:offset + IN_EVENT.size + length].rstrip(b"\0").decode(errors="replace")
+            offset += IN_EVENT.size + length
+            if name in self.names:
+                return True
+        return False
+
+    def sync(self):
+        try:
+            updated = sync_config(self.src, self.dst, self.environ)
+        except Exception as e:
+            log(f"Warning: config reload skipped: {e}")
+            return
+        if not updated:
+            log(f"Config change event, but {self.src} hash matches; nothing to do")
+            return
+        if self.signum is None:
+            log(f"Config updated from {self.src} (backup in {CONFIG_BACKUP_FILE})")
+            return
+        log(f"Config updated from {self.src} (backup in {CONFIG_BACKUP_FILE}); sending {self.signum.name} to the gateway")
+        self.supervisor.pending.append(self.signum)
+
+    def run(self):
+        while True:
+            if not self.changed(os.read(self.fd, 64 * 1024)):
+                continue
+            while select.select([self.fd], [], [], WATCH_SETTLE_SECONDS)[0]:
+                os.read(self.fd, 64 * 1024)
+            self.sync()
+
+    def start(self):
+        threading.Thread(target=self.run, name="config-watch", daemon=True).start()
+        log(f"Watching {self.src} for config changes")
+
+
+def read_text(path):
+    try:
+        with open(path) as fh:
+            return fh.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_v2_dir(root, proc_cgroup):
+    # Without a private cgroup namespace our cgroup is a subdirectory of the mount.
+    for line in (read_text(proc_cgroup) or "").splitlines():
+        if line.startswith("0::"):
+            own = os.path.join(root, line[3:].lstrip("/"))
+            if os.path.exists(os.path.join(own, "memory.max")) or os.path.exists(os.path.join(own, "cpu.max")):
+                return own
+    return root
+
+
+def cgroup_limits(root=CGROUP_ROOT, proc_cgroup="/proc/self/cgroup"):
+    # (version, memory limit in bytes or None, CPU quota in cores or None)
+    if os.path.exists(os.path.join(root, "cgroup.controllers")):
+        base = cgroup_v2_dir(root, proc_cgroup)
+        mem = read_text(os.path.join(base, "memory.max"))
+        cpu = (read_text(os.path.join(base, "cpu.max")) or "max").split()
+        memory = int(mem) if mem and mem != "max" else None
+        cpus = int(cpu[0]) / int(cpu[1]) if cpu[0] != "max" and len(cpu) == 2 else None
+        return "v2", memory, cpus
+    mem = read_text(os.path.join(root, "memory", "memory.limit_in_bytes"))
+    memory = int(mem) if mem and int(mem) < CGROUP_V1_UNLIMITED else None
+    cpus = None
+    for cpu_dir in ("cpu", "cpu,cpuacct"):
+        quota = read_text(os.path.join(root, cpu_dir, "cpu.cfs_quota_us"))
+        period = read_text(os.path.join(root, cpu_dir, "cpu.cfs_period_us"))
+        if quota and period:
+            cpus = int(quota) / int(period) if int(quota) > 0 else None
+            break
+    if memory is None and cpus is None and not os.path.isdir(os.path.join(root, "memory")):
+        return None, None, None
+    return "v1", memory, cpus
+
+
+def node_option(node_options, flag):
+    # Value of --flag=value / --flag value in NODE_OPTIONS, or None if absent.
+    opts = node_options.split()
+    for i, opt in enumerate(opts):
+        if opt.startswith(flag + "="):
+            return opt.split("=", 1)[1]
+        if opt == flag:
+            return opts[i + 1] if i + 1 < len(opts) else ""
+    return None
+
+
+def runtime_tuning(environ, limits):
+    # Returns (env updates, [(setting, value, source)]); explicit user settings always win.
+    _, memory, cpus = limits
+    if cpus is None:
+        cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    node_options = environ.get("NODE_OPTIONS", "")
+    flags = []
+    chosen = []
+
+    for flag in ("--max-old-space-size", "--max-semi-space-size"):
+        user_value = node_option(node_options, flag)
+        if user_value is not None:
+            chosen.append((flag, user_value, "user"))
+        elif memory:
+            mib = memory // (1 << 20)
+            if flag == "--max-old-space-size":
+                value = int(mib * NODE_HEAP_FRACTION)
+            else:
+                # 1 MiB of semi-space per 128 MiB of limit, as a power of two in [8, 64].
+                value = 1 << max(3, min(6, int(math.log2(max(1, mib // 128)))))
+            flags.append(f"{flag}={value}")
+            chosen.append((flag, value, "auto"))
+
+    updates = {}
+    if flags:
+        updates["NODE_OPTIONS"] = " ".join(filter(None, [node_options] + flags))
+    if environ.get("UV_THREADPOOL_SIZE"):
+        chosen.append(("UV_THREADPOOL_SIZE", environ["UV_THREADPOOL_SIZE"], "user"))
+    elif cpus:
+        threads = min(MAX_UV_THREADPOOL, max(MIN_UV_THREADPOOL, 2 * math.ceil(cpus)))
+        updates["UV_THREADPOOL_SIZE"] = str(threads)
+        chosen.append(("UV_THREADPOOL_SIZE", threads, "auto"))
+    return updates, chosen
+
+
+def tuned_environment(environ):
+    if disabled(environ, "OPENCLAW_AUTOTUNE"):
+        log("Runtime auto-tuning disabled (OPENCLAW_AUTOTUNE)")
+        return dict(environ)
+    limits = cgroup_limits()
+    version, memory, cpus = limits
+    updates, chosen = runtime_tuning(environ, limits)
+    memory_desc = f"{memory // (1 << 20)}Mi" if memory else "unlimited"
+    cpu_desc = f"{cpus:g}" if cpus else "unlimited"
+    log(f"Runtime tuning (cgroup {version or 'none'}: memory {memory_desc}, cpu {cpu_desc}): "
+        + (", ".join(f"{name}={value} ({source})" for name, value, source in chosen) or "defaults"))
+    env = dict(environ)
+    env.update(updates)
+    return env
+
+
+def disabled(environ, name):
+    return environ.get(name, "1").lower() in ("0", "false", "no", "off")
+
+
+def node_version(environ):
+    # Official node images export NODE_VERSION; asking node costs a process start.
+    if environ.get("NODE_VERSION"):
+        return environ["NODE_VERSION"].lstrip("v")
+    try:
+        return subprocess.run(["node", "--version"], capture_output=True, text=True, timeout=10).stdout.strip().lstrip("v")
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def cache_files(path):
+    # [(mtime, size, path)] for every file under path
+    out = []
+    for dirpath, _, names in os.walk(path):
+        for name in names:
+            full = os.path.join(dirpath, name)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            out.append((st.st_mtime, st.st_size, full))
+    return out
+
+
+def prepare_compile_cache(environ, root=COMPILE_CACHE_ROOT):
+    # Returns (cache dir or None, message). The directory is keyed by image and
+    # Node version; caches for other keys are removed and the size is capped.
+    image = environ.get("OPENCLAW_IMAGE", "unknown")
+    version = node_version(environ)
+    key = hashlib.sha256(f"{image}|{version}".encode()).hexdigest()[:16]
+    cache_dir = os.path.join(root, key)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    stale = [d for d in os.listdir(root) if d != key and COMPILE_CACHE_KEY_RE.match(d)]
+    for d in stale:
+        shutil.rmtree(os.path.join(root, d), ignore_errors=True)
+
+    files = cache_files(cache_dir)
+    total = sum(size for _, size, _ in files)
+    cap = int(environ.get("OPENCLAW_COMPILE_CACHE_MAX_MB", COMPILE_CACHE_MAX_MB)) << 20
+    evicted = 0
+    if total > cap:
+        for _, size, path in sorted(files):
+            if total <= cap * COMPILE_CACHE_LOW_WATER:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+    kept = len(files) - evicted
+
+    state = f"hit ({kept} entries, {total / (1 << 20):.1f}Mi)" if kept else "miss (cold start, populating)"
+    notes = [f"image {image}", f"node {version}"]
+    if stale:
+        notes.append(f"dropped {len(stale)} stale cache(s)")
+    if evicted:
+        notes.append(f"evicted {evicted} entries over {cap >> 20}Mi cap")
+    return cache_dir, f"Compile cache {state}: {cache_dir} ({', '.join(notes)})"
+
+
+def compile_cache_environment(environ):
+    if disabled(environ, "OPENCLAW_COMPILE_CACHE"):
+        return {}
+    if environ.get("NODE_COMPILE_CACHE"):
+        log(f"Compile cache: using NODE_COMPILE_CACHE={environ['NODE_COMPILE_CACHE']} (user)")
+        return {}
+    cache_dir, message = prepare_compile_cache(environ, environ.get("OPENCLAW_COMPILE_CACHE_DIR", COMPILE_CACHE_ROOT))
+    log(message)
+    return {"NODE_COMPILE_CACHE": cache_dir}
+
+
+def port_open(port, timeout=1.0):
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def peer_address(hex_addr):
+    # /proc/net/tcp{,6} address: IPv4 as one little-endian word, IPv6 as four.
+    raw = bytes.fromhex(hex_addr)
+    addr = ipaddress.ip_address(b"".join(raw[i:i + 4][::-1] for i in range(0, len(raw), 4)))
+    return getattr(addr, "ipv4_mapped", None) or addr
+
+
+def established_connections(port, ignore=(), tables=PROC_NET_TCP):
+    # Inbound connections to our port (the tables are shared by the whole pod). Loopback
+    # peers (our own port checks, sidecars) and `ignore` (the node: kubelet probes) are
+    # not clients and are left out.
+    ignore = {ipaddress.ip_address(ip) for ip in ignore}
+    count = 0
+    for table in tables:
+        try:
+            with open(table) as fh:
+                next(fh, None)
+                for line in fh:
+                    fields = line.split()
+                    if len(fields) <= 3 or fields[3] != TCP_ESTABLISHED or int(fields[1].rsplit(":", 1)[1], 16) != port:
+                        continue
+                    peer = peer_address(fields[2].rsplit(":", 1)[0])
+                    if not peer.is_loopback and peer not in ignore:
+                        count += 1
+        except OSError:
+            continue
+    return count
+
+
+def proc_stat(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as fh:
+            raw = fh.read()
+    except OSError:
+        return None
+    # comm may contain spaces and parens; the fields start after the last ')'.
+    end = raw.rindex(")")
+    fields = raw[end + 2:].split()
+    return {
+        "comm": raw[raw.index("(") + 1:end],
+        "ppid": int(fields[1]),
+        "cpu": (int(fields[11]) + int(fields[12])) / CLOCK_TICKS,
+        "reaped_cpu": (int(fields[13]) + int(fields[14])) / CLOCK_TICKS,
+        "threads": int(fields[17]),
+        "rss": int(fields[21]) * PAGE_SIZE,
+    }
+
+
+def proc_name(pid, comm):
+    # comm is truncated to 15 chars; argv[0] has the full binary path.
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as fh:
+            argv0 = fh.read().split(b"\0", 1)[0].decode(errors="replace")
+    except OSError:
+        argv0 = ""
+    return f"{comm} {os.path.basename(argv0)}"
+
+
+def open_fds(pid):
+    try:
+        return len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        return 0
+
+
+def process_tree(root_pid, browser_roots=()):
+    # One pass over /proc/*/stat; returns [(pid, group, stat)] for root_pid and its
+    # descendants, plus browser_roots (pool browsers, children of the wrapper) and theirs.
+    stats = {}
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        stat = proc_stat(int(entry))
+        if stat:
+            stats[int(entry)] = stat
+            children.setdefault(stat["ppid"], []).append(int(entry))
+    queue = [(pid, "browser") for pid in browser_roots if pid in stats]
+    if root_pid in stats:
+        queue.append((root_pid, "gateway"))
+    tree = []
+    while queue:
+        pid, group = queue.pop()
+        tree.append((pid, group, stats[pid]))
+        for child in children.get(pid, ()):
+            if group == "browser" or BROWSER_RE.search(proc_name(child, stats[child]["comm"])):
+                queue.append((child, "browser"))
+            else:
+                queue.append((child, "other"))
+    return tree
+
+
+def empty_groups():
+    return {name: {"processes": 0, "rss": 0, "cpu": 0.0, "fds": 0, "threads": 0} for name in PROCESS_GROUPS}
+
+
+def sample_processes(root_pid, browser_roots=()):
+    groups = empty_groups()
+    gateway_cpu = 0.0
+    for pid, group, stat in process_tree(root_pid, browser_roots):
+        totals = groups[group]
+        totals["processes"] += 1
+        totals["rss"] += stat["rss"]
+        totals["cpu"] += stat["cpu"]
+        totals["threads"] += stat["threads"]
+        totals["fds"] += open_fds(pid)
+        if pid == root_pid:
+            gateway_cpu = stat["cpu"] + stat["reaped_cpu"]
+    return groups, gateway_cpu
+
+
+class ProcessMetrics:
+    # Samples the supervised child's process tree every `interval` seconds on a
+    # daemon thread and keeps the rendered exposition text; scrapes only read
+    # that text, so scraping never touches /proc and costs nothing extra.
+
+    def __init__(self, supervisor, interval, pool=None):
+        self.supervisor = supervisor
+        self.interval = interval
+        self.pool = pool
+        self.text = self.render(None, 0.0)
+        self.stopped = threading.Event()
+
+    def render(self, sample, seconds):
+        child = self.supervisor.child
+        up = child is not None and child.poll() is None
+        groups, gateway_cpu = sample or (empty_groups(), 0.0)
+        lines = []
+
+        def metric(name, kind, help_text, values):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in values:
+                lines.append(f"{name}{labels} {value}")
+
+        metric("openclaw_gateway_up", "gauge", "Whether the gateway process is running.", [("", int(up))])
+        metric("openclaw_gateway_ready", "gauge", "Whether the gateway is marked ready.", [("", int(os.path.exists(self.supervisor.ready_file)))])
+        metric("openclaw_gateway_restarts_total", "counter", "Gateway restarts after a crash since the container started.",
+               [("", self.supervisor.restarts_total)])
+        metric("openclaw_gateway_cpu_seconds_total", "counter", "CPU time of the gateway and the descendants it has reaped.",
+               [("", f"{gateway_cpu:.2f}")])
+        for key, name, kind, help_text in (
+            ("processes", "openclaw_processes", "gauge", "Live processes in the group."),
+            ("rss", "openclaw_process_resident_memory_bytes", "gauge", "Resident memory of live processes in the group."),
+            ("cpu", "openclaw_process_cpu_seconds", "gauge", "CPU time of live processes in the group."),
+            ("fds", "openclaw_process_open_fds", "gauge", "Open file descriptors of live processes in the group."),
+            ("threads", "openclaw_process_threads", "gauge", "Threads of live processes in the group."),
+        ):
+            metric(name, kind, help_text, [(f'{{group="{group}"}}', f"{totals[key]:.2f}" if key == "cpu" else totals[key])
+                                           for group, totals in groups.items()])
+        if self.pool:
+            metric("openclaw_browser_pool_up", "gauge", "Pool browsers currently running.", [("", len(self.pool.pids()))])
+            metric("openclaw_browser_pool_recycles_total", "counter", "Pool browsers replaced (uses, memory, crash or unresponsive).",
+                   [("", self.pool.recycles_total)])
+        metric("openclaw_metrics_sample_seconds", "gauge", "Time spent reading /proc for the last sample.", [("", f"{seconds:.6f}")])
+        return "\n".join(lines) + "\n"
+
+    def run(self):
+        while not self.stopped.is_set():
+            child = self.supervisor.child
+            root = child.pid if child is not None and child.poll() is None else None
+            browsers = self.pool.pids() if self.pool else []
+            sample = None
+            started = time.perf_counter()
+            try:
+                if root or browsers:
+                    sample = sample_processes(root, browsers)
+            except Exception as e:
+                log(f"Warning: metrics sample failed: {e}")
+            self.text = self.render(sample, time.perf_counter() - started)
+            self.stopped.wait(self.interval)
+
+    def serve(self, port):
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != METRICS_PATH:
+                    self.send_error(404)
+                    return
+                body = metrics.text.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", METRICS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("", port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=self.run, name="metrics-sampler", daemon=True).start()
+        threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+        log(f"Serving metrics on :{port}{METRICS_PATH} (sampled every {self.interval}s)")
+        return server
+
+
+def ws_connect(url, timeout):
+    # Minimal RFC 6455 client handshake, enough for a CDP endpoint on 127.0.0.1.
+    parts = urlsplit(url)
+    sock = socket.create_connection((parts.hostname, parts.port), timeout=timeout)
+    try:
+        key = base64.b64encode(os.urandom(16)).decode()
+        sock.sendall((f"GET {parts.path or '/'} HTTP/1.1\r\nHost: {parts.netloc}\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+        reader = sock.makefile("rb")
+        status = reader.readline()
+        if status.split(b" ")[1:2] != [b"101"]:
+            raise OSError(f"websocket handshake with {url} failed: {status.decode(errors='replace').strip()}")
+        while reader.readline() not in (b"\r\n", b""):
+            pass
+    except BaseException:
+        sock.close()
+        raise
+    sock.settimeout(None)
+    return sock, reader
+
+
+def ws_send(sock, text):
+    # Client frames are masked; one unfragmented text frame.
+    payload = text.encode()
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x81, 0x80 | n)
+    elif n < 1 << 16:
+        header = struct.pack("!BBH", 0x81, 0x80 | 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x81, 0x80 | 127, n)
+    mask = os.urandom(4)
+    sock.sendall(header + mask + bytes(b ^ mask[i % 4] for i, b in enumerate(payload)))
+
+
+def ws_messages(reader):
+    # Text messages until a close frame or EOF; pings and pongs are skipped.
+    message = b""
+    while True:
+        head = reader.read(2)
+        if len(head) < 2:
+            return
+        n = head[1] & 0x7F
+        if n == 126:
+            n = struct.unpack("!H", reader.read(2))[0]
+        elif n == 127:
+            n = struct.unpack("!Q", reader.read(8))[0]
+        mask = reader.read(4) if head[1] & 0x80 else None
+        payload = reader.read(n)
+        if mask:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        opcode = head[0] & 0x0F
+        if opcode == 0x8:
+            return
+        if opcode in (0x9, 0xA):
+            continue
+        message += payload
+        if head[0] & 0x80:
+            yield message.decode(errors="replace")
+            message = b""
+
+
+class BrowserPool:
+    # Warm headless Chromium instances owned by the supervisor, one per slot on a
+    # fixed CDP port so the advertised endpoints never change. A health thread
+    # polls each browser's /json/list: a browser that exited or stopped answering
+    # is replaced at once; one that has served max_uses pages or grown past
+    # max_memory is replaced (with a fresh profile) once it has no pages open.
+    # Uses are counted by a per-browser thread from CDP Target events on the
+    # browser websocket, so pages opened and closed between two polls count too.
+
+    def __init__(self, size, base_port, binary, max_uses, max_memory_mb, interval):
+        self.slots = [{"index": i, "port": base_port + i, "proc": None} for i in range(size)]
+        self.binary = binary
+        self.max_uses = max_uses
+        self.max_memory = max_memory_mb << 20
+        self.interval = interval
+        self.recycles_total = 0
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def endpoints(self):
+        return {f"pool-{slot['index']}": f"http://127.0.0.1:{slot['port']}" for slot in self.slots}
+
+    def config_environ(self, environ):
+        # Profiles for the overlay engine; OPENCLAW_CFG__ variables set by the user win.
+        pool_environ = {f"{CFG_ENV_PREFIX}browser{CFG_ENV_SEP}defaultProfile": "pool-0"}
+        for name, url in self.endpoints().items():
+            pool_environ[CFG_ENV_SEP.join([f"{CFG_ENV_PREFIX}browser", "profiles", name, "cdpUrl"])] = url
+        return {name: value for name, value in pool_environ.items() if name not in environ}
+
+    def pids(self):
+        return [slot["proc"].pid for slot in self.slots if slot["proc"] and slot["proc"].poll() is None]
+
+    def launch(self, slot):
+        data_dir = os.path.join(BROWSER_POOL_DIR, str(slot["index"]))
+        shutil.rmtree(data_dir, ignore_errors=True)
+        cmd = [self.binary, f"--remote-debugging-port={slot['port']}", f"--user-data-dir={data_dir}", *BROWSER_FLAGS, "about:blank"]
+        # Own session, so the whole renderer/GPU process group can be stopped together.
+        slot["proc"] = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+        slot["started"] = time.monotonic()
+        slot["pages"] = set()
+        slot["failures"] = 0
+        # The thread keeps this launch's set, so a late event from a recycled browser can't count against its successor.
+        threading.Thread(target=self.count_uses, args=(slot["proc"], slot["port"], slot["pages"]),
+                         name=f"browser-pool-{slot['index']}-targets", daemon=True).start()
+
+    def terminate(self, slot):
+        proc = slot["proc"]
+        if proc is None or proc.poll() is not None:
+            return
+        for sig, wait in ((signal.SIGTERM, STOP_SECONDS), (signal.SIGKILL, None)):
+            try:
+                os.killpg(proc.pid, sig)
+            except ProcessLookupError:
+                return
+            try:
+                proc.wait(timeout=wait)
+                return
+            except subprocess.TimeoutExpired:
+                continue
+
+    def recycle(self, slot, reason):
+        self.terminate(slot)
+        self.launch(slot)
+        self.recycles_total += 1
+        log(f"Browser pool-{slot['index']}: {reason}; relaunched (pid {slot['proc'].pid})")
+
+    def targets(self, port):
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/list", timeout=2) as resp:
+            return json.load(resp)
+
+    def connect(self, proc, port):
+        # The browser websocket, once the CDP endpoint answers; None if the browser exits or never does.
+        deadline = time.monotonic() + BROWSER_START_SECONDS
+        while proc.poll() is None and not self.stopped.is_set():
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=2) as resp:
+                    url = json.load(resp)["webSocketDebuggerUrl"]
+                return ws_connect(url, 2)
+            except (OSError, ValueError, KeyError) as e:
+                if time.monotonic() > deadline:
+                    log(f"Warning: browser on :{port}: no CDP websocket ({e}); counting uses from health checks only")
+                    return None
+                self.stopped.wait(0.5)
+        return None
+
+    def count_uses(self, proc, port, pages):
+        # A use is a page target seen navigated away from about:blank. setDiscoverTargets
+        # replays existing targets as targetCreated, then reports new ones and every
+        # navigation (targetInfoChanged) until the browser exits.
+        conn = self.connect(proc, port)
+        if conn is None:
+            return
+        sock, reader = conn
+        try:
+            ws_send(sock, json.dumps({"id": 1, "method": "Target.setDiscoverTargets", "params": {"discover": True}}))
+            for message in ws_messages(reader):
+                event = json.loads(message)
+                if event.get("method") not in ("Target.targetCreated", "Target.targetInfoChanged"):
+                    continue
+                info = event["params"]["targetInfo"]
+                if info.get("type") == "page" and info.get("url") not in BLANK_PAGE_URLS:
+                    pages.add(info["targetId"])
+        except (OSError, ValueError, KeyError):
+            pass
+        finally:
+            reader.close()
+            sock.close()
+
+    def check(self, slot):
+        proc = slot["proc"]
+        if proc.poll() is not None:
+            self.recycle(slot, f"exited with {proc.returncode}")
+            return
+        try:
+            targets = self.targets(slot["port"])
+            slot["failures"] = 0
+        except (OSError, ValueError):
+            if time.monotonic() - slot["started"] < BROWSER_START_SECONDS:
+                return
+            slot["failures"] += 1
+            if slot["failures"] >= BROWSER_MAX_FAILURES:
+                self.recycle(slot, f"CDP endpoint unresponsive for {slot['failures']} checks")
+            return
+        # count_uses records pages as they appear; adding the open ones here (same
+        # target ids) covers a browser whose websocket could not be reached.
+        busy = {t.get("id") for t in targets if t.get("type") == "page" and t.get("url") not in BLANK_PAGE_URLS}
+        slot["pages"] |= busy
+        if busy:
+            return
+        if self.max_uses and len(slot["pages"]) >= self.max_uses:
+            self.recycle(slot, f"served {len(slot['pages'])} pages")
+            return
+        if self.max_memory:
+            rss = sum(stat["rss"] for _, _, stat in process_tree(None, [proc.pid]))
+            if rss > self.max_memory:
+                self.recycle(slot, f"using {rss >> 20}Mi (limit {self.max_memory >> 20}Mi)")
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            for slot in self.slots:
+                if self.stopped.is_set():
+                    break
+                try:
+                    self.check(slot)
+                except Exception as e:
+                    log(f"Warning: browser pool-{slot['index']} check failed: {e}")
+
+    def start(self):
+        for slot in self.slots:
+            self.launch(slot)
+        log(f"Browser pool: {len(self.slots)} x {self.binary} on {', '.join(self.endpoints().values())}")
+        self.thread = threading.Thread(target=self.run, name="browser-pool", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+        for slot in self.slots:
+            self.terminate(slot)
+
+
+class Supervisor:
+    # Runs node as a child instead of exec'ing it:
+    # - signals are forwarded; SIGTERM/SIGINT start a drain
+    # - the ready file exists only while the port accepts connections
+    # - on drain the ready file goes first, so the readinessProbe pulls the pod
+    #   from Service endpoints, then clients get up to drain_seconds to leave
+    #   before node is sent SIGTERM. node keeps its listener open meanwhile (it
+    #   has no way to be told to close it), so this waits for clients; it does
+    #   not refuse new ones. Idle WebSockets use the whole budget.
+    # - a crashed child is restarted in place with exponential backoff
+
+    def __init__(self, cmd, env, port, ready_file, drain_seconds, max_restarts, drain_ignore=()):
+        self.cmd = cmd
+        self.env = env
+        self.port = port
+        self.ready_file = ready_file
+        self.drain_seconds = drain_seconds
+        self.drain_ignore = drain_ignore
+        self.max_restarts = max_restarts
+        self.child = None
+        self.stopping = False
+        self.pending = []
+        self.restarts_total = 0
+
+    def set_ready(self, ready):
+        if ready:
+            Path(self.ready_file).touch()
+        else:
+            Path(self.ready_file).unlink(missing_ok=True)
+
+    def on_signal(self, signum, frame):
+        self.pending.append(signum)
+
+    def spawn(self):
+        self.child = subprocess.Popen(self.cmd, env=self.env)
+        log(f"Started gateway (pid {self.child.pid})")
+        return time.monotonic()
+
+    def wait_ready(self):
+        # Poll until the port accepts connections, the child exits, or we are told to stop.
+        while not self.stopping and self.child.poll() is None:
+            self.handle_signals()
+            if port_open(self.port, timeout=POLL_SECONDS):
+                self.set_ready(True)
+                log(f"Gateway is accepting connections on port {self.port}; marked ready")
+                return True
+            time.sleep(POLL_SECONDS)
+        return False
+
+    def handle_signals(self):
+        while self.pending:
+            signum = self.pending.pop(0)
+            if signum in (signal.SIGTERM, signal.SIGINT):
+                if not self.stopping:
+                    log(f"Received {signal.Signals(signum).name}; draining")
+                self.stopping = True
+            elif self.child and self.child.poll() is None:
+                self.child.send_signal(signum)
+
+    def drain(self):
+        self.set_ready(False)
+        deadline = time.monotonic() + self.drain_seconds
+        remaining = established_connections(self.port, self.drain_ignore)
+        while remaining and time.monotonic() < deadline and self.child.poll() is None:
+            time.sleep(1)
+            remaining = established_connections(self.port, self.drain_ignore)
+        if remaining:
+            log(f"Drain budget of {self.drain_seconds}s used up with {remaining} client connection(s) open")
+        else:
+            log("All client connections drained")
+
+    def stop_child(self):
+        if self.child.poll() is not None:
+            return self.child.returncode
+        self.child.terminate()
+        try:
+            return self.child.wait(timeout=STOP_SECONDS)
+        except subprocess.TimeoutExpired:
+            log(f"Gateway did not exit within {STOP_SECONDS}s; killing")
+            self.child.kill()
+            return self.child.wait()
+
+    def run(self):
+        for signum in (signal.SIGTERM, signal.SIGINT) + FORWARDED_SIGNALS:
+            signal.signal(signum, self.on_signal)
+        self.set_ready(False)
+        restarts = 0
+        while True:
+            started = self.spawn()
+            self.wait_ready()
+            last_check = time.monotonic()
+            while not self.stopping and self.child.poll() is None:
+                time.sleep(POLL_SECONDS)
+                self.handle_signals()
+                if time.monotonic() - last_check >= PORT_CHECK_SECONDS:
+                    last_check = time.monotonic()
+                    self.set_ready(port_open(self.port))
+            if self.stopping:
+                self.drain()
+                code = self.stop_child()
+                log(f"Gateway exited with {code}")
+                return code
+            code = self.child.returncode
+            self.set_ready(False)
+            if time.monotonic() - started >= RESTART_RESET_SECONDS:
+                restarts = 0
+            if restarts >= self.max_restarts:
+                log(f"Gateway exited with {code}; giving up after {restarts} restart(s)")
+                return code or 1
+            backoff = min(RESTART_BACKOFF_MAX, 2 ** restarts)
+            restarts += 1
+            self.restarts_total += 1
+            log(f"Gateway exited with {code}; restarting in {backoff}s (restart {restarts}/{self.max_restarts})")
+            until = time.monotonic() + backoff
+            while time.monotonic() < until and not self.stopping:
+                time.sleep(POLL_SECONDS)
+                self.handle_signals()
+            if self.stopping:
+                return code
+
 
 def main():
     parser = argparse.ArgumentParser(description="OpenClaw gateway wrapper")
     parser.add_argument("--bind", required=True)
     parser.add_argument("--port", required=True)
     parser.add_argument("--allow-unconfigured", action="store_true")
+    parser.add_argument("--supervise", action="store_true", help="Run node as a child: readiness file, graceful drain, restart on crash")
+    parser.add_argument("--ready-file", default=READY_FILE, help=f"With --supervise: file present while the gateway is ready (default: {READY_FILE})")
+    parser.add_argument("--drain-seconds", type=int, default=DRAIN_SECONDS, help=f"With --supervise: max seconds to wait for clients to disconnect on SIGTERM (default: {DRAIN_SECONDS})")
+    parser.add_argument("--drain-ignore-peer", action="append", default=[], metavar="IP",
+                        help="With --supervise: connections from this address are not waited for, e.g. the node's for kubelet probes (repeatable)")
+    parser.add_argument("--max-restarts", type=int, default=MAX_RESTARTS, help=f"With --supervise: crashes in a row before giving up (default: {MAX_RESTARTS})")
+    parser.add_argument("--metrics-port", type=int, default=0, help="With --supervise: serve Prometheus metrics on this port (default: off)")
+    parser.add_argument("--metrics-interval", type=float, default=METRICS_INTERVAL, help=f"With --metrics-port: seconds between /proc samples (default: {METRICS_INTERVAL})")
+    parser.add_argument("--browser-pool", type=int, default=0, metavar="N", help="With --supervise: keep N warm headless Chromium instances for the gateway (default: off)")
+    parser.add_argument("--browser-pool-port", type=int, default=BROWSER_POOL_PORT, help=f"CDP port of the first pool browser (default: {BROWSER_POOL_PORT})")
+    parser.add_argument("--browser-binary", default=BROWSER_BINARY, help=f"Chromium executable for the pool (default: {BROWSER_BINARY})")
+    parser.add_argument("--browser-max-uses", type=int, default=BROWSER_MAX_USES, help=f"Pages a pool browser serves before it is recycled; 0 = no limit (default: {BROWSER_MAX_USES})")
+    parser.add_argument("--browser-max-memory-mb", type=int, default=BROWSER_MAX_MEMORY_MB, help=f"RSS above which an idle pool browser is recycled; 0 = no limit (default: {BROWSER_MAX_MEMORY_MB})")
+    parser.add_argument("--watch-config", default=None, metavar="PATH", help=f"With --supervise: hot-reload from this mounted config (e.g. {WATCH_CONFIG})")
+    parser.add_argument("--reload-signal", default=RELOAD_SIGNAL, help=f"Signal sent to the gateway after a config reload, or 'none' (default: {RELOAD_SIGNAL})")
     parser.add_argument("extra", nargs=argparse.REMAINDER)
     args = parser.parse_args()
 
-    config_path = Path("/home/node/.openclaw/openclaw.json")
-    token = os.environ.get("OPENCLAW_GATEWAY_TOKEN")
+    pool = None
+    if args.browser_pool > 0 and args.supervise:
+        pool = BrowserPool(args.browser_pool, args.browser_pool_port, args.browser_binary,
+                           args.browser_max_uses, args.browser_max_memory_mb, BROWSER_CHECK_SECONDS)
+        # Started before the config is written, so only a running pool is advertised.
+        try:
+            pool.start()
+        except Exception as e:
+            log(f"Warning: browser pool unavailable: {e}")
+            pool.stop()
+            pool = None
+    elif args.browser_pool > 0:
+        log("Warning: --browser-pool needs --supervise; not starting a browser pool")
 
-    if token and config_path.exists():
+    config_path = Path(os.environ.get("OPENCLAW_STATE_DIR", "/home/node/.openclaw")) / "openclaw.json"
+    config_environ = {**os.environ, **(pool.config_environ(os.environ) if pool else {})}
+    if args.watch_config and args.supervise:
+        # Catch a change made between init-config and now; the gateway isn't up yet.
         try:
-            data = json.loads(config_path.read_text())
-            data.setdefault("gateway", {}).setdefault("auth", {})["token"] = token
-            config_path.write_text(json.dumps(data, indent=2))
+            if sync_config(Path(args.watch_config), config_path, config_environ):
+                log(f"Config updated from {args.watch_config}")
         except Exception as e:
-            print(f"[openclaw-gateway] Warning: failed to update token in config: {e}", file=sys.stderr)
+            log(f"Warning: config sync from {args.watch_config} failed: {e}")
+    elif args.watch_config:
+        log("Warning: --watch-config needs --supervise; not watching for config changes")
+    try:
+        overlay_config(config_path, config_environ)
+    except Exception as e:
+        log(f"Warning: failed to apply config overrides: {e}")
 
     cmd = ["node", "dist/index.js", "gateway", "--bind", args.bind, "--port", str(args.port)]
     if args.allow_unconfigured:
@@ -31,7 +1108,41 @@ def main():
     if args.extra:
         cmd.extend(args.extra)
 
-    os.execvp(cmd[0], cmd)
+    try:
+        env = tuned_environment(os.environ)
+    except Exception as e:
+        log(f"Warning: runtime auto-tuning failed, using defaults: {e}")
+        env = dict(os.environ)
+    try:
+        env.update(compile_cache_environment(env))
+    except Exception as e:
+        log(f"Warning: compile cache unavailable: {e}")
+    if args.supervise:
+        drain_ignore = []
+        for ip in args.drain_ignore_peer:
+            try:
+                drain_ignore.append(str(ipaddress.ip_address(ip)))
+            except ValueError:
+                log(f"Warning: ignoring --drain-ignore-peer {ip!r}: not an IP address")
+        supervisor = Supervisor(cmd, env, int(args.port), args.ready_file, args.drain_seconds, args.max_restarts, drain_ignore)
+        if args.watch_config:
+            try:
+                ConfigWatcher(args.watch_config, config_path, config_environ, supervisor,
+                              reload_signal(args.reload_signal)).start()
+            except Exception as e:
+                log(f"Warning: config hot reload unavailable: {e}")
+        if args.metrics_port:
+            try:
+                ProcessMetrics(supervisor, args.metrics_interval, pool).serve(args.metrics_port)
+            except Exception as e:
+                log(f"Warning: metrics endpoint unavailable: {e}")
+        code = supervisor.run()
+        if pool:
+            pool.stop()
+        sys.exit(code)
+    if args.metrics_port:
+        log("Warning: --metrics-port needs --supervise; not serving metrics")
+    os.execvpe(cmd[0], cmd, env)
 
 if __name__ == "__main__":
     main()
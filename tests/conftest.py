@@ -0,0 +1,17 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+# The bin/ scripts import their siblings by module name.
+sys.path.insert(0, str(ROOT / "bin"))
+
+
+def load_gateway():
+    # scripts/openclaw-gateway.py is installed as a command, so it has no importable name.
+    spec = importlib.util.spec_from_file_location("openclaw_gateway", ROOT / "scripts" / "openclaw-gateway.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
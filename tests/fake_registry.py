@@ -0,0 +1,97 @@
+"""Stand-in OCI distribution registry on 127.0.0.1 for oci_registry.py callers."""
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+INDEX_TYPE = "application/vnd.oci.image.index.v1+json"
+MANIFEST_TYPE = "application/vnd.oci.image.manifest.v1+json"
+CONFIG_TYPE = "application/vnd.oci.image.config.v1+json"
+TOKEN = "registry-token"
+
+
+def digest_of(raw):
+    return "sha256:" + hashlib.sha256(raw).hexdigest()
+
+
+class Registry:
+    """Answers /v2/<repo>/manifests/<ref> and /v2/<repo>/blobs/<digest> behind a Bearer
+    challenge (token from /token). `failures[repo] = status` makes that repo's requests fail."""
+
+    def __init__(self):
+        self.manifests = {}  # (repo, tag or digest) -> (media type, raw)
+        self.blobs = {}      # digest -> raw
+        self.requests = []   # (path, Authorization header)
+        self.failures = {}   # repo -> HTTP status
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                registry.requests.append((self.path, self.headers.get("Authorization")))
+                if self.path.startswith("/token?"):
+                    self.reply(200, json.dumps({"token": TOKEN}).encode(), "application/json")
+                    return
+                repo, kind, ref = self.path[len("/v2/"):].rsplit("/", 2)
+                if repo in registry.failures:
+                    self.reply(registry.failures[repo], b"{}", "application/json")
+                    return
+                if self.headers.get("Authorization") != f"Bearer {TOKEN}":
+                    challenge = f'Bearer realm="{registry.url}/token",service="stub",scope="repository:{repo}:pull"'
+                    self.reply(401, b"{}", "application/json", {"WWW-Authenticate": challenge})
+                    return
+                if kind == "manifests" and (repo, ref) in registry.manifests:
+                    media_type, raw = registry.manifests[(repo, ref)]
+                    self.reply(200, raw, media_type, {"Docker-Content-Digest": digest_of(raw)})
+                elif kind == "blobs" and ref in registry.blobs:
+                    self.reply(200, registry.blobs[ref], "application/octet-stream")
+                else:
+                    self.reply(404, b'{"errors": [{"code": "MANIFEST_UNKNOWN"}]}', "application/json")
+
+            def reply(self, status, body, content_type, headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.host = f"127.0.0.1:{self.server.server_address[1]}"
+        self.url = f"http://{self.host}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def store(self, repo, media_type, doc, *tags):
+        raw = json.dumps(doc).encode()
+        digest = digest_of(raw)
+        for ref in (digest, *tags):
+            self.manifests[(repo, ref)] = (media_type, raw)
+        return digest
+
+    def push(self, repo, tag, platforms=("linux/amd64", "linux/arm64"), labels=None, attestation=True):
+        """Multi-arch image under `tag`; returns (index digest, {platform: manifest digest})."""
+        digests = {}
+        entries = []
+        for platform in platforms:
+            os_name, arch = platform.split("/")[:2]
+            config = json.dumps({"architecture": arch, "os": os_name, "config": {"Labels": labels or {}}}).encode()
+            self.blobs[digest_of(config)] = config
+            manifest = {"schemaVersion": 2, "mediaType": MANIFEST_TYPE,
+                        "config": {"mediaType": CONFIG_TYPE, "digest": digest_of(config), "size": len(config)},
+                        "layers": []}
+            digests[platform] = self.store(repo, MANIFEST_TYPE, manifest)
+            entries.append({"mediaType": MANIFEST_TYPE, "digest": digests[platform], "size": 0,
+                            "platform": {"os": os_name, "architecture": arch}})
+        if attestation:
+            # BuildKit provenance: a manifest with an unknown/unknown platform.
+            entries.append({"mediaType": MANIFEST_TYPE, "digest": "sha256:" + "a" * 64, "size": 0,
+                            "platform": {"os": "unknown", "architecture": "unknown"}})
+        index = self.store(repo, INDEX_TYPE, {"schemaVersion": 2, "mediaType": INDEX_TYPE, "manifests": entries}, tag)
+        return index, digests
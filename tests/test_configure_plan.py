@@ -0,0 +1,159 @@
+import subprocess
+
+import pytest
+
+import configure
+import oci_registry
+from fake_registry import Registry
+
+SOURCE = "openclaw/openclaw"
+TARGET = "team/openclaw-playwright"
+DOCKERFILE = """\
+ARG BASE_IMAGE=ghcr.io/openclaw/openclaw:latest
+FROM ${BASE_IMAGE}
+COPY scripts/openclaw-gateway.py /usr/local/bin/openclaw-gateway
+COPY --from=builder /tmp/gog /usr/local/bin/gog
+"""
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(oci_registry, "_tokens", {})
+    monkeypatch.delenv("REGISTRY_USERNAME", raising=False)
+    monkeypatch.setenv("DOCKER_CONFIG", "/nonexistent")
+    server = Registry()
+    server.push(SOURCE, "2026.2.0")
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def context(tmp_path):
+    (tmp_path / "Dockerfile").write_text(DOCKERFILE)
+    (tmp_path / "scripts").mkdir()
+    (tmp_path / "scripts" / "openclaw-gateway.py").write_text("print('gateway')\n")
+    return tmp_path
+
+
+def config(registry):
+    return {"source": {"registry": registry.host, "image": SOURCE, "tag": "2026.2.0"},
+            "target": {"registry": f"{registry.host}/team", "image": "openclaw-playwright", "tag": "latest"}}
+
+
+def plan(registry, context, force=False):
+    return configure.plan_build(config(registry), context, "linux/amd64", "registry", force)
+
+
+def test_rebuild_when_target_missing(registry, context):
+    result = plan(registry, context)
+    assert result["PLAN_ACTION"] == "rebuild"
+    assert result["PLAN_REASON"] == f"{registry.host}/{TARGET}:latest does not exist"
+    _, digests = registry.push(SOURCE, "2026.2.0")
+    assert result["BASE_REF"] == f"{registry.host}/{SOURCE}:2026.2.0@{digests['linux/amd64']}"
+    assert result["FINGERPRINT_REF"] == f"{registry.host}/{TARGET}:fp-{result['FINGERPRINT'][:20]}"
+    assert result["CACHE_FROM"] == f"type=registry,ref={registry.host}/{TARGET}:buildcache"
+
+
+def test_skip_when_label_matches(registry, context):
+    fingerprint = plan(registry, context)["FINGERPRINT"]
+    registry.push(TARGET, "latest", labels={configure.FINGERPRINT_LABEL: fingerprint})
+    result = plan(registry, context)
+    assert result["PLAN_ACTION"] == "skip"
+    assert result["FINGERPRINT"] == fingerprint
+    assert plan(registry, context, force=True)["PLAN_ACTION"] == "rebuild"
+
+
+def test_retag_when_fingerprint_tag_exists(registry, context):
+    fingerprint = plan(registry, context)["FINGERPRINT"]
+    registry.push(TARGET, "latest", labels={configure.FINGERPRINT_LABEL: "other"})
+    assert plan(registry, context)["PLAN_ACTION"] == "rebuild"
+    registry.push(TARGET, f"fp-{fingerprint[:20]}", labels={configure.FINGERPRINT_LABEL: fingerprint})
+    result = plan(registry, context)
+    assert result["PLAN_ACTION"] == "retag"
+    assert result["PLAN_REASON"].startswith(f"{registry.host}/{TARGET}:latest was built from other inputs")
+
+
+def test_rebuild_on_registry_error(registry, context):
+    fingerprint = plan(registry, context)["FINGERPRINT"]
+    registry.push(TARGET, "latest", labels={configure.FINGERPRINT_LABEL: fingerprint})
+    registry.failures[TARGET] = 500
+    result = plan(registry, context)
+    assert result["PLAN_ACTION"] == "rebuild"
+    assert result["PLAN_REASON"].startswith(f"cannot read {registry.host}/{TARGET}:latest")
+
+
+def test_rebuild_when_base_unresolved(registry, context):
+    registry.failures[SOURCE] = 503
+    result = plan(registry, context)
+    assert result["PLAN_ACTION"] == "rebuild"
+    assert result["PLAN_REASON"].startswith("base image digest unavailable")
+    assert result["BASE_REF"] == f"{registry.host}/{SOURCE}:2026.2.0"
+
+
+def git(cwd, *args):
+    cmd = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", "-c", "init.defaultBranch=main", *args]
+    return subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, check=True).stdout.strip()
+
+
+@pytest.fixture
+def gogcli(tmp_path):
+    """Local gogcli repository: main with two commits, lightweight tag v1, annotated tag v2."""
+    repo = tmp_path / "gogcli"
+    repo.mkdir()
+    git(repo, "init", "-q")
+    git(repo, "commit", "-q", "--allow-empty", "-m", "one")
+    git(repo, "tag", "v1")
+    git(repo, "commit", "-q", "--allow-empty", "-m", "two")
+    git(repo, "tag", "-a", "v2", "-m", "v2")
+    return repo
+
+
+def use_gogcli(context, repo, ref):
+    (context / "Dockerfile").write_text(f"ARG GOGCLI_REPO={repo}\nARG GOGCLI_REF={ref}\n" + DOCKERFILE)
+
+
+def test_resolve_git_ref(gogcli):
+    head = git(gogcli, "rev-parse", "HEAD")
+    assert configure.resolve_git_ref(str(gogcli), "main") == head
+    assert configure.resolve_git_ref(str(gogcli), "v2") == head
+    assert configure.resolve_git_ref(str(gogcli), "v1") == git(gogcli, "rev-parse", "HEAD~1")
+    assert configure.resolve_git_ref(str(gogcli), "f" * 40) == "f" * 40
+    with pytest.raises(ValueError):
+        configure.resolve_git_ref(str(gogcli), "v3")
+
+
+def test_gogcli_commit_is_an_input(registry, context, gogcli):
+    use_gogcli(context, gogcli, "main")
+    first = plan(registry, context)
+    assert first["GOGCLI_REF"] == git(gogcli, "rev-parse", "HEAD")
+    registry.push(TARGET, "latest", labels={configure.FINGERPRINT_LABEL: first["FINGERPRINT"]})
+    assert plan(registry, context)["PLAN_ACTION"] == "skip"
+    # main moves while the Dockerfile stays the same: no longer a skip.
+    git(gogcli, "commit", "-q", "--allow-empty", "-m", "three")
+    second = plan(registry, context)
+    assert second["GOGCLI_REF"] == git(gogcli, "rev-parse", "HEAD")
+    assert second["FINGERPRINT"] != first["FINGERPRINT"]
+    assert second["PLAN_ACTION"] == "rebuild"
+
+
+def test_rebuild_when_gogcli_unresolved(registry, context, tmp_path):
+    use_gogcli(context, tmp_path / "missing", "main")
+    result = plan(registry, context)
+    assert result["PLAN_ACTION"] == "rebuild"
+    assert result["PLAN_REASON"].startswith("gogcli main unresolved")
+    assert result["GOGCLI_REF"] == "main"
+
+
+def test_fingerprint_inputs(context):
+    base = "ghcr.io/openclaw/openclaw:1@sha256:" + "1" * 64
+    first = configure.build_fingerprint(context, base, "linux/amd64")
+    assert configure.build_fingerprint(context, base, "linux/amd64") == first
+    assert configure.build_fingerprint(context, base, "linux/arm64") != first
+    assert configure.build_fingerprint(context, base.replace("1" * 64, "2" * 64), "linux/amd64") != first
+    (context / "scripts" / "openclaw-gateway.py").write_text("print('changed')\n")
+    assert configure.build_fingerprint(context, base, "linux/amd64") != first
+    # Files the Dockerfile does not copy are not inputs.
+    (context / "README.md").write_text("docs\n")
+    second = configure.build_fingerprint(context, base, "linux/amd64")
+    (context / "README.md").write_text("more docs\n")
+    assert configure.build_fingerprint(context, base, "linux/amd64") == second
@@ -0,0 +1,127 @@
+import base64
+import hashlib
+import json
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from conftest import load_gateway
+
+gateway = load_gateway()
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def frame(text, opcode=0x1):
+    payload = text.encode()
+    n = len(payload)
+    head = struct.pack("!BB", 0x80 | opcode, n) if n < 126 else struct.pack("!BBH", 0x80 | opcode, 126, n)
+    return head + payload
+
+
+def target(event, target_id, url, kind="page"):
+    return json.dumps({"method": f"Target.{event}", "params": {"targetInfo": {"targetId": target_id, "type": kind, "url": url}}})
+
+
+class FakeCDP:
+    """/json/version plus a browser websocket that sends `events` after the client's first message."""
+
+    def __init__(self, events):
+        self.received = []
+        cdp = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/json/version":
+                    body = json.dumps({"webSocketDebuggerUrl": f"ws://127.0.0.1:{cdp.port}/devtools/browser/x"}).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                accept = base64.b64encode(hashlib.sha1((self.headers["Sec-WebSocket-Key"] + WS_GUID).encode()).digest()).decode()
+                self.send_response(101)
+                self.send_header("Upgrade", "websocket")
+                self.send_header("Connection", "Upgrade")
+                self.send_header("Sec-WebSocket-Accept", accept)
+                self.end_headers()
+                self.wfile.flush()
+                cdp.received.extend(gateway.ws_messages(OneMessage(self.rfile)))
+                # A ping, and a message split across a text frame and a continuation frame.
+                self.wfile.write(frame("", opcode=0x9))
+                split = target("targetCreated", "split", "https://example.com/split")
+                self.wfile.write(struct.pack("!BB", 0x01, 10) + split[:10].encode())
+                self.wfile.write(frame(split[10:], opcode=0x0))
+                for event in events:
+                    self.wfile.write(frame(event))
+                self.wfile.write(struct.pack("!BB", 0x88, 0))
+                self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class OneMessage:
+    # Ends ws_messages after the client's one frame: its payload is the only read longer than 4 bytes.
+    def __init__(self, reader):
+        self.reader = reader
+        self.done = False
+
+    def read(self, n):
+        if self.done:
+            return b""
+        data = self.reader.read(n)
+        self.done = n > 4 and len(data) == n
+        return data
+
+
+class Running:
+    def poll(self):
+        return None
+
+
+@pytest.fixture
+def pool():
+    return gateway.BrowserPool(0, 9222, "chromium", 50, 0, 5)
+
+
+def test_count_uses_from_target_events(pool):
+    cdp = FakeCDP([
+        target("targetCreated", "blank", "about:blank"),
+        target("targetCreated", "nav", ""),
+        target("targetInfoChanged", "nav", "https://example.com/a"),
+        target("targetInfoChanged", "nav", "https://example.com/b"),
+        # Opened and closed between two health checks; never in /json/list.
+        target("targetCreated", "short", "https://example.com/short"),
+        json.dumps({"method": "Target.targetDestroyed", "params": {"targetId": "short"}}),
+        target("targetCreated", "worker", "https://example.com/sw.js", kind="service_worker"),
+    ])
+    try:
+        pages = set()
+        pool.count_uses(Running(), cdp.port, pages)
+    finally:
+        cdp.close()
+    assert pages == {"split", "nav", "short"}
+    assert [json.loads(m) for m in cdp.received] == [{"id": 1, "method": "Target.setDiscoverTargets", "params": {"discover": True}}]
+
+
+def test_uses_past_limit_recycle_an_idle_browser(pool, monkeypatch):
+    slot = {"index": 0, "port": 9222, "proc": Running(), "started": 0, "failures": 0, "pages": {f"p{i}" for i in range(50)}}
+    reasons = []
+    monkeypatch.setattr(pool, "recycle", lambda slot, reason: reasons.append(reason))
+    monkeypatch.setattr(pool, "targets", lambda port: [{"id": "p0", "type": "page", "url": "https://example.com"}])
+    pool.check(slot)
+    assert reasons == []
+    monkeypatch.setattr(pool, "targets", lambda port: [{"id": "blank", "type": "page", "url": "about:blank"}])
+    pool.check(slot)
+    assert reasons == ["served 50 pages"]
@@ -0,0 +1,50 @@
+import ipaddress
+
+from conftest import load_gateway
+
+gateway = load_gateway()
+
+PORT = 18789
+HEADER = "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n"
+
+
+def proc_addr(ip, port):
+    # Inverse of peer_address: 32-bit words in host (little-endian) order.
+    packed = ipaddress.ip_address(ip).packed
+    return "".join(packed[i:i + 4][::-1].hex().upper() for i in range(0, len(packed), 4)) + f":{port:04X}"
+
+
+def table(path, rows):
+    lines = [HEADER]
+    for n, (local, remote, state) in enumerate(rows):
+        lines.append(f"{n:4}: {proc_addr(*local)} {proc_addr(*remote)} {state} 00000000:00000000 00:00000000 00000000  1000 0 1 1\n")
+    path.write_text("".join(lines))
+    return str(path)
+
+
+def test_peer_address():
+    assert str(gateway.peer_address("0100007F")) == "127.0.0.1"
+    assert str(gateway.peer_address("0500000A")) == "10.0.0.5"
+    assert str(gateway.peer_address(proc_addr("::ffff:10.0.0.9", 1).split(":")[0])) == "10.0.0.9"
+    assert str(gateway.peer_address(proc_addr("fd00::1", 1).split(":")[0])) == "fd00::1"
+
+
+def test_counts_only_clients(tmp_path):
+    tcp = table(tmp_path / "tcp", [
+        (("0.0.0.0", PORT), ("0.0.0.0", 0), "0A"),                # listener
+        (("10.1.0.4", PORT), ("10.2.0.7", 40000), "01"),          # client
+        (("10.1.0.4", PORT), ("10.2.0.8", 40001), "01"),          # client
+        (("10.1.0.4", PORT), ("10.2.0.9", 40002), "06"),          # TIME_WAIT
+        (("127.0.0.1", PORT), ("127.0.0.1", 40003), "01"),        # our own port check
+        (("10.1.0.4", PORT), ("192.168.1.10", 40004), "01"),      # kubelet probe from the node
+        (("10.1.0.4", 9464), ("10.2.0.7", 40005), "01"),          # another port
+    ])
+    tcp6 = table(tmp_path / "tcp6", [
+        (("::ffff:10.1.0.4", PORT), ("::ffff:10.2.0.10", 40006), "01"),  # client over a dual-stack socket
+        (("::1", PORT), ("::1", 40007), "01"),
+        (("fd00::4", PORT), ("fd00::20", 40008), "01"),
+    ])
+    assert gateway.established_connections(PORT, tables=(tcp, tcp6)) == 5
+    assert gateway.established_connections(PORT, ["192.168.1.10"], tables=(tcp, tcp6)) == 4
+    assert gateway.established_connections(PORT, ["192.168.1.10", "fd00::20"], tables=(tcp, tcp6)) == 3
+    assert gateway.established_connections(PORT, tables=(str(tmp_path / "missing"),)) == 0
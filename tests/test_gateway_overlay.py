@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from conftest import load_gateway
+
+gateway = load_gateway()
+
+CONFIG = {"gateway": {"port": 18789, "auth": {"mode": "token"}}, "agents": {"defaults": {"model": "x"}}}
+
+
+@pytest.fixture
+def config(tmp_path):
+    path = tmp_path / "openclaw.json"
+    path.write_text(json.dumps(CONFIG, indent=2))
+    return path
+
+
+@pytest.mark.parametrize("raw, value", [
+    ("8080", 8080),
+    ("1.5", 1.5),
+    ("true", True),
+    ("null", None),
+    ('{"a": [1]}', {"a": [1]}),
+    ('"8080"', "8080"),
+    ("abc", "abc"),
+    ("", ""),
+])
+def test_parse_value(raw, value):
+    assert gateway.parse_value(raw) == value
+
+
+def test_overlay_paths_and_legacy_token():
+    environ = {
+        "OPENCLAW_GATEWAY_TOKEN": "legacy",
+        "OPENCLAW_CFG__gateway__auth__token": "abc",
+        "OPENCLAW_CFG__gateway____port": "1",
+        "OTHER": "x",
+    }
+    # The OPENCLAW_CFG__ token comes after the legacy one, so it wins.
+    assert gateway.config_overlays(environ) == [(["gateway", "auth", "token"], "legacy"), (["gateway", "auth", "token"], "abc")]
+
+
+def test_second_run_does_not_rewrite(config, capsys):
+    environ = {"OPENCLAW_CFG__gateway__auth__token": "abc", "OPENCLAW_CFG__gateway__port": "8080"}
+    gateway.overlay_config(config, environ)
+    data = json.loads(config.read_text())
+    assert data["gateway"] == {"port": 8080, "auth": {"mode": "token", "token": "abc"}}
+    assert "Updated" in capsys.readouterr().err
+
+    mtime = config.stat().st_mtime_ns
+    inode = config.stat().st_ino
+    gateway.overlay_config(config, environ)
+    assert (config.stat().st_mtime_ns, config.stat().st_ino) == (mtime, inode)
+    assert "not rewriting" in capsys.readouterr().err
+    assert not list(config.parent.glob(".openclaw.json.tmp-*"))
+
+
+def test_conflicting_path_is_skipped(config, capsys):
+    environ = {"OPENCLAW_CFG__gateway__port__value": "1", "OPENCLAW_CFG__agents__defaults__model": '"y"'}
+    gateway.overlay_config(config, environ)
+    data = json.loads(config.read_text())
+    assert data["gateway"]["port"] == 18789
+    assert data["agents"]["defaults"]["model"] == "y"
+    assert "Warning: skipping override gateway.port.value: port is not an object" in capsys.readouterr().err
+
+
+def test_drop_pool_profiles():
+    data = {"browser": {
+        "defaultProfile": "pool-2",
+        "profiles": {"pool-0": {"cdpPort": 9222}, "pool-2": {"cdpPort": 9224}, "personal": {"cdpPort": 9300}},
+    }}
+    overlays = [(["browser", "profiles", "pool-0"], {"cdpPort": 9222})]
+    assert gateway.drop_pool_profiles(data, overlays) == ["browser.profiles.pool-2", "browser.defaultProfile"]
+    assert data == {"browser": {"profiles": {"pool-0": {"cdpPort": 9222}, "personal": {"cdpPort": 9300}}}}
+    # A default that is still live, or not a pool profile, stays.
+    data["browser"]["defaultProfile"] = "pool-0"
+    assert gateway.drop_pool_profiles(data, overlays) == []
+    data["browser"]["defaultProfile"] = "personal"
+    assert gateway.drop_pool_profiles(data, []) == ["browser.profiles.pool-0"]
+    assert data["browser"]["defaultProfile"] == "personal"
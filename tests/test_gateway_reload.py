@@ -0,0 +1,101 @@
+import json
+import os
+import signal
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import load_gateway
+
+gateway = load_gateway()
+
+POOL_ENV = {
+    "OPENCLAW_CFG__browser__defaultProfile": "pool-0",
+    "OPENCLAW_CFG__browser__profiles__pool-0__cdpUrl": "http://127.0.0.1:9222",
+}
+
+
+class ConfigMapVolume:
+    """The kubelet's ConfigMap volume layout: openclaw.json -> ..data/openclaw.json, ..data -> ..<version>."""
+
+    def __init__(self, root):
+        self.root = root
+        self.version = 0
+        root.mkdir()
+
+    def publish(self, data):
+        self.version += 1
+        version_dir = self.root / f"..2026_10_16_00_00_{self.version:02}"
+        version_dir.mkdir()
+        (version_dir / "openclaw.json").write_text(json.dumps(data))
+        tmp = self.root / "..data_tmp"
+        os.symlink(version_dir.name, tmp)
+        os.rename(tmp, self.root / "..data")
+        if not (self.root / "openclaw.json").is_symlink():
+            os.symlink("..data/openclaw.json", self.root / "openclaw.json")
+
+
+@pytest.fixture
+def setup(tmp_path):
+    volume = ConfigMapVolume(tmp_path / "config")
+    volume.publish({"gateway": {"port": 1}})
+    state = tmp_path / "state"
+    state.mkdir()
+    dst = state / "openclaw.json"
+    supervisor = SimpleNamespace(pending=[])
+    watcher = gateway.ConfigWatcher(volume.root / "openclaw.json", dst, {"OPENCLAW_CFG__gateway__auth__token": "abc"},
+                                    supervisor, signal.SIGUSR1)
+    yield SimpleNamespace(volume=volume, dst=dst, supervisor=supervisor, watcher=watcher)
+    os.close(watcher.fd)
+
+
+def test_symlink_swap_is_a_change(setup):
+    setup.volume.publish({"gateway": {"port": 2}})
+    assert setup.watcher.changed(os.read(setup.watcher.fd, 64 * 1024))
+    (setup.volume.root / "unrelated").write_text("x")
+    assert not setup.watcher.changed(os.read(setup.watcher.fd, 64 * 1024))
+
+
+def test_sync_writes_backup_and_hash_once(setup, capsys):
+    setup.dst.write_text('{"old": true}')
+    setup.watcher.sync()
+    assert json.loads(setup.dst.read_text()) == {"gateway": {"port": 1, "auth": {"token": "abc"}}}
+    assert (setup.dst.parent / gateway.CONFIG_BACKUP_FILE).read_text() == '{"old": true}'
+    raw = (setup.volume.root / "openclaw.json").read_bytes()
+    assert (setup.dst.parent / gateway.CONFIG_HASH_FILE).read_text() == gateway.hashlib.sha256(raw).hexdigest() + "\n"
+    assert setup.supervisor.pending == [signal.SIGUSR1]
+
+    mtime = setup.dst.stat().st_mtime_ns
+    setup.watcher.sync()
+    assert setup.dst.stat().st_mtime_ns == mtime
+    assert setup.supervisor.pending == [signal.SIGUSR1]
+    assert "hash matches; nothing to do" in capsys.readouterr().err
+
+
+def test_reload_drops_stale_pool_profiles(tmp_path):
+    src = tmp_path / "openclaw.json"
+    src.write_text(json.dumps({"browser": {"defaultProfile": "pool-3", "profiles": {"pool-3": {}, "pool-0": {}, "work": {}}}}))
+    dst = tmp_path / "state.json"
+    assert gateway.sync_config(src, dst, POOL_ENV)
+    assert json.loads(dst.read_text()) == {"browser": {
+        "defaultProfile": "pool-0",
+        "profiles": {"pool-0": {"cdpUrl": "http://127.0.0.1:9222"}, "work": {}},
+    }}
+
+
+def test_burst_of_changes_syncs_once(setup, monkeypatch):
+    monkeypatch.setattr(gateway, "WATCH_SETTLE_SECONDS", 0.3)
+    syncs = []
+    sync = setup.watcher.sync
+    monkeypatch.setattr(setup.watcher, "sync", lambda: (syncs.append(time.monotonic()), sync()))
+    threading.Thread(target=setup.watcher.run, daemon=True).start()
+    for port in (2, 3, 4):
+        setup.volume.publish({"gateway": {"port": port}})
+    deadline = time.monotonic() + 5
+    while not syncs and time.monotonic() < deadline:
+        time.sleep(0.05)
+    time.sleep(0.6)
+    assert len(syncs) == 1
+    assert json.loads(setup.dst.read_text())["gateway"]["port"] == 4
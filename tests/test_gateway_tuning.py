@@ -0,0 +1,102 @@
+import os
+
+import pytest
+
+import openclaw_diag as diag
+from conftest import load_gateway
+
+gateway = load_gateway()
+
+MI = 2 ** 20
+GI = 2 ** 30
+
+
+def write(root, files):
+    for name, text in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text + "\n")
+
+
+def limits(root, files, proc_cgroup="0::/\n"):
+    write(root, files)
+    (root.parent / "self-cgroup").write_text(proc_cgroup)
+    return gateway.cgroup_limits(str(root), str(root.parent / "self-cgroup"))
+
+
+@pytest.fixture
+def root(tmp_path):
+    path = tmp_path / "cgroup"
+    path.mkdir()
+    return path
+
+
+def test_v2_unlimited(root):
+    assert limits(root, {"cgroup.controllers": "cpu memory", "memory.max": "max", "cpu.max": "max 100000"}) == ("v2", None, None)
+
+
+def test_v2_limits(root):
+    files = {"cgroup.controllers": "cpu memory", "memory.max": str(GI), "cpu.max": "150000 100000"}
+    assert limits(root, files) == ("v2", GI, 1.5)
+
+
+def test_v2_nested_cgroup(root):
+    # Without a cgroup namespace the limits live in our own subdirectory.
+    files = {"cgroup.controllers": "cpu memory", "memory.max": "max",
+             "kubepods/pod1/memory.max": str(2 * GI), "kubepods/pod1/cpu.max": "50000 100000"}
+    assert limits(root, files, "0::/kubepods/pod1\n") == ("v2", 2 * GI, 0.5)
+
+
+def test_v1_unlimited(root):
+    files = {"memory/memory.limit_in_bytes": "9223372036854771712",
+             "cpu,cpuacct/cpu.cfs_quota_us": "-1", "cpu,cpuacct/cpu.cfs_period_us": "100000"}
+    assert limits(root, files) == ("v1", None, None)
+
+
+def test_v1_limits(root):
+    files = {"memory/memory.limit_in_bytes": str(512 * MI),
+             "cpu/cpu.cfs_quota_us": "200000", "cpu/cpu.cfs_period_us": "100000"}
+    assert limits(root, files) == ("v1", 512 * MI, 2.0)
+
+
+def test_no_cgroup(root):
+    assert limits(root, {}) == (None, None, None)
+
+
+def test_no_limits_falls_back_to_affinity(monkeypatch):
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {0, 1, 2}, raising=False)
+    updates, chosen = gateway.runtime_tuning({}, (None, None, None))
+    assert updates == {"UV_THREADPOOL_SIZE": "6"}
+    assert chosen == [("UV_THREADPOOL_SIZE", 6, "auto")]
+
+
+@pytest.mark.parametrize("memory, heap, semi", [
+    (512 * MI, 307, 8),   # 4 x 128Mi -> clamped up to 8
+    (GI, 614, 8),
+    (3 * GI, 1843, 16),   # 24 x 128Mi -> rounded down to a power of two
+    (4 * GI, 2457, 32),
+    (16 * GI, 9830, 64),  # 128 x 128Mi -> clamped down to 64
+])
+def test_heap_and_semi_space(memory, heap, semi):
+    updates, _ = gateway.runtime_tuning({}, ("v2", memory, 1.0))
+    assert updates["NODE_OPTIONS"] == f"--max-old-space-size={heap} --max-semi-space-size={semi}"
+    assert heap == int(memory // MI * 0.6)
+
+
+@pytest.mark.parametrize("cpus, threads", [(0.25, 4), (1.5, 4), (3, 6), (31.5, 64), (100, 64)])
+def test_threadpool_clamp(cpus, threads):
+    updates, _ = gateway.runtime_tuning({}, ("v2", None, cpus))
+    assert updates == {"UV_THREADPOOL_SIZE": str(threads)}
+
+
+def test_user_settings_win():
+    environ = {"NODE_OPTIONS": "--enable-source-maps --max-old-space-size=999", "UV_THREADPOOL_SIZE": "12"}
+    updates, chosen = gateway.runtime_tuning(environ, ("v2", GI, 8.0))
+    assert updates == {"NODE_OPTIONS": "--enable-source-maps --max-old-space-size=999 --max-semi-space-size=8"}
+    assert ("--max-old-space-size", "999", "user") in chosen
+    assert ("UV_THREADPOOL_SIZE", "12", "user") in chosen
+
+
+def test_constants_match_diag():
+    for name in ("NODE_HEAP_FRACTION", "MIN_UV_THREADPOOL", "MAX_UV_THREADPOOL"):
+        assert getattr(gateway, name) == getattr(diag, name), name
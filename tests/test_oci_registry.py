@@ -0,0 +1,68 @@
+import pytest
+
+import oci_registry
+from fake_registry import TOKEN, Registry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(oci_registry, "_tokens", {})
+    monkeypatch.delenv("REGISTRY_USERNAME", raising=False)
+    monkeypatch.setenv("DOCKER_CONFIG", "/nonexistent")
+    server = Registry()
+    yield server
+    server.close()
+
+
+def test_split_reference():
+    assert oci_registry.split_reference("ghcr.io/openclaw/openclaw") == ("ghcr.io", "openclaw/openclaw")
+    assert oci_registry.split_reference("localhost:5000/app") == ("localhost:5000", "app")
+    assert oci_registry.split_reference("node") == ("docker.io", "node")
+    assert oci_registry.registry_base("127.0.0.1:5000") == "http://127.0.0.1:5000"
+    assert oci_registry.registry_base("docker.io") == "https://registry-1.docker.io"
+
+
+def test_resolve_index_to_platform_digests(registry):
+    index, digests = registry.push("openclaw/openclaw", "2026.2.0")
+    resolved, platforms = oci_registry.resolve_digests(registry.host, "openclaw/openclaw", "2026.2.0")
+    assert resolved == index
+    # The unknown/unknown attestation entry is not a platform.
+    assert platforms == digests
+    assert oci_registry.pick_digest(resolved, platforms, "linux/arm64") == digests["linux/arm64"]
+    assert oci_registry.pick_digest(resolved, platforms, "index") == index
+
+
+def test_bearer_challenge(registry):
+    registry.push("openclaw/openclaw", "2026.2.0")
+    oci_registry.resolve_digests(registry.host, "openclaw/openclaw", "2026.2.0")
+    oci_registry.resolve_digests(registry.host, "openclaw/openclaw", "2026.2.0")
+    paths = [path for path, _ in registry.requests]
+    # One 401, one token request, then the token is reused.
+    assert paths[0] == "/v2/openclaw/openclaw/manifests/2026.2.0" and registry.requests[0][1] is None
+    assert paths[1].startswith("/token?") and "scope=repository%3Aopenclaw%2Fopenclaw%3Apull" in paths[1]
+    assert registry.requests[2] == ("/v2/openclaw/openclaw/manifests/2026.2.0", f"Bearer {TOKEN}")
+    assert len(paths) == 4
+
+
+def test_missing_platform(registry):
+    registry.push("openclaw/openclaw", "2026.2.0", platforms=("linux/arm64",))
+    index, platforms = oci_registry.resolve_digests(registry.host, "openclaw/openclaw", "2026.2.0")
+    with pytest.raises(oci_registry.RegistryError, match="No linux/amd64 manifest; available: linux/arm64"):
+        oci_registry.pick_digest(index, platforms, "linux/amd64")
+
+
+def test_single_manifest_tag(registry):
+    _, digests = registry.push("openclaw/openclaw", "2026.2.0", platforms=("linux/amd64",))
+    registry.manifests[("openclaw/openclaw", "amd64-only")] = registry.manifests[("openclaw/openclaw", digests["linux/amd64"])]
+    assert oci_registry.resolve_digests(registry.host, "openclaw/openclaw", "amd64-only") == (digests["linux/amd64"], {})
+
+
+def test_unknown_tag(registry):
+    with pytest.raises(oci_registry.RegistryError) as excinfo:
+        oci_registry.resolve_digests(registry.host, "openclaw/openclaw", "nope")
+    assert excinfo.value.status == 404
+
+
+def test_image_labels(registry):
+    registry.push("team/openclaw-playwright", "latest", labels={"org.example": "1"})
+    assert oci_registry.image_labels(registry.host, "team/openclaw-playwright", "latest", "linux/amd64") == {"org.example": "1"}
@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+
+def diag(*args):
+    return subprocess.run([sys.executable, str(ROOT / "bin" / "openclaw_diag.py"), *args],
+                          capture_output=True, text=True, timeout=60)
+
+
+def test_invalid_grep_is_a_usage_error():
+    proc = diag("--follow", "--grep", "error|(warn")
+    assert proc.returncode == 2
+    assert "--grep: invalid regex 'error|(warn'" in proc.stderr
+    assert "Traceback" not in proc.stderr
+
+
+@pytest.mark.parametrize("args", [("--grep", "error"), ("--since", "10m"), ("--watch", "--grep", "error")])
+def test_follow_options_need_follow(args):
+    proc = diag(*args)
+    assert proc.returncode == 2
+    assert "--grep and --since only apply to --follow" in proc.stderr
@@ -0,0 +1,142 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+import openclaw_diag as diag
+
+TOKEN = "s3cret"
+
+
+class Gateway:
+    """Stand-in gateway: the first requests fail, the rest answer after a scripted delay."""
+
+    def __init__(self, failures, delays):
+        self.failures = list(failures)
+        self.delays = list(delays)
+        self.requests = []
+        self.connections = set()
+        gateway = self
+        lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes; without this, delayed ACKs add ~40ms.
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with lock:
+                    gateway.requests.append(dict(self.headers))
+                    gateway.connections.add(self.client_address)
+                    status = gateway.failures.pop(0) if gateway.failures else 200
+                    delay = gateway.delays.pop(0) if status == 200 and gateway.delays else 0
+                time.sleep(delay)
+                body = b"ok" if status == 200 else b"no"
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/healthz"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def gateway_factory():
+    servers = []
+
+    def make(failures=(), delays=()):
+        servers.append(Gateway(failures, delays))
+        return servers[-1]
+
+    yield make
+    for server in servers:
+        server.close()
+
+
+@pytest.mark.parametrize("values, pct, expected", [
+    (list(range(1, 101)), 50, 50),
+    (list(range(1, 101)), 95, 95),
+    (list(range(1, 101)), 99, 99),
+    (list(range(1, 101)), 7, 7),
+    (list(range(1, 101)), 100, 100),
+    (list(range(1, 101)), 0, 1),
+    ([1, 2], 50, 1),
+    ([1, 2], 51, 2),
+    (list(range(1, 21)), 95, 19),
+    (list(range(1, 11)), 90, 9),
+    ([5], 99, 5),
+])
+def test_percentile_nearest_rank(values, pct, expected):
+    assert diag.percentile(values, pct) == expected
+
+
+def test_percentile_empty():
+    assert diag.percentile([], 50) is None
+
+
+def test_probe_counts_latency_and_errors(gateway_factory):
+    # 100 successes: 50 instant, 45 at 30ms, 4 at 100ms, 1 at 250ms. Nearest rank puts
+    # p50 at #50 (instant), p95 at #95 (30ms) and p99 at #99 (100ms).
+    gateway = gateway_factory(failures=[401] * 5 + [503] * 5, delays=[0] * 50 + [0.03] * 45 + [0.1] * 4 + [0.25])
+    result = diag.probe_url(gateway.url, TOKEN, total=110, concurrency=1, timeout=5)
+    assert result["requests"] == 110
+    assert len(gateway.requests) == 110
+    assert result["ok"] == 100
+    assert result["errors"] == {"HTTP 401": 5, "HTTP 503": 5}
+    assert result["error_rate"] == pytest.approx(10 / 110)
+    assert all(headers.get("Authorization") == f"Bearer {TOKEN}" for headers in gateway.requests)
+    assert result["p50"] < 0.025
+    assert 0.03 <= result["p95"] < 0.09
+    assert 0.1 <= result["p99"] < 0.24
+    assert result["max"] >= 0.25
+    # One keep-alive connection for the whole run, error responses included.
+    assert len(gateway.connections) == 1
+
+
+def test_probe_concurrency_and_no_token(gateway_factory):
+    gateway = gateway_factory(delays=[0.01] * 40)
+    result = diag.probe_url(gateway.url, None, total=40, concurrency=4, timeout=5)
+    assert result["ok"] == len(gateway.requests) == 40
+    assert result["error_rate"] == 0.0
+    assert all("Authorization" not in headers for headers in gateway.requests)
+    assert len(gateway.connections) == 4
+
+
+def test_probe_unreachable():
+    gateway = Gateway((), ())
+    url = gateway.url
+    gateway.close()
+    result = diag.probe_url(url, TOKEN, total=3, concurrency=1, timeout=1)
+    assert result["ok"] == 0
+    assert result["errors"] == {"ConnectionRefusedError": 3}
+    assert result["error_rate"] == 1.0
+    assert result["p50"] is None
+
+
+def test_probe_targets():
+    port = SimpleNamespace(name="gateway", container_port=18789)
+    pod = SimpleNamespace(status=SimpleNamespace(pod_ip="10.0.0.7"))
+    container = SimpleNamespace(ports=[port])
+    svc = SimpleNamespace(spec=SimpleNamespace(cluster_ip="10.96.0.10", ports=[SimpleNamespace(name="gateway", port=80)]))
+    ing = SimpleNamespace(spec=SimpleNamespace(
+        tls=[SimpleNamespace(hosts=["secure.example.com"])],
+        rules=[SimpleNamespace(host="secure.example.com"), SimpleNamespace(host="plain.example.com")],
+    ))
+    assert diag.probe_targets(pod, container, svc, [ing]) == [
+        ("pod", "http://10.0.0.7:18789"),
+        ("service", "http://10.96.0.10:80"),
+        ("ingress", "https://secure.example.com"),
+        ("ingress", "http://plain.example.com"),
+    ]
@@ -0,0 +1,90 @@
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+import kube_lite
+import openclaw_diag as diag
+from conftest import ROOT
+
+URL = "https://kubernetes.default.svc/api/v1/namespaces/apps/secrets/gateway"
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """kube_lite's ApiClient.request replaced by a script of failures, then a 200."""
+    diag.load_backend("lean")
+    monkeypatch.setattr(diag, "RETRY_BASE_SECONDS", 0.0)
+    calls = []
+    failures = []
+
+    def request(api_client, method, url, query_params=None, *args, **kwargs):
+        calls.append(kwargs.get("_request_timeout"))
+        if failures:
+            raise failures.pop(0)
+        return SimpleNamespace(status=200, data=b"{}", urllib3_response=SimpleNamespace(headers={}))
+
+    monkeypatch.setattr(kube_lite.ApiClient, "request", request)
+    return SimpleNamespace(calls=calls, failures=failures)
+
+
+def install(retries):
+    prof = diag.Profiler(enabled=True)
+    deadline = diag.Deadline(None, 5.0, retries, prof)
+    deadline.install()
+    prof.install()
+    return prof
+
+
+def test_retried_call_is_one_profiled_request(api):
+    api.failures.extend([kube_lite.ApiException(status=503, reason="Service Unavailable")] * 2)
+    prof = install(retries=3)
+
+    resp = kube_lite.ApiClient.request(None, "GET", URL)
+
+    assert resp.status == 200
+    assert len(api.calls) == 3
+    assert [(r["status"], r["retries"]) for r in prof.requests] == [(200, 2)]
+
+
+def test_exhausted_retries_are_counted(api):
+    api.failures.extend([ConnectionResetError("reset")] * 3)
+    prof = install(retries=2)
+
+    with pytest.raises(kube_lite.ApiException) as err:
+        kube_lite.ApiClient.request(None, "GET", URL)
+
+    assert err.value.status == 0
+    assert "after 3 attempts" in err.value.reason
+    assert [r["retries"] for r in prof.requests] == [2]
+
+
+def test_retry_count_resets_per_call(api):
+    api.failures.append(kube_lite.ApiException(status=429, reason="Too Many Requests"))
+    prof = install(retries=3)
+
+    kube_lite.ApiClient.request(None, "GET", URL)
+    kube_lite.ApiClient.request(None, "GET", URL)
+
+    assert [r["retries"] for r in prof.requests] == [1, 0]
+
+
+def test_zero_deadline_is_already_spent(api):
+    deadline = diag.Deadline(0.0, 5.0, 3, diag.Profiler(enabled=False))
+    assert deadline.expired()
+    deadline.install()
+
+    with pytest.raises(kube_lite.ApiException) as err:
+        kube_lite.ApiClient.request(None, "GET", URL)
+
+    assert err.value.timed_out
+    assert "--deadline 0s reached" in err.value.reason
+    assert api.calls == []
+
+
+def test_non_positive_deadline_is_rejected():
+    proc = subprocess.run([sys.executable, str(ROOT / "bin" / "openclaw_diag.py"), "--deadline", "0s"],
+                          capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 2
+    assert "--deadline must be positive" in proc.stderr
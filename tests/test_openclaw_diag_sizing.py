@@ -0,0 +1,164 @@
+import json
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+import openclaw_diag as diag
+from conftest import FIXTURES, ROOT, load_gateway
+
+MI = 2 ** 20
+METRICS = FIXTURES / "metrics.json"
+
+
+def container(name, requests=None, limits=None):
+    return SimpleNamespace(name=name, resources=SimpleNamespace(requests=requests, limits=limits))
+
+
+def pod(*statuses):
+    return SimpleNamespace(status=SimpleNamespace(container_statuses=list(statuses)))
+
+
+def status(name, restarts=0, last_reason=None):
+    last = SimpleNamespace(terminated=SimpleNamespace(reason=last_reason)) if last_reason else None
+    return SimpleNamespace(name=name, restart_count=restarts, state=None, last_state=last)
+
+
+def statefulset(*containers):
+    return SimpleNamespace(spec=SimpleNamespace(template=SimpleNamespace(spec=SimpleNamespace(containers=list(containers)))))
+
+
+def no_resources():
+    return {"requests": {"cpu": None, "memory": None}, "limits": {"cpu": None, "memory": None}}
+
+
+@pytest.fixture
+def series():
+    return diag.usage_series(diag.load_metrics_file(str(METRICS)))
+
+
+def test_usage_series_per_container(series):
+    assert set(series) == {"gateway", "chrome"}
+    assert len(series["gateway"]["cpu"]) == len(series["gateway"]["memory"]) == 12
+    # "350000000n" and "204800Ki" are parsed like "350m" and "200Mi".
+    assert pytest.approx(0.35) in series["gateway"]["cpu"]
+    assert 200 * MI in series["gateway"]["memory"]
+
+
+def test_percentiles(series):
+    # 12 samples, nearest rank ceil(pct * 12 / 100): p25 -> #3, p50 -> #6, p90 -> #11, p99 -> #12.
+    cpu = sorted(series["gateway"]["cpu"])
+    memory = sorted(series["gateway"]["memory"])
+    assert diag.percentile(cpu, 25) == pytest.approx(0.15)
+    assert diag.percentile(cpu, 50) == pytest.approx(0.22)
+    assert diag.percentile(cpu, 90) == pytest.approx(0.45)
+    assert diag.percentile(cpu, 99) == pytest.approx(0.9)
+    assert diag.percentile(memory, 25) == 220 * MI
+    assert diag.percentile(memory, 50) == 250 * MI
+    assert diag.percentile(memory, 90) == 400 * MI
+    assert diag.percentile([], 90) is None
+
+
+def test_recommend_resources(series):
+    rec = diag.recommend_resources(series["gateway"]["cpu"], series["gateway"]["memory"], no_resources(), False)
+    # cpu: p90 450m * 1.2 -> 550m (0.05 steps); max 900m * 1.5 -> 1400m (0.1 steps)
+    assert rec["requests"]["cpu"] == pytest.approx(0.55)
+    assert rec["limits"]["cpu"] == pytest.approx(1.4)
+    # memory: p90 400Mi * 1.2 = 480Mi -> 512Mi; max 500Mi * 1.5 = 750Mi -> 768Mi (64Mi steps)
+    assert rec["requests"]["memory"] == 512 * MI
+    assert rec["limits"]["memory"] == 768 * MI
+    assert rec["max_old_space_mib"] == int(768 * 0.6)
+    assert rec["uv_threadpool_size"] == 4
+
+
+def test_recommend_resources_uses_p90_not_max():
+    # 10 samples: p90 is #9 (900m / 900Mi); the max (#10) only drives the limits.
+    cpu = [i / 10 for i in range(1, 11)]
+    memory = [i * 100 * MI for i in range(1, 11)]
+    rec = diag.recommend_resources(cpu, memory, no_resources(), False)
+    assert rec["requests"]["cpu"] == pytest.approx(1.1)  # 900m * 1.2 = 1080m -> 1100m
+    assert rec["limits"]["cpu"] == pytest.approx(1.5)
+    assert rec["requests"]["memory"] == 1088 * MI  # 900Mi * 1.2 = 1080Mi -> 1088Mi
+    assert rec["limits"]["memory"] == 1536 * MI
+
+
+def test_recommend_resources_floors_and_clamps():
+    rec = diag.recommend_resources([0.001], [MI], no_resources(), False)
+    assert rec["requests"]["cpu"] == 0.05
+    assert rec["requests"]["memory"] == rec["limits"]["memory"] == 64 * MI
+    assert diag.recommend_resources([3.0], [MI], no_resources(), False)["uv_threadpool_size"] == 10
+    assert diag.recommend_resources([40.0], [MI], no_resources(), False)["uv_threadpool_size"] == 64
+
+
+@pytest.mark.parametrize("cpu, memory", [(0.001, MI), (0.3, 300 * MI), (1.2, 700 * MI), (2.9, 1900 * MI), (45.0, 30000 * MI)])
+def test_recommendation_matches_gateway_tuning(cpu, memory):
+    # The advisor suggests what the gateway wrapper will apply for the suggested limits.
+    rec = diag.recommend_resources([cpu], [memory], no_resources(), False)
+    updates, _ = load_gateway().runtime_tuning({}, ("v2", rec["limits"]["memory"], rec["limits"]["cpu"]))
+    assert updates["NODE_OPTIONS"].split()[0] == f"--max-old-space-size={rec['max_old_space_mib']}"
+    assert updates["UV_THREADPOOL_SIZE"] == str(rec["uv_threadpool_size"])
+
+
+def test_recommend_resources_after_oom_kill(series):
+    current = {"requests": {"cpu": 0.25, "memory": 512 * MI}, "limits": {"cpu": 1.0, "memory": 1024 * MI}}
+    rec = diag.recommend_resources(series["gateway"]["cpu"], series["gateway"]["memory"], current, True)
+    assert rec["limits"]["memory"] == 1536 * MI
+    assert rec["max_old_space_mib"] == int(1536 * 0.6)
+
+
+def test_recommend_resources_without_samples_keeps_current():
+    current = {"requests": {"cpu": 0.25, "memory": 512 * MI}, "limits": {"cpu": 1.0, "memory": 1024 * MI}}
+    rec = diag.recommend_resources([], [], current, False)
+    assert rec["requests"] == current["requests"]
+    assert rec["limits"] == current["limits"]
+
+
+def test_print_sizing(capsys):
+    sts = statefulset(
+        container("gateway", {"cpu": "250m", "memory": "512Mi"}, {"cpu": "1", "memory": "1Gi"}),
+        container("chrome"),
+    )
+    pods = [pod(status("gateway", restarts=2), status("chrome")), pod(status("gateway"), status("chrome"))]
+    diag.print_sizing(sts, pods, diag.load_metrics_file(str(METRICS)))
+    out = capsys.readouterr().out
+    assert "220m/450m/900m" in out
+    assert "250Mi/400Mi/500Mi" in out
+    assert "250m/1000m" in out
+    assert "512Mi/1Gi" in out
+    assert "100m/150m/160m" in out
+    expected = [
+        "      requests:",
+        "        cpu: 550m",
+        "        memory: 512Mi",
+        "      limits:",
+        "        cpu: 1400m",
+        "        memory: 768Mi",
+        "    env:",
+        '      NODE_OPTIONS: "--max-old-space-size=460"',
+        '      UV_THREADPOOL_SIZE: "4"',
+    ]
+    lines = out.splitlines()
+    start = lines.index("      requests:")
+    assert lines[start:start + len(expected)] == expected
+
+
+def test_print_sizing_oom_killed(capsys):
+    sts = statefulset(container("gateway", {"cpu": "250m", "memory": "512Mi"}, {"cpu": "1", "memory": "1Gi"}))
+    diag.print_sizing(sts, [pod(status("gateway", restarts=1, last_reason="OOMKilled"))], diag.load_metrics_file(str(METRICS)))
+    out = capsys.readouterr().out
+    assert "        memory: 1536Mi" in out
+    assert "--max-old-space-size=921" in out
+
+
+@pytest.mark.parametrize("content", ["not json", "[]", '{"samples": {}}', '{"samples": [1, 2]}', "{}"])
+def test_bad_metrics_file(tmp_path, content):
+    path = tmp_path / "metrics.json"
+    path.write_text(content)
+    with pytest.raises(ValueError):
+        diag.load_metrics_file(str(path))
+    proc = subprocess.run([sys.executable, str(ROOT / "bin" / "openclaw_diag.py"), "--sizing", "--metrics-file", str(path)],
+                          capture_output=True, text=True)
+    assert proc.returncode == 1
+    assert f"Could not read metrics file {path}" in proc.stderr
+    assert "Traceback" not in proc.stderr
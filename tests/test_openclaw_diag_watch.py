@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+
+
+import openclaw_diag as diag
+
+STS = SimpleNamespace(metadata=SimpleNamespace(name="claw"), spec=None, status=None)
+
+
+class EventsAPI:
+    def __init__(self, items=()):
+        self.calls = []
+        self.items = list(items)
+
+    def list_namespaced_event(self, **kwargs):
+        self.calls.append(kwargs)
+        kind = "StatefulSet" if "StatefulSet" in kwargs.get("field_selector", "") else "Pod"
+        items = [e for e in self.items if e.involved_object.kind == kind]
+        return SimpleNamespace(items=items, metadata=SimpleNamespace(resource_version=str(len(self.calls)), _continue=None))
+
+
+def event(kind, name, uid):
+    return SimpleNamespace(
+        involved_object=SimpleNamespace(kind=kind, name=name),
+        metadata=SimpleNamespace(uid=uid),
+        count=1, type="Warning", reason="Test", message="m",
+    )
+
+
+def test_event_watches_use_field_selectors(monkeypatch):
+    v1 = EventsAPI()
+    watcher = diag.ReleaseWatcher(v1, None, "apps", STS, "app=claw")
+    streams = []
+    monkeypatch.setattr(watcher, "_loop", lambda *stream: streams.append(stream))
+    watcher.stop.set()
+    watcher.run([], "10", "11")
+
+    assert v1.calls == [
+        {"namespace": "apps", "field_selector": "involvedObject.kind=Pod", "limit": diag.LIST_PAGE_SIZE, "_continue": None},
+        {"namespace": "apps", "field_selector": "involvedObject.kind=StatefulSet,involvedObject.name=claw",
+         "limit": diag.LIST_PAGE_SIZE, "_continue": None},
+    ]
+    events = {kind: (list_call(), rv) for kind, list_call, _, _, rv in streams if "events" in kind}
+    assert events["pod events"] == ((v1.list_namespaced_event, {"namespace": "apps", "field_selector": "involvedObject.kind=Pod"}), "1")
+    assert events["statefulset events"][0][1]["field_selector"] == "involvedObject.kind=StatefulSet,involvedObject.name=claw"
+    assert events["statefulset events"][1] == "2"
+
+
+def test_pod_events_outside_the_release_are_dropped(capsys):
+    watcher = diag.ReleaseWatcher(EventsAPI(), None, "apps", STS, "app=claw")
+    watcher.pods["claw-0"] = {}
+    watcher.apply_event("ADDED", event("Pod", "other-0", "a"))
+    watcher.apply_event("ADDED", event("Pod", "claw-0", "b"))
+    watcher.apply_event("ADDED", event("StatefulSet", "claw", "c"))
+    out = capsys.readouterr().out
+    assert "other-0" not in out
+    assert "pod/claw-0 Test" in out
+    assert "statefulset/claw Test" in out
+
+
+class ExpiringWatch:
+    """Each event stream first fails with 410 Gone; the next attempt stops the watcher."""
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+        self.expired = set()
+
+    def __call__(self):
+        return self
+
+    def stream(self, fn, **kwargs):
+        selector = kwargs["field_selector"]
+        if selector not in self.expired:
+            self.expired.add(selector)
+            raise diag._WatchExpired()
+        self.watcher.stop.set()
+        return iter(())
+
+    def stop(self):
+        pass
+
+
+def test_relist_after_410_prints_only_new_events(monkeypatch, capsys):
+    diag.load_backend("lean")
+    v1 = EventsAPI([event("Pod", "claw-0", "old-pod"), event("StatefulSet", "claw", "old-sts")])
+    watcher = diag.ReleaseWatcher(v1, None, "apps", STS, "app=claw")
+    streams = []
+    monkeypatch.setattr(watcher, "_loop", lambda *stream: streams.append(stream))
+    watcher.stop.set()
+    watcher.run([SimpleNamespace(metadata=SimpleNamespace(name="claw-0"), status=None)], "10", "11")
+    monkeypatch.undo()
+    assert capsys.readouterr().out == ""
+
+    v1.items.append(event("Pod", "claw-0", "new-pod"))
+    monkeypatch.setattr(diag, "watch", SimpleNamespace(Watch=ExpiringWatch(watcher)))
+    for stream in streams:
+        if "events" in stream[0]:
+            watcher.stop.clear()
+            watcher._loop(*stream)
+
+    lines = [line for line in capsys.readouterr().out.splitlines() if " event " in line]
+    assert len(lines) == 1 and "pod/claw-0 Test" in lines[0]
+    assert watcher.event_counts == {"old-pod": 1, "old-sts": 1, "new-pod": 1}
@@ -0,0 +1,263 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from conftest import ROOT
+from fake_registry import Registry
+
+SCRIPT = ROOT / "bin" / "update_openclaw_tag.py"
+ETAG = '"release-v1"'
+RELEASE = {"tag_name": "v2026.1.5", "name": "OpenClaw 2026.1.5", "published_at": "2026-01-05T00:00:00Z",
+           "html_url": "https://github.com/openclaw/openclaw/releases/tag/v2026.1.5", "body": "not cached"}
+VALUES = """\
+image:
+  repository: openclaw
+  tag: "v2026.1.1"
+"""
+
+
+class ReleaseAPI:
+    """Stand-in for the GitHub latest-release endpoint, answering 304 for a matching ETag."""
+
+    def __init__(self):
+        self.requests = []
+        self.rate_limited = False
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                api.requests.append(dict(self.headers))
+                if api.rate_limited:
+                    body = b'{"message": "API rate limit exceeded"}'
+                    self.send_response(403)
+                    self.send_header("X-RateLimit-Remaining", "0")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                if self.headers.get("If-None-Match") == ETAG:
+                    self.send_response(304)
+                    self.send_header("ETag", ETAG)
+                    self.end_headers()
+                    return
+                body = json.dumps(RELEASE).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", ETAG)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/repos/openclaw/openclaw/releases/latest"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def api():
+    server = ReleaseAPI()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def workdir(tmp_path):
+    (tmp_path / "values.yaml").write_text(VALUES)
+    return tmp_path
+
+
+@pytest.fixture
+def registry(workdir):
+    server = Registry()
+    (workdir / "build-config.json").write_text(json.dumps({"source": {"registry": server.host, "image": "openclaw/openclaw"}}))
+    yield server
+    server.close()
+
+
+def run(workdir, api_url, *args):
+    cmd = [sys.executable, str(SCRIPT), "--api-url", api_url, "--cache", str(workdir / "cache.json"),
+           "--values", str(workdir / "values.yaml"), *args]
+    env = {**os.environ, "DOCKER_CONFIG": str(workdir / "docker")}
+    env.pop("REGISTRY_USERNAME", None)
+    return subprocess.run(cmd, cwd=workdir, env=env, capture_output=True, text=True, timeout=60)
+
+
+def cache_entry(workdir, api_url):
+    return json.loads((workdir / "cache.json").read_text())[api_url]
+
+
+def unused_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/releases/latest"
+
+
+def test_fetch_stores_etag(workdir, api):
+    proc = run(workdir, api.url)
+    assert proc.returncode == 0, proc.stderr
+    assert "Latest tag: v2026.1.5" in proc.stdout
+    assert len(api.requests) == 1
+    assert "If-None-Match" not in api.requests[0]
+    entry = cache_entry(workdir, api.url)
+    assert entry["etag"] == ETAG
+    assert entry["data"] == {k: RELEASE[k] for k in ("tag_name", "name", "published_at", "html_url")}
+    assert 'tag: "v2026.1.5"' in (workdir / "values.yaml").read_text()
+
+
+def test_revalidates_with_etag(workdir, api):
+    run(workdir, api.url)
+    before = cache_entry(workdir, api.url)
+    proc = run(workdir, api.url, "--cache-ttl", "0")
+    assert proc.returncode == 0, proc.stderr
+    assert "Latest tag: v2026.1.5" in proc.stdout
+    assert len(api.requests) == 2
+    assert api.requests[1]["If-None-Match"] == ETAG
+    # A 304 keeps the entry and only moves checked_at forward.
+    after = cache_entry(workdir, api.url)
+    assert after["checked_at"] > before["checked_at"]
+    assert {k: v for k, v in after.items() if k != "checked_at"} == {k: v for k, v in before.items() if k != "checked_at"}
+
+
+def test_no_request_within_ttl(workdir, api):
+    run(workdir, api.url)
+    before = cache_entry(workdir, api.url)
+    proc = run(workdir, api.url, "--cache-ttl", "3600")
+    assert proc.returncode == 0, proc.stderr
+    assert "Latest tag: v2026.1.5" in proc.stdout
+    assert len(api.requests) == 1
+    assert cache_entry(workdir, api.url) == before
+
+
+def test_offline_uses_cache(workdir, api):
+    run(workdir, api.url)
+    proc = run(workdir, api.url, "--offline", "--cache-ttl", "0")
+    assert proc.returncode == 0, proc.stderr
+    assert "Latest tag: v2026.1.5" in proc.stdout
+    assert len(api.requests) == 1
+
+
+def test_offline_without_cache(workdir, api):
+    proc = run(workdir, api.url, "--offline")
+    assert proc.returncode != 0
+    assert "--offline: no cached release" in proc.stderr
+    assert api.requests == []
+    assert (workdir / "values.yaml").read_text() == VALUES
+
+
+def test_unreachable_api_falls_back_to_cache(workdir, api):
+    run(workdir, api.url)
+    cache = json.loads((workdir / "cache.json").read_text())
+    url = unused_url()
+    cache[url] = cache[api.url]
+    (workdir / "cache.json").write_text(json.dumps(cache))
+    proc = run(workdir, url, "--cache-ttl", "0", "--timeout", "5")
+    assert proc.returncode == 0, proc.stderr
+    assert "Latest tag: v2026.1.5" in proc.stdout
+    assert f"Warning: {url}" in proc.stderr
+    assert "using cached release" in proc.stderr
+    # A fallback is not a successful check, so checked_at stays put.
+    assert cache_entry(workdir, url) == cache[api.url]
+
+
+def test_rate_limit_falls_back_to_cache(workdir, api):
+    run(workdir, api.url)
+    before = cache_entry(workdir, api.url)
+    api.rate_limited = True
+    proc = run(workdir, api.url, "--cache-ttl", "0")
+    assert proc.returncode == 0, proc.stderr
+    assert "Latest tag: v2026.1.5" in proc.stdout
+    assert "HTTP 403" in proc.stderr and "using cached release" in proc.stderr
+    assert cache_entry(workdir, api.url) == before
+
+
+def test_rate_limit_without_cache(workdir, api):
+    api.rate_limited = True
+    proc = run(workdir, api.url)
+    assert proc.returncode != 0
+    assert (workdir / "values.yaml").read_text() == VALUES
+
+
+def test_unreachable_api_without_cache(workdir):
+    proc = run(workdir, unused_url(), "--timeout", "5")
+    assert proc.returncode != 0
+    assert (workdir / "values.yaml").read_text() == VALUES
+
+
+def test_pin_digest(workdir, api, registry):
+    index, digests = registry.push("openclaw/openclaw", RELEASE["tag_name"])
+    proc = run(workdir, api.url, "--pin-digest")
+    assert proc.returncode == 0, proc.stderr
+    assert f"Pinned digest (index): {registry.host}/openclaw/openclaw@{index}" in proc.stdout
+    values = (workdir / "values.yaml").read_text()
+    assert f'  digest: "{index}"' in values.splitlines()
+    # tag before digest, in the order they were set
+    assert values.index("  tag:") < values.index("  digest:")
+
+    run(workdir, api.url, "--pin-digest", "--platform", "linux/amd64", "--cache-ttl", "3600")
+    assert f'  digest: "{digests["linux/amd64"]}"' in (workdir / "values.yaml").read_text().splitlines()
+
+
+def test_bump_without_pin_clears_digest(workdir, api):
+    (workdir / "values.yaml").write_text(VALUES + '  digest: "sha256:' + "0" * 64 + '"\n')
+    proc = run(workdir, api.url)
+    assert proc.returncode == 0, proc.stderr
+    lines = (workdir / "values.yaml").read_text().splitlines()
+    assert '  tag: "v2026.1.5"' in lines
+    assert '  digest: ""' in lines
+    assert "Cleared image.digest: sha256:" in proc.stderr
+
+
+def test_bump_without_pin_adds_no_digest(workdir, api):
+    proc = run(workdir, api.url)
+    assert proc.returncode == 0, proc.stderr
+    assert (workdir / "values.yaml").read_text() == VALUES.replace("v2026.1.1", "v2026.1.5")
+
+
+def test_missing_tag_is_an_error(workdir, api):
+    values = (ROOT / "chart" / "examples" / "values-ingress.yaml").read_text()
+    (workdir / "values.yaml").write_text(values)
+    proc = run(workdir, api.url)
+    assert proc.returncode != 0
+    assert "Did not find image.tag" in proc.stderr
+    assert (workdir / "values.yaml").read_text() == values
+
+
+def test_pin_digest_missing_platform(workdir, api, registry):
+    registry.push("openclaw/openclaw", RELEASE["tag_name"], platforms=("linux/arm64",))
+    proc = run(workdir, api.url, "--pin-digest", "--platform", "linux/amd64")
+    assert proc.returncode != 0
+    assert "No linux/amd64 manifest; available: linux/arm64" in proc.stderr
+    assert (workdir / "values.yaml").read_text() == VALUES
+
+
+def test_build_config_updates_source_tag(workdir, api):
+    (workdir / "build-config.json").write_text(json.dumps({"source": {"image": "openclaw/openclaw", "tag": "v2026.1.1"}}))
+    proc = run(workdir, api.url, "--build-config")
+    assert proc.returncode == 0, proc.stderr
+    assert "Updated: build-config.json" in proc.stdout
+    assert json.loads((workdir / "build-config.json").read_text()) == {"source": {"image": "openclaw/openclaw", "tag": "v2026.1.5"}}
+
+
+def test_multi_file_missing_tag_fails(workdir, api):
+    untagged = "image:\n  repository: openclaw\n"
+    (workdir / "untagged.yaml").write_text(untagged)
+    proc = run(workdir, api.url, "--values", str(workdir / "untagged.yaml"))
+    assert proc.returncode == 1
+    assert f"Missing: {workdir / 'untagged.yaml'} (no image.tag)" in proc.stderr
+    assert f"Updated: {workdir / 'values.yaml'}" in proc.stdout
+    assert (workdir / "untagged.yaml").read_text() == untagged
+    assert 'tag: "v2026.1.5"' in (workdir / "values.yaml").read_text()
@@ -0,0 +1,65 @@
+import subprocess
+import sys
+
+from conftest import ROOT
+from update_values import set_values, update_file
+
+VALUES = """\
+image:
+  repository: openclaw  # upstream
+  pullPolicy: IfNotPresent
+
+service:
+  port: 18789
+"""
+
+
+def test_added_keys_keep_request_order():
+    text, notes, missing = set_values(VALUES, {("image", "tag"): "v1", ("image", "digest"): "sha256:abc", ("image", "pullSecret"): "x"})
+    assert text.splitlines()[:6] == [
+        "image:",
+        "  repository: openclaw  # upstream",
+        "  pullPolicy: IfNotPresent",
+        '  tag: "v1"',
+        '  digest: "sha256:abc"',
+        '  pullSecret: "x"',
+    ]
+    assert notes == ["image.tag: added v1", "image.digest: added sha256:abc", "image.pullSecret: added x"]
+    assert missing == []
+
+
+def test_existing_only_keys_are_not_added():
+    text, notes, missing = set_values(VALUES, {("image", "tag"): "v1", ("image", "pullPolicy"): "Always"},
+                                      existing_only=[("image", "tag"), ("image", "pullPolicy")])
+    assert text == VALUES.replace("IfNotPresent", "Always")
+    assert notes == ["image.tag: missing (not added)", "image.pullPolicy: IfNotPresent -> Always"]
+    assert missing == [("image", "tag")]
+
+
+def test_existing_keys_keep_comments():
+    text, notes, _ = set_values(VALUES, {("image", "repository"): "ghcr.io/openclaw/openclaw"})
+    assert '  repository: ghcr.io/openclaw/openclaw  # upstream' in text.splitlines()
+    assert notes == ["image.repository: openclaw -> ghcr.io/openclaw/openclaw"]
+
+
+def test_partial_and_missing_status(tmp_path):
+    path = tmp_path / "values.yaml"
+    path.write_text(VALUES)
+    result = update_file(str(path), {("image", "tag"): "v1", ("gateway", "port"): "1"})
+    assert result["status"] == "partial"
+    assert "gateway.port: missing" in result["notes"]
+    assert result["missing"] == [("gateway", "port")]
+    assert 'tag: "v1"' in path.read_text()
+    assert update_file(str(path), {("image", "tag"): "v1", ("gateway", "port"): "1"})["status"] == "partial"
+    assert update_file(str(path), {("gateway", "port"): "1"})["status"] == "missing"
+    assert update_file(str(path), {("image", "tag"): "v1"})["status"] == "unchanged"
+
+
+def test_summary_counts_partial_files(tmp_path):
+    (tmp_path / "a.yaml").write_text(VALUES)
+    (tmp_path / "b.yaml").write_text("service:\n  port: 1\n")
+    proc = subprocess.run([sys.executable, str(ROOT / "bin" / "update_values.py"), "--set", "image.tag=v1",
+                           "--set", "service.port=2", str(tmp_path / "*.yaml")], capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert "2 file(s): 1 updated, 0 unchanged, 1 partial (some keys missing), 0 missing key(s), 0 error(s)" in proc.stdout
+    assert "image.tag: missing" in proc.stdout